@@ -0,0 +1,206 @@
+import sys
+from dataclasses import dataclass
+from pathlib import PurePosixPath, PureWindowsPath
+
+_intern = sys.intern
+
+# The `meta.databricks` keys that route a node's task to other compute (see `DbtNode.compute_hints`).
+COMPUTE_HINT_KEYS = ("job_cluster_key", "environment_key", "warehouse_id", "size_class")
+
+
+def _flatten_fqn(fqn: list[str] | tuple[str, ...]) -> list[str]:
+    """
+    Flattens an fqn the way dbt does before comparing it, splitting every segment on `.`.
+
+    `is_selected_node` treats dots inside a segment as namespace separators, so a test named
+    `check.nested` with fqn `['probe', 'check.nested']` compares as `['probe', 'check', 'nested']` —
+    which is why the shorter `probe.check` matches it as a subtree parent.
+    """
+    return [part for segment in fqn for part in segment.split(".")]
+
+
+def _candidate_file_names(original_file_path: str) -> frozenset[str]:
+    """Returns every base name implied by POSIX and Windows path semantics."""
+    return frozenset(
+        {
+            PurePosixPath(original_file_path).name,
+            PureWindowsPath(original_file_path).name,
+        }
+    )
+
+
+def _base_file_name(original_file_path: str) -> str:
+    """
+    Returns the path-flavour-invariant base name dbt's `file:` selector matches.
+
+    dbt assembles `original_file_path` with `os.path.join`/`os.path.relpath` and `FileSelectorMethod`
+    splits it with `Path(...).name`, so a path containing a backslash can mean either a Windows hierarchy
+    or a literal POSIX file name. Manifest JSON carries no producer-platform metadata. A `file:` term
+    is therefore emitted only when both path flavours yield the same base name; otherwise the remaining
+    selector terms must prove exactness or generation refuses the resource.
+    """
+    candidates = _candidate_file_names(original_file_path)
+    return next(iter(candidates)) if len(candidates) == 1 else ""
+
+
+def _compute_hints(info: dict) -> tuple[tuple[str, str], ...]:
+    """
+    The compute routing hints of a manifest entry, from `config.meta.databricks` or else `meta.databricks`.
+
+    dbt copies a node's `meta` into its `config`, where the project-level `+meta` also lands, so the
+    config's is the complete one; the top-level `meta` is read for manifests written without it. Keys
+    outside `COMPUTE_HINT_KEYS` and empty values are left out, so other tools' settings are ignored.
+    """
+    meta = (info.get("config") or {}).get("meta")
+    if not isinstance(meta, dict) or "databricks" not in meta:
+        meta = info.get("meta")
+    hints = meta.get("databricks") if isinstance(meta, dict) else None
+    if not isinstance(hints, dict):
+        return ()
+    return tuple(
+        (key, _intern(str(hints[key]))) for key in COMPUTE_HINT_KEYS if hints.get(key) not in (None, "")
+    )
+
+
+def _file_terms(original_file_path: str) -> frozenset[str]:
+    """
+    Every value dbt's `file:` selector matches this path by.
+
+    `FileSelectorMethod` matches the base name *or* its stem, so `file:a.yml` also matches a node declared
+    in `a.yml.yml`; both path flavours contribute, so neither interpretation of a backslash can hide a
+    collision.
+    """
+    terms: set[str] = set()
+    for base in _candidate_file_names(original_file_path):
+        terms.add(base)
+        terms.add(base.rsplit(".", 1)[0] if "." in base else base)
+    return frozenset(_intern(term) for term in terms)
+
+
+@dataclass(frozen=True, slots=True)
+class DbtNode:
+    """
+    One manifest resource, normalized to the fields job generation reads.
+
+    Manifest entries are nested dicts, and selector construction, the exactness proof and test gating
+    used to re-read them — `depends_on.nodes`, `config.enabled`, `test_metadata.name`, the flattened
+    fqn, the `file:` base names — once per node per selector term. A record is built once per resource
+    with every one of those values already derived, and its strings interned, so the ids shared by
+    `depends_on` lists, packages and fqn segments are held once across the manifest. `__slots__` keeps
+    each record to its fields, without a per-instance dict.
+
+    `DbtFactory`, its selector index and the task factories consume records. They still accept a raw
+    manifest dict wherever they accept a record, converting it with `to_dbt_node`, so library callers
+    that pass manifest entries keep working.
+    """
+
+    unique_id: str
+    """The manifest key, dbt's `unique_id`. Empty when a lone entry is converted without one."""
+
+    resource_type: str
+    """`model`, `seed`, `snapshot`, `test`, `unit_test`, `source`, ... or empty when absent."""
+
+    name: str
+    """The resource name, or empty when absent."""
+
+    package_name: str
+    """The owning package, or empty when absent."""
+
+    fqn: tuple[str, ...]
+    """The fqn as dbt records it."""
+
+    flat_fqn: tuple[str, ...]
+    """The fqn flattened as dbt compares it (see `_flatten_fqn`)."""
+
+    original_file_path: str
+    """The manifest path of the file declaring the resource."""
+
+    file_name: str
+    """The base name a `file:` term addresses, or empty when the path flavours disagree on it."""
+
+    file_terms: frozenset[str]
+    """Every value a `file:` term matches this resource by (see `_file_terms`)."""
+
+    depends_on: tuple[str, ...]
+    """The ids in `depends_on.nodes`, in manifest order."""
+
+    enabled: bool
+    """False only when `config.enabled` is explicitly false."""
+
+    version: int | float | str | None = None
+    """The model version, or None; unit-test clones carry their model's version too."""
+
+    source_name: str = ""
+    """A source's `source_name`."""
+
+    model: str = ""
+    """A unit test's `model` field, the bare name of the model under test."""
+
+    test_name: str = ""
+    """A generic test's type (`test_metadata.name`), e.g. `not_null`; empty for other resources."""
+
+    compute_hints: tuple[tuple[str, str], ...] = ()
+    """The `(key, value)` compute routing hints of `meta.databricks`, in `COMPUTE_HINT_KEYS` order."""
+
+    @property
+    def is_versioned(self) -> bool:
+        """
+        Whether dbt treats the node as versioned, which requires a model and not merely a `version`.
+
+        A unit-test clone carries `version` too, but dbt's `VERSIONED_NODE_TYPES` holds models only.
+        """
+        return self.resource_type == "model" and self.version is not None
+
+    @classmethod
+    def from_manifest(cls, unique_id: str, info: dict) -> "DbtNode":
+        """
+        Builds the record for one `nodes`, `sources` or `unit_tests` entry.
+
+        Args:
+            unique_id (str): The entry's manifest key.
+            info (dict): The manifest entry.
+
+        Returns:
+            DbtNode: The normalized record.
+        """
+        fqn = tuple(_intern(segment) for segment in info.get("fqn") or ())
+        original_file_path = info.get("original_file_path") or ""
+        return cls(
+            unique_id=_intern(unique_id),
+            resource_type=_intern(info.get("resource_type") or ""),
+            name=_intern(info.get("name") or ""),
+            package_name=_intern(info.get("package_name") or ""),
+            fqn=fqn,
+            flat_fqn=tuple(_intern(part) for part in _flatten_fqn(fqn)),
+            original_file_path=original_file_path,
+            file_name=_base_file_name(original_file_path),
+            file_terms=_file_terms(original_file_path),
+            depends_on=tuple(_intern(dep) for dep in (info.get("depends_on") or {}).get("nodes") or ()),
+            enabled=(info.get("config") or {}).get("enabled") is not False,
+            version=info.get("version"),
+            source_name=_intern(info.get("source_name") or ""),
+            model=info.get("model") or "",
+            test_name=_intern((info.get("test_metadata") or {}).get("name") or ""),
+            compute_hints=_compute_hints(info),
+        )
+
+
+def to_dbt_node(info: DbtNode | dict, unique_id: str | None = None) -> DbtNode:
+    """
+    Returns `info` as a record, converting a raw manifest entry.
+
+    Args:
+        info (DbtNode | dict): A record, returned unchanged, or a manifest entry.
+        unique_id (str | None): The entry's manifest key. Defaults to the entry's own `unique_id` field.
+
+    Returns:
+        DbtNode: The record.
+    """
+    if isinstance(info, DbtNode):
+        return info
+    return DbtNode.from_manifest(unique_id if unique_id is not None else info.get("unique_id") or "", info)
+
+
+def to_dbt_nodes(entries: dict) -> dict[str, DbtNode]:
+    """Converts a manifest section — or a mapping already holding records — to records keyed by id."""
+    return {_intern(full_name): to_dbt_node(info, full_name) for full_name, info in entries.items()}
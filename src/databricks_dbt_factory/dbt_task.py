@@ -1,5 +1,5 @@
 import json
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from typing import Any
 
@@ -91,6 +91,63 @@ class DbtTaskOptions:
                 )
 
 
+@dataclass(frozen=True)
+class ComputeTarget:
+    """A SQL warehouse or job cluster that generated tasks are assigned to, with its share of the load."""
+
+    warehouse_id: str | None = None
+    """ID of the SQL warehouse tasks assigned here connect to."""
+
+    job_cluster_key: str | None = None
+    """Key of the job cluster tasks assigned here run on."""
+
+    capacity: float = 1.0
+    """How much load this target takes relative to the others, e.g. 2 for a warehouse twice the size."""
+
+    def __post_init__(self):
+        if not self.warehouse_id and not self.job_cluster_key:
+            raise ValueError("A compute target needs a warehouse_id or a job_cluster_key.")
+        if not self.capacity > 0:
+            raise ValueError(f"A compute target's capacity must be positive, got {self.capacity}.")
+
+    def applied_to(self, options: DbtTaskOptions) -> DbtTaskOptions:
+        """`options` with this target's warehouse and job cluster, where set."""
+        overrides = {"warehouse_id": self.warehouse_id, "job_cluster_key": self.job_cluster_key}
+        return replace(options, **{name: value for name, value in overrides.items() if value})
+
+
+@dataclass(frozen=True)
+class ComputeRoute:
+    """The compute one node's task runs on instead of its factory's, from the node's `meta.databricks`."""
+
+    job_cluster_key: str | None = None
+    """Key of the job cluster to run on."""
+
+    environment_key: str | None = None
+    """Key of the serverless environment to run on, instead of any job cluster."""
+
+    warehouse_id: str | None = None
+    """ID of the SQL warehouse to connect to."""
+
+    def __post_init__(self):
+        if self.job_cluster_key and self.environment_key:
+            raise ValueError(
+                f"A task runs on a job cluster or a serverless environment, not both; got "
+                f"job_cluster_key={self.job_cluster_key!r} and environment_key={self.environment_key!r}."
+            )
+
+    def applied_to(self, options: DbtTaskOptions) -> DbtTaskOptions:
+        """`options` with this route's compute, where set; an environment replaces any job cluster."""
+        overrides: dict[str, Any] = {}
+        if self.job_cluster_key:
+            overrides["job_cluster_key"] = self.job_cluster_key
+        if self.environment_key:
+            overrides.update(environment_key=self.environment_key, job_cluster_key=None)
+        if self.warehouse_id:
+            overrides["warehouse_id"] = self.warehouse_id
+        return replace(options, **overrides)
+
+
 @dataclass(frozen=True)
 class DbtTask:
     """Represents a dbt task in the Databricks job definition."""
@@ -106,6 +163,37 @@ class DbtTask:
             return self._to_notebook_dict()
         return self._to_dbt_dict()
 
+    @classmethod
+    def from_dict(cls, spec: dict, options: DbtTaskOptions) -> "DbtTask":
+        """
+        Rebuilds a task from its `to_dict` rendering, taking the options it was rendered with.
+
+        A rendering does not record every option, so a spec rendered under other options rebuilds to a
+        task that renders differently; compare `to_dict()` with `spec` to tell.
+
+        Args:
+            spec (dict): A task dictionary as returned by `to_dict`.
+            options (DbtTaskOptions): The options the task was rendered with.
+
+        Returns:
+            DbtTask: The task whose rendering `spec` is.
+
+        Raises:
+            ValueError: If `spec` is not the rendering of a dbt or notebook task.
+        """
+        try:
+            task_key = spec["task_key"]
+            depends_on = [dependency["task_key"] for dependency in spec["depends_on"]]
+            if "notebook_task" in spec:
+                commands = json.loads(spec["notebook_task"]["base_parameters"]["dbt_commands"])
+            else:
+                commands = spec["dbt_task"]["commands"]
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"Not a rendered dbt task: {spec!r:.200}") from error
+        if not isinstance(task_key, str) or not isinstance(commands, list):
+            raise ValueError(f"Not a rendered dbt task: {spec!r:.200}")
+        return cls(task_key, list(commands), options, depends_on)
+
     def _base_spec(self) -> dict[str, Any]:
         spec: dict[str, Any] = {
             "task_key": self.task_key,
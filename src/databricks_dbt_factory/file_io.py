@@ -1,6 +1,6 @@
 import os
 import tempfile
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Protocol
@@ -17,17 +17,22 @@ class _TemporaryBinaryFile(Protocol):
 
 
 def _write_temporary_file(
-    temporary_file: _TemporaryBinaryFile, temporary_path: Path, content: bytes, mode: int
+    temporary_file: _TemporaryBinaryFile,
+    temporary_path: Path,
+    write: Callable[[_TemporaryBinaryFile], object],
+    mode: int,
 ) -> None:
     """Writes and synchronizes a temporary artifact before publication."""
-    temporary_file.write(content)
+    write(temporary_file)
     temporary_file.flush()
     os.fsync(temporary_file.fileno())
     os.chmod(temporary_path, mode)
 
 
 @contextmanager
-def _prepared_temporary_path(target: Path, content: bytes, mode: int) -> Iterator[Path]:
+def _prepared_temporary_path(
+    target: Path, write: Callable[[_TemporaryBinaryFile], object], mode: int
+) -> Iterator[Path]:
     """Yields a closed temporary file and removes it unless publication succeeds."""
     temporary_path: Path | None = None
     published = False
@@ -40,7 +45,7 @@ def _prepared_temporary_path(target: Path, content: bytes, mode: int) -> Iterato
             delete=False,
         ) as temporary_file:
             temporary_path = Path(temporary_file.name)
-            _write_temporary_file(temporary_file, temporary_path, content, mode)
+            _write_temporary_file(temporary_file, temporary_path, write, mode)
 
         yield temporary_path
         published = True
@@ -51,6 +56,15 @@ def _prepared_temporary_path(target: Path, content: bytes, mode: int) -> Iterato
 
 def atomic_write_bytes(target: Path, content: bytes, mode: int) -> None:
     """Atomically replaces ``target`` with the requested bytes and file mode."""
+    atomic_write_stream(target, lambda temporary_file: temporary_file.write(content), mode)
+
+
+def atomic_write_stream(target: Path, write: Callable[[_TemporaryBinaryFile], object], mode: int) -> None:
+    """Atomically replaces ``target`` with what ``write`` writes to the binary temporary file it is given.
+
+    Lets a serializer stream into the published file instead of building its whole content in memory
+    first. If ``write`` raises, the temporary file is removed and ``target`` is left as it was.
+    """
     target.parent.mkdir(parents=True, exist_ok=True)
-    with _prepared_temporary_path(target, content, mode) as temporary_path:
+    with _prepared_temporary_path(target, write, mode) as temporary_path:
         os.replace(temporary_path, target)
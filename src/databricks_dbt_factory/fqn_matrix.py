@@ -0,0 +1,117 @@
+from collections.abc import Sequence
+
+from databricks_dbt_factory.dbt_node import DbtNode
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is the optional `vectorized` extra
+    np = None  # type: ignore[assignment]
+
+# Token 0 pads rows and -1 stands for a selector part no node has, so neither equals a real segment.
+_PAD = 0
+_UNKNOWN = -1
+
+
+def vectorized_matching_available() -> bool:
+    """Whether NumPy is installed, so `FqnMatrix` can be built."""
+    return np is not None
+
+
+class FqnMatrix:
+    """
+    Every node's fqn as rows of interned segment ids, for matching one fqn term against many nodes at once.
+
+    `DbtFactory._fqn_term_matches` walks one node at a time. Over a large candidate bucket, this evaluates
+    the same rules for every row in a few array operations: the positional prefix walk over the flattened
+    fqn, with and without the package, and the leaf and versioned-leaf shortcuts.
+    `tests/test_fqn_matrix.py` pins it to `_fqn_term_matches` on randomised layouts.
+
+    Requires NumPy; check `vectorized_matching_available` first.
+    """
+
+    def __init__(self, nodes: Sequence[DbtNode]):
+        """
+        Args:
+            nodes (Sequence[DbtNode]): The nodes, whose positions are the row numbers `matches` takes.
+        """
+        self._tokens: dict[str, int] = {}
+        count = len(nodes)
+        width = max((len(node.flat_fqn) for node in nodes), default=0)
+        self._flat = np.full((count, width), _PAD, dtype=np.int32)
+        # The package-stripped flat fqn, left-aligned, so both walks compare the same columns.
+        self._stripped = np.full((count, width), _PAD, dtype=np.int32)
+        self._fqn_length = np.zeros(count, dtype=np.int32)
+        self._leaf = np.full(count, _PAD, dtype=np.int32)
+        self._versioned_leaf = np.full(count, _PAD, dtype=np.int32)
+        self._versioned_suffix = np.full(count, _PAD, dtype=np.int32)
+        self._versioned = np.zeros(count, dtype=bool)
+        self._name = np.full(count, _PAD, dtype=np.int32)
+        for row, node in enumerate(nodes):
+            fqn = node.fqn
+            self._fqn_length[row] = len(fqn)
+            if not fqn:
+                # Without an fqn, dbt's matcher falls back to comparing the bare name.
+                if node.name:
+                    self._name[row] = self._token(node.name)
+                continue
+            flat = [self._token(part) for part in node.flat_fqn]
+            self._flat[row, : len(flat)] = flat
+            stripped = flat[len(fqn[0].split(".")) :]
+            self._stripped[row, : len(stripped)] = stripped
+            self._leaf[row] = self._token(fqn[-1])
+            if node.is_versioned:
+                self._versioned[row] = True
+                if len(fqn) >= 2:
+                    self._versioned_leaf[row] = self._token(fqn[-2])
+                    self._versioned_suffix[row] = self._token("_".join(fqn[-2:]))
+
+    def _token(self, segment: str) -> int:
+        """The id interned for `segment`, assigning the next one on first sight."""
+        return self._tokens.setdefault(segment, len(self._tokens) + 1)
+
+    def matching_rows(self, terms: list[str], rows: Sequence[int]) -> list[int]:
+        """
+        The `rows` that every fqn term in `terms` matches, in their given order.
+
+        Args:
+            terms (list[str]): fqn selector values, without the `fqn:` method.
+            rows (Sequence[int]): Row numbers, each a position in the nodes the matrix was built from.
+        """
+        row_array = np.asarray(rows, dtype=np.intp)
+        selected = np.ones(len(row_array), dtype=bool)
+        for term in terms:
+            selected &= self.matches(term, row_array)
+        return row_array[selected].tolist()
+
+    def matches(self, term: str, rows):
+        """
+        Whether the fqn `term` matches each of `rows`, as a boolean array.
+
+        Args:
+            term (str): An fqn selector value, without the `fqn:` method.
+            rows: Row numbers, as a NumPy integer array.
+
+        Returns:
+            A NumPy boolean array, one entry per row.
+        """
+        parts = term.split(".")
+        term_token = self._tokens.get(term, _UNKNOWN)
+        suffix_token = self._tokens.get("_".join(parts[-2:]), _UNKNOWN)
+        fqn_length = self._fqn_length[rows]
+        leaf = self._leaf[rows] == term_token
+        versioned = self._versioned[rows]
+        versioned_leaf = (self._versioned_leaf[rows] == term_token) | (self._versioned_suffix[rows] == suffix_token)
+        # `_matches_fqn_leaf` on the fqn and on the fqn without its package, which keep the same last two
+        # segments but need two, or three, of them for the versioned shortcut.
+        full_leaf = np.where(versioned, versioned_leaf & (fqn_length >= 2), leaf)
+        stripped_leaf = np.where(versioned, versioned_leaf & (fqn_length >= 3), leaf)
+
+        selected = (fqn_length >= 1) & full_leaf
+        selected |= (fqn_length >= 2) & stripped_leaf
+        if len(parts) <= self._flat.shape[1]:
+            part_tokens = np.array([self._tokens.get(part, _UNKNOWN) for part in parts], dtype=np.int32)
+            columns = slice(0, len(parts))
+            selected |= (fqn_length >= 1) & (self._flat[rows, columns] == part_tokens).all(axis=1)
+            selected |= (fqn_length >= 2) & (self._stripped[rows, columns] == part_tokens).all(axis=1)
+        selected |= (fqn_length == 0) & (self._name[rows] == term_token)
+        return selected
@@ -1,10 +1,23 @@
+import copy
 import stat
 from dataclasses import dataclass
 from pathlib import Path
 
 import yaml
 
-from databricks_dbt_factory.file_io import atomic_write_bytes
+from databricks_dbt_factory.file_io import atomic_write_bytes, atomic_write_stream
+
+# PyYAML's LibYAML bindings, when it was built with them. The C emitter renders a 1,000-task spec about five
+# times faster than the pure-Python one, and emits the same text for every document `_emits_identically`
+# accepts (see `_dumper_for`). The loaders build equal documents, so the C loader is used unconditionally.
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_CSafeDumper = getattr(yaml, "CSafeDumper", None)
+
+# The key of the task that starts the next job of a chain. Generated task keys end in their resource type
+# (`_model`, `_test`, ...), so none can take it.
+_NEXT_JOB_TASK_KEY = "run_next_job"
+# Settings that start a job run. Only the first job of a chain keeps them; the chain starts the rest.
+_RUN_TRIGGER_SETTINGS = ("schedule", "trigger", "continuous")
 
 
 @dataclass(frozen=True)
@@ -33,10 +46,11 @@ def replace_tasks_in_job_spec(
     Raises:
         ValueError: If the input has no job or the target is not a regular non-symlink file.
     """
-    rendered = render_job_spec(input_job_spec_path, new_tasks, new_job_name)
+    job_definition = _job_definition_with_tasks(input_job_spec_path, [new_tasks], new_job_name)
     destination = resolve_job_spec_destination(target_job_spec_path)
-    artifact = prepare_job_spec(rendered, input_job_spec_path, destination)
-    write_job_spec(artifact)
+    mode = _publication_mode(input_job_spec_path, destination)
+    # Nothing else is published alongside, so the YAML streams straight into the temporary file.
+    atomic_write_stream(destination, lambda file: _dump_job_spec(job_definition, file), mode)
 
 
 def render_job_spec(
@@ -61,11 +75,41 @@ def render_job_spec(
             that an unexpected manifest shape raises from the factory — those are bugs, and swallowing
             them turns a diagnosable traceback into `error: 'resource_type'`.
     """
-    with open(input_job_spec_path, "r", encoding="utf-8") as file:
-        try:
-            job_definition = yaml.safe_load(file)
-        except yaml.YAMLError as error:
-            raise ValueError(f"Could not parse {input_job_spec_path} as YAML: {error}") from error
+    return _dump_job_spec(_job_definition_with_tasks(input_job_spec_path, [new_tasks], new_job_name))
+
+
+def render_chained_job_spec(
+    input_job_spec_path: str,
+    job_tasks: list[list[dict]],
+    new_job_name: str | None = None,
+) -> str:
+    """Renders the job definition with its tasks split over a chain of jobs, without writing anything.
+
+    The first job takes the first task list, as `render_job_spec` would. Each later list goes into a copy
+    of that job keyed `<first job key>_part_<n>` and, when the job is named, named `<name> (part n of k)`;
+    copies leave out the schedule, trigger and continuous settings, as only the chain starts them. Every
+    job but the last ends with a `run_next_job` task that runs the next job through `run_job_task` once
+    all of its own tasks have succeeded, so the first job's run lasts until the whole chain has finished.
+    With a single task list this is `render_job_spec`.
+
+    Args:
+        input_job_spec_path (str): Path to the job definition YAML file.
+        job_tasks (list[list[dict]]): The tasks of each job, in the order the chain runs them (see
+            `DbtFactory.partition`).
+        new_job_name (str, optional): The name of the job to update. Defaults to None.
+
+    Raises:
+        ValueError: As `render_job_spec` does, or if a part's key is already taken by another job or a
+            job already has a task keyed `run_next_job`.
+    """
+    return _dump_job_spec(_job_definition_with_tasks(input_job_spec_path, job_tasks, new_job_name))
+
+
+def _job_definition_with_tasks(
+    input_job_spec_path: str, job_tasks: list[list[dict]], new_job_name: str | None
+) -> dict:
+    """Loads the job definition and chains `job_tasks` from its first job, raising as the renderers do."""
+    job_definition = _load_job_spec(input_job_spec_path)
 
     # *Every* level this function dereferences is checked here, before any of it is used — validating one
     # level at a time just leaves the next one exposed. The code below calls `.get`/`.pop`, indexes by key
@@ -94,9 +138,156 @@ def render_job_spec(
     first_job = jobs[first_job_key]
     if new_job_name:
         first_job["name"] = new_job_name
-    first_job["tasks"] = new_tasks  # Replace tasks field
+    first_job["tasks"] = job_tasks[0]  # Replace tasks field
+    if len(job_tasks) > 1:
+        _chain_jobs(jobs, first_job_key, job_tasks, input_job_spec_path)
+    return job_definition
+
+
+def _chain_jobs(jobs: dict, first_job_key: str, job_tasks: list[list[dict]], input_job_spec_path: str) -> None:
+    """Adds the later parts of a chain after the first job and links each part to the next."""
+    count = len(job_tasks)
+    keys = [first_job_key] + [f"{first_job_key}_part_{number}" for number in range(2, count + 1)]
+    for key in keys[1:]:
+        if key in jobs:
+            raise ValueError(
+                f"Cannot split job {first_job_key!r} in {input_job_spec_path} into {count} jobs: "
+                f"a different job already uses the key {key!r}."
+            )
+    first_job = jobs[first_job_key]
+    template = {
+        setting: value
+        for setting, value in first_job.items()
+        if setting != "tasks" and setting not in _RUN_TRIGGER_SETTINGS
+    }
+    for number, (key, tasks) in enumerate(zip(keys, job_tasks), start=1):
+        if any(task.get("task_key") == _NEXT_JOB_TASK_KEY for task in tasks):
+            raise ValueError(f"Cannot chain job {key!r}: it already has a task keyed {_NEXT_JOB_TASK_KEY!r}.")
+        if number == 1:
+            job = first_job
+        else:
+            job = copy.deepcopy(template)
+            if "name" in job:
+                job["name"] = f"{job['name']} (part {number} of {count})"
+            jobs[key] = job
+        job["tasks"] = tasks if number == count else [*tasks, _next_job_task(tasks, keys[number])]
+
+
+def _next_job_task(tasks: list[dict], next_job_key: str) -> dict:
+    """The task that runs `next_job_key` once every task of `tasks` has succeeded."""
+    upstream = {dependency["task_key"] for task in tasks for dependency in task.get("depends_on") or []}
+    return {
+        "task_key": _NEXT_JOB_TASK_KEY,
+        # Waiting for the tasks nothing else in the job waits for is waiting for every task.
+        "depends_on": [{"task_key": task["task_key"]} for task in tasks if task["task_key"] not in upstream],
+        "run_job_task": {"job_id": f"${{resources.jobs.{next_job_key}.id}}"},
+    }
+
+
+def _load_job_spec(job_spec_path: str | Path) -> object:
+    """Parses a job definition YAML file, reporting invalid YAML as a `ValueError`."""
+    with open(job_spec_path, "r", encoding="utf-8") as file:
+        try:
+            return yaml.load(file, Loader=_SafeLoader)
+        except yaml.YAMLError as error:
+            raise ValueError(f"Could not parse {job_spec_path} as YAML: {error}") from error
+
+
+def _dump_job_spec(job_definition: dict, stream=None) -> str | None:
+    """Emits the job definition as YAML, into `stream` as UTF-8 bytes if given, otherwise as a `str`."""
+    encoding = "utf-8" if stream is not None else None
+    return yaml.dump(
+        job_definition,
+        stream,
+        Dumper=_dumper_for(job_definition),
+        sort_keys=False,
+        width=1000,
+        encoding=encoding,
+    )
 
-    return yaml.dump(job_definition, sort_keys=False, width=1000)
+
+def _dumper_for(job_definition: dict) -> type:
+    """
+    The C emitter when PyYAML has one and it renders `job_definition` exactly as the Python emitter would.
+
+    The emitters differ in two places only: the Python one writes an empty mapping key in the explicit
+    `? ''` form, and the two fold long double-quoted scalars at different points. A scalar is double-quoted
+    exactly when it holds a character outside printable ASCII, so a document without either renders
+    identically — `test_c_dumper_renders_what_the_python_dumper_renders` pins this on randomized documents.
+    Any other document takes the Python emitter, so the output never depends on how PyYAML was built.
+    """
+    if _CSafeDumper is not None and _emits_identically(job_definition):
+        return _CSafeDumper
+    return yaml.SafeDumper
+
+
+def _emits_identically(value: object) -> bool:
+    """Whether every string in `value` is printable ASCII and no mapping key is empty (see `_dumper_for`)."""
+    if isinstance(value, str):
+        return value.isascii() and value.isprintable()
+    if isinstance(value, dict):
+        return all(key != "" and _emits_identically(key) and _emits_identically(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(_emits_identically(item) for item in value)
+    return True
+
+
+def read_job_spec_tasks(job_spec_path: str | Path) -> list[dict]:
+    """Reads the tasks of the first job in a job definition YAML file, as `render_job_spec` wrote them.
+
+    Args:
+        job_spec_path (str | Path): Path to the job definition YAML file.
+
+    Returns:
+        list[dict]: The first job's tasks; empty when it has none.
+
+    Raises:
+        ValueError: If the file is not valid YAML, contains no jobs, or its first job or task list is
+            not of the shape `render_job_spec` writes.
+    """
+    job_definition = _load_job_spec(job_spec_path)
+    resources = job_definition.get("resources") if isinstance(job_definition, dict) else None
+    jobs = resources.get("jobs") if isinstance(resources, dict) else None
+    if not isinstance(jobs, dict) or not jobs:
+        raise ValueError(f"No jobs found in {job_spec_path}.")
+    first_job = next(iter(jobs.values()))
+    tasks = first_job.get("tasks") if isinstance(first_job, dict) else None
+    if tasks is None:
+        return []
+    if not isinstance(tasks, list):
+        raise ValueError(f"The first job in {job_spec_path} has no task list.")
+    return tasks
+
+
+def read_job_spec_compute(job_spec_path: str | Path) -> tuple[frozenset[str], frozenset[str]]:
+    """Reads the job cluster keys and environment keys the first job in a job definition YAML file declares.
+
+    Args:
+        job_spec_path (str | Path): Path to the job definition YAML file.
+
+    Returns:
+        tuple[frozenset[str], frozenset[str]]: The `job_clusters` keys and the `environments` keys.
+
+    Raises:
+        ValueError: If the file is not valid YAML or contains no jobs.
+    """
+    job_definition = _load_job_spec(job_spec_path)
+    resources = job_definition.get("resources") if isinstance(job_definition, dict) else None
+    jobs = resources.get("jobs") if isinstance(resources, dict) else None
+    if not isinstance(jobs, dict) or not jobs:
+        raise ValueError(f"No jobs found in {job_spec_path}.")
+    first_job = next(iter(jobs.values()))
+    return _declared_keys(first_job, "job_clusters", "job_cluster_key"), _declared_keys(
+        first_job, "environments", "environment_key"
+    )
+
+
+def _declared_keys(job: object, setting: str, key: str) -> frozenset[str]:
+    """The `key` of every entry of a job's `setting` list, skipping entries of another shape."""
+    entries = job.get(setting) if isinstance(job, dict) else None
+    if not isinstance(entries, list):
+        return frozenset()
+    return frozenset(entry[key] for entry in entries if isinstance(entry, dict) and isinstance(entry.get(key), str))
 
 
 def resolve_job_spec_destination(target_job_spec_path: str | Path) -> Path:
@@ -109,9 +300,13 @@ def resolve_job_spec_destination(target_job_spec_path: str | Path) -> Path:
 
 def prepare_job_spec(rendered: str, input_job_spec_path: str, destination: Path) -> JobSpecArtifact:
     """Encodes a rendered spec and resolves the mode its atomic replacement must use."""
+    return JobSpecArtifact(rendered.encode("utf-8"), destination, _publication_mode(input_job_spec_path, destination))
+
+
+def _publication_mode(input_job_spec_path: str, destination: Path) -> int:
+    """The file mode of the spec being replaced, or of the input spec when the target does not exist yet."""
     mode_source = destination if destination.exists() else Path(input_job_spec_path)
-    mode = stat.S_IMODE(mode_source.stat().st_mode)
-    return JobSpecArtifact(rendered.encode("utf-8"), destination, mode)
+    return stat.S_IMODE(mode_source.stat().st_mode)
 
 
 def write_job_spec(artifact: JobSpecArtifact) -> None:
@@ -1,23 +1,34 @@
 import argparse
+import copy
 import hashlib
+import json
 import os
 import shlex
+import sys
+import tracemalloc
 from dataclasses import dataclass
 from importlib import resources
 from pathlib import Path
 
 from databricks_dbt_factory.__version__ import __version__
-from databricks_dbt_factory.dbt_factory import DbtFactory
+from databricks_dbt_factory.dbt_factory import BUNDLE_STRATEGIES, DbtFactory
 from databricks_dbt_factory.file_io import atomic_write_bytes
 from databricks_dbt_factory.job_spec import (
     JobSpecArtifact,
     prepare_job_spec,
+    read_job_spec_compute,
+    read_job_spec_tasks,
+    render_chained_job_spec,
     render_job_spec,
     resolve_job_spec_destination,
     write_job_spec,
 )
-from databricks_dbt_factory.utils import read_dbt_manifest
-from databricks_dbt_factory.dbt_task import DbtTaskOptions
+from databricks_dbt_factory.manifest_reader import read_dbt_manifest_nodes
+from databricks_dbt_factory.dbt_task import ComputeRoute, ComputeTarget, DbtTaskOptions
+from databricks_dbt_factory.phase_timings import PhaseListener, PhaseRecorder, timed_phase
+from databricks_dbt_factory.run_results import read_node_durations
+from databricks_dbt_factory.selector_cache import SelectorCache
+from databricks_dbt_factory.simulation import estimate_task_seconds, simulate_job
 from databricks_dbt_factory.task_factory import (
     ModelTaskFactory,
     SnapshotTaskFactory,
@@ -127,7 +138,12 @@ def _prepare_output_plan(args: argparse.Namespace) -> _OutputPlan:
     )
 
 
-def _create_dbt_factory(args: argparse.Namespace, output_plan: _OutputPlan, dbt_options: str) -> DbtFactory:
+def _create_dbt_factory(
+    args: argparse.Namespace,
+    output_plan: _OutputPlan,
+    dbt_options: str,
+    phase_listener: PhaseListener | None = None,
+) -> DbtFactory:
     """Builds the configured resource factories for one CLI invocation."""
     resolver = DbtDependencyResolver()
     dbt_tasks_deps = (
@@ -155,8 +171,34 @@ def _create_dbt_factory(args: argparse.Namespace, output_plan: _OutputPlan, dbt_
     }
     if args.run_tests:
         task_factories["test"] = TestTaskFactory(resolver, task_options, dbt_options)
-    return DbtFactory(task_factories, bundle_tests=args.bundle_tests)
-
+    selector_cache = SelectorCache(args.selector_cache_dir) if args.selector_cache_dir else None
+    try:
+        node_durations = read_node_durations(args.run_results) if args.run_results else None
+        job_cluster_keys, environment_keys = read_job_spec_compute(args.input_job_spec_path)
+        return DbtFactory(
+            task_factories,
+            bundle_tests=args.bundle_tests,
+            build_mode=args.build_mode,
+            bundle_strategy=args.bundle_strategy,
+            max_bundle_tests=args.max_bundle_tests,
+            max_bundle_seconds=args.max_bundle_seconds,
+            selector_cache=selector_cache,
+            jobs=args.jobs,
+            phase_listener=phase_listener,
+            reduce_dependencies=args.reduce_dependencies,
+            partition_jobs=args.partition_jobs,
+            coalesce_chains=args.coalesce_chains,
+            node_durations=node_durations,
+            target_task_seconds=args.target_task_seconds,
+            task_startup_seconds=args.task_startup_seconds,
+            max_parallel_tasks=args.max_parallel_tasks,
+            compute_targets=args.compute_targets,
+            compute_classes=dict(args.compute_class or []),
+            job_cluster_keys=job_cluster_keys,
+            environment_keys=environment_keys,
+        )
+    except (ValueError, FileNotFoundError) as error:
+        raise SystemExit(f"error: {error}") from error
 
 def _validate_artifact_destinations(
     runner_artifact: _RunnerArtifact | None, job_spec_artifact: JobSpecArtifact
@@ -173,22 +215,64 @@ def _prepare_generated_artifacts(
     args: argparse.Namespace,
     factory: DbtFactory,
     output_plan: _OutputPlan,
-) -> tuple[list[dict], JobSpecArtifact | None]:
-    """Generates tasks and prepares the job spec without publishing files."""
-    manifest = read_dbt_manifest(args.dbt_manifest_path)
-    tasks = factory.create_tasks(manifest)
+) -> tuple[list[list[dict]], JobSpecArtifact | None]:
+    """Generates each job's tasks and prepares the job spec without publishing files."""
+    with timed_phase(factory.phase_listener, "read_manifest") as counts:
+        manifest = read_dbt_manifest_nodes(args.dbt_manifest_path)
+        counts["entries"] = sum(len(manifest.get(key, {})) for key in ("nodes", "sources", "unit_tests"))
+    previous_tasks = _previous_tasks(args)
+    if previous_tasks is None:
+        tasks = factory.create_tasks(manifest)
+    else:
+        with timed_phase(factory.phase_listener, "read_previous") as counts:
+            previous_manifest = read_dbt_manifest_nodes(args.previous_dbt_manifest_path)
+            counts["previous_tasks"] = len(previous_tasks)
+        tasks = factory.update_tasks(manifest, previous_manifest, previous_tasks)
+    if factory.reduce_dependencies:
+        print(f"Removed {factory.removed_dependencies} redundant task dependencies.", file=sys.stderr)
+    if factory.max_parallel_tasks is not None:
+        print(
+            f"Added {factory.added_dependencies} ordering dependencies to run at most "
+            f"{factory.max_parallel_tasks} tasks at once.",
+            file=sys.stderr,
+        )
+    if factory.selector_cache is not None:
+        try:
+            factory.selector_cache.save()
+        except OSError as error:
+            raise ValueError(f"Cannot write the selector cache {factory.selector_cache.path}: {error}") from error
+    if args.simulate is not None:
+        _write_simulation(args, factory, manifest, tasks)
+    job_tasks = factory.partition(tasks)
+    if len(job_tasks) > 1:
+        print(f"Split {len(tasks):,} tasks into {len(job_tasks)} chained jobs.", file=sys.stderr)
     if args.dry_run:
-        return tasks, None
+        return job_tasks, None
 
     assert output_plan.job_spec_destination is not None
-    rendered = render_job_spec(args.input_job_spec_path, tasks, args.new_job_name)
-    job_spec_artifact = prepare_job_spec(
-        rendered,
-        args.input_job_spec_path,
-        output_plan.job_spec_destination,
-    )
+    with timed_phase(factory.phase_listener, "render_job_spec") as counts:
+        if len(job_tasks) == 1:
+            rendered = render_job_spec(args.input_job_spec_path, tasks, args.new_job_name)
+        else:
+            rendered = render_chained_job_spec(args.input_job_spec_path, job_tasks, args.new_job_name)
+        job_spec_artifact = prepare_job_spec(
+            rendered,
+            args.input_job_spec_path,
+            output_plan.job_spec_destination,
+        )
+        counts["bytes"] = len(job_spec_artifact.content)
     _validate_artifact_destinations(output_plan.runner_artifact, job_spec_artifact)
-    return tasks, job_spec_artifact
+    return job_tasks, job_spec_artifact
+
+
+def _previous_tasks(args: argparse.Namespace) -> list[dict] | None:
+    """The tasks an incremental run may reuse: those of the existing target spec, if any."""
+    if args.previous_dbt_manifest_path is None:
+        return None
+    target = Path(args.target_job_spec_path)
+    if not target.is_file():
+        return None
+    return read_job_spec_tasks(target)
 
 
 def _publish_artifacts(runner_artifact: _RunnerArtifact | None, job_spec_artifact: JobSpecArtifact) -> None:
@@ -210,24 +294,81 @@ def main():
     except ValueError as error:
         raise SystemExit(f"error: {error}") from error
 
+    recorder = PhaseRecorder() if args.timings else None
+    if recorder is not None:
+        tracemalloc.start()
+    try:
+        _generate(args, dbt_options, recorder)
+    finally:
+        if recorder is not None:
+            tracemalloc.stop()
+            _write_timings(args.timings, recorder)
+
+
+def _generate(args: argparse.Namespace, dbt_options: str, phase_listener: PhaseListener | None) -> None:
+    """Generates and publishes the job spec, or prints its tasks on a dry run."""
     output_plan = _prepare_output_plan(args)
-    factory = _create_dbt_factory(args, output_plan, dbt_options)
+    factory = _create_dbt_factory(args, output_plan, dbt_options, phase_listener)
     try:
-        tasks, job_spec_artifact = _prepare_generated_artifacts(args, factory, output_plan)
+        job_tasks, job_spec_artifact = _prepare_generated_artifacts(args, factory, output_plan)
     except (ValueError, FileNotFoundError) as error:
         raise SystemExit(f"error: {error}") from error
 
     if args.dry_run:
-        print(tasks)
+        print(job_tasks[0] if len(job_tasks) == 1 else job_tasks)
         return
 
     assert job_spec_artifact is not None
     try:
-        _publish_artifacts(output_plan.runner_artifact, job_spec_artifact)
+        with timed_phase(phase_listener, "publish"):
+            _publish_artifacts(output_plan.runner_artifact, job_spec_artifact)
     except ValueError as error:
         raise SystemExit(f"error: {error}") from error
 
 
+def _write_timings(destination: str, recorder: PhaseRecorder) -> None:
+    """Writes the recorded phases as JSON to `destination`, or to stderr for `-`."""
+    _write_report(destination, recorder.to_json(), "timings")
+
+
+def _write_simulation(args: argparse.Namespace, factory: DbtFactory, manifest: dict, tasks: list[dict]) -> None:
+    """
+    Simulates a run of the generated tasks and, when tests run, of the tasks the other test mode generates:
+    per-test and bundled mode are compared with each other, build mode with the bundles it replaces.
+
+    The other mode's tasks are generated by a copy of `factory`, unobserved and without the task limit,
+    so only the generated job can fail the run.
+    """
+    mode = "build" if factory.build_mode else "bundled" if factory.bundle_tests else "per_test"
+    simulations = {mode: _simulated(args, factory, tasks)}
+    if "test" in factory.task_factories:
+        other_mode = "per_test" if mode == "bundled" else "bundled"
+        other = copy.copy(factory)
+        other.bundle_tests, other.build_mode = other_mode == "bundled", False
+        other.phase_listener, other.partition_jobs = None, True
+        simulations[other_mode] = _simulated(args, other, other.create_tasks(manifest))
+    _write_report(args.simulate, json.dumps({"generated": mode, **simulations}, indent=2), "the simulation")
+
+
+def _simulated(args: argparse.Namespace, factory: DbtFactory, tasks: list[dict]) -> dict:
+    """The simulation of a run of `tasks`, as generated by `factory`, as a JSON-ready dictionary."""
+    task_seconds = estimate_task_seconds(factory.task_nodes, factory.node_durations or {})
+    report = simulate_job(tasks, task_seconds, args.simulate_max_concurrency, args.task_startup_seconds)
+    return json.loads(report.to_json())
+
+
+def _write_report(destination: str, report: str, description: str) -> None:
+    """Writes a JSON report to `destination`, or to stderr for `-`."""
+    report += "\n"
+    if destination == "-":
+        sys.stderr.write(report)
+        return
+    try:
+        Path(destination).write_text(report, encoding="utf-8")
+    except OSError as error:
+        raise SystemExit(f"error: cannot write {description} to {destination}: {error}") from error
+
+
 def build_dbt_options(args):
     """Builds the dbt command options based on the provided arguments."""
     validate_extra_dbt_options(args.extra_dbt_command_options)
@@ -243,6 +384,43 @@ def build_dbt_options(args):
     return dbt_options
 
 
+def _compute_pool(value: str | None) -> list[tuple[str, float]]:
+    """The `name[:capacity]` entries of a comma separated --warehouse_id or --job-cluster-key value."""
+    pool = []
+    for entry in (value or "").split(","):
+        name, separator, capacity = entry.strip().partition(":")
+        if not name and not separator:
+            continue
+        try:
+            share = float(capacity) if separator else 1.0
+        except ValueError:
+            share = 0.0
+        if not name or not share > 0 or share == float("inf"):
+            raise ValueError(f"expected NAME or NAME:CAPACITY with a positive capacity, got {entry.strip()!r}")
+        pool.append((name, share))
+    return pool
+
+
+def _compute_class(value: str) -> tuple[str, ComputeRoute]:
+    """Parses a --compute-class value, `NAME=FIELD:VALUE[,FIELD:VALUE]`, into its name and route."""
+    name, separator, fields = value.partition("=")
+    if not name or not separator:
+        raise argparse.ArgumentTypeError(f"expected NAME=FIELD:VALUE[,FIELD:VALUE], got {value!r}")
+    settings = {}
+    for entry in fields.split(","):
+        field_name, _, field_value = entry.strip().partition(":")
+        if field_name not in ("job_cluster_key", "environment_key", "warehouse_id") or not field_value:
+            raise argparse.ArgumentTypeError(
+                f"expected NAME=FIELD:VALUE[,FIELD:VALUE] with FIELD job_cluster_key, environment_key or "
+                f"warehouse_id, got {value!r}"
+            )
+        settings[field_name] = field_value
+    try:
+        return name, ComputeRoute(**settings)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Generate Databricks job definition from dbt manifest.")
     parser.add_argument(
@@ -283,7 +461,14 @@ def parse_args():
         default=None,
     )
     parser.add_argument(
-        "--warehouse_id", type=str, help="Optional SQL Warehouse to run dbt models on", required=False, default=None
+        "--warehouse_id",
+        type=str,
+        help=(
+            "Optional SQL Warehouse to run dbt models on. Give several as a comma separated list, each "
+            "optionally followed by :CAPACITY (default 1), to balance the tasks over them."
+        ),
+        required=False,
+        default=None,
     )
     parser.add_argument("--schema", type=str, help="Optional schema to write to.", required=False, default=None)
     parser.add_argument("--catalog", type=str, help="Optional catalog to write to.", required=False, default=None)
@@ -341,6 +526,45 @@ def parse_args():
             "assertion failed."
         ),
     )
+    parser.add_argument(
+        "--bundle-strategy",
+        choices=sorted(BUNDLE_STRATEGIES),
+        help=(
+            "What --bundle-tests groups tests by: their parent resource (default), the schema file or "
+            "directory declaring them, or their package. Only tests whose parents' bundles sit at the "
+            "same depth of the job share a bundle, so the job stays acyclic."
+        ),
+        required=False,
+        default="parent",
+    )
+    parser.add_argument(
+        "--max-bundle-tests",
+        type=int,
+        help="Optional cap on the tests one --bundle-tests bundle runs; a larger group is split.",
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--max-bundle-seconds",
+        type=float,
+        help=(
+            "Optional cap on how long the tests of one --bundle-tests bundle are predicted to run by "
+            "--run-results; a longer group is split."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--build-mode",
+        action="store_true",
+        help=(
+            "Run the tests `--bundle-tests` would bundle for a model, seed or snapshot in that resource's "
+            "own task, with one `dbt build` of the resource's exact selector and its tests' exact "
+            "selectors. A failing test fails the task, so downstream tasks still wait for the tests, "
+            "and a tested resource needs one task instead of two. Source tests and tests with zero or "
+            "multiple testable parents keep their own tasks, as with `--bundle-tests`."
+        ),
+    )
     parser.add_argument(
         "--enable-dbt-deps",
         action="store_true",
@@ -376,7 +600,149 @@ def parse_args():
     parser.add_argument(
         "--job-cluster-key",
         type=str,
-        help="Job cluster key for running tasks on job compute instead of serverless. Mutually exclusive with --environment-key.",
+        help=(
+            "Job cluster key for running tasks on job compute instead of serverless. Mutually exclusive with "
+            "--environment-key. Give several as a comma separated list, each optionally followed by "
+            ":CAPACITY (default 1), to balance the tasks over them."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--compute-class",
+        type=_compute_class,
+        action="append",
+        help=(
+            "Optional compute a dbt node's meta.databricks.size_class stands for, as "
+            "NAME=FIELD:VALUE[,FIELD:VALUE] with FIELD job_cluster_key, environment_key or warehouse_id, "
+            "e.g. large=job_cluster_key:big_cluster. Repeat for each class."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--selector-cache-dir",
+        type=str,
+        help=(
+            "Optional directory for a cache of proven dbt selectors. A later run re-proves only the "
+            "nodes whose record or selectable neighbours changed; the rest reuse the cached selector."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help=(
+            "Number of processes proving dbt selectors exact (default: 1). Proofs are independent per "
+            "node, so large manifests generate faster on several cores; the output is unchanged."
+        ),
+        required=False,
+        default=1,
+    )
+    parser.add_argument(
+        "--previous-dbt-manifest-path",
+        type=str,
+        help=(
+            "Optional path to the manifest the existing target job spec was generated from. Tasks the "
+            "manifest changes cannot affect are copied from that spec instead of being regenerated; the "
+            "output is identical to a full run. Ignored when the target job spec does not exist yet."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--reduce-dependencies",
+        action="store_true",
+        help=(
+            "Drop every task dependency another dependency of the same task already implies, e.g. a "
+            "model's edge to a grandparent's test when it also depends on the parent. Tasks wait for "
+            "the same upstream tasks; the job has fewer edges. Reports how many were removed on stderr."
+        ),
+    )
+    parser.add_argument(
+        "--coalesce-chains",
+        action="store_true",
+        help=(
+            "Merge every chain of model tasks, where each model is the only one depending on the previous "
+            "and depends on nothing else, into one task running a single `dbt run` over their exact "
+            "selectors. Saves a task startup and dbt parse per merged model without losing parallelism."
+        ),
+    )
+    parser.add_argument(
+        "--run-results",
+        type=str,
+        action="append",
+        help=(
+            "Optional dbt run_results.json, or JSON object of seconds per unique_id, giving how long each "
+            "node runs. Repeat to average several runs. Groups model tasks by duration: fast models on "
+            "the same path share a task up to --target-task-seconds, while slow models and models on the "
+            "critical path keep their own."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--target-task-seconds",
+        type=float,
+        help="Longest a group of models may run with --run-results (default: 600).",
+        required=False,
+        default=600.0,
+    )
+    parser.add_argument(
+        "--task-startup-seconds",
+        type=float,
+        help="Estimated compute startup plus dbt parse per task, weighed by --run-results grouping (default: 60).",
+        required=False,
+        default=60.0,
+    )
+    parser.add_argument(
+        "--max-parallel-tasks",
+        type=int,
+        help=(
+            "Optional cap on the tasks of the job that can run at once, e.g. what the SQL warehouse serves "
+            "without queueing. Adds the fewest ordering dependencies a critical-path-first schedule needs, "
+            "weighted by --run-results when given. A task also waits for its ordering dependency to succeed."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--partition-jobs",
+        action="store_true",
+        help=(
+            "Split a job that would exceed Databricks' 1,000-task limit into a chain of jobs, each within "
+            "the limit. Each job ends with a run_job_task that starts the next once all of its tasks have "
+            "succeeded; the extra jobs are keyed <job key>_part_<n>. A dry run prints each job's tasks."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        type=str,
+        help=(
+            "Optional path to write a JSON breakdown of generation by phase: wall time, peak traced and "
+            "resident memory, and work counts such as selectors proven. Use '-' for stderr. Tracing "
+            "memory slows generation, so compare timings only with timings."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--simulate",
+        type=str,
+        help=(
+            "Optional path to write a JSON simulation of a run of the generated job, or '-' for stderr: "
+            "makespan, critical path, idle slots and peak concurrency under Databricks' ready-queue "
+            "scheduling, for the generated test mode and the other one. Node durations come from "
+            "--run-results (unknown nodes take the median, or zero) plus --task-startup-seconds per task."
+        ),
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--simulate-max-concurrency",
+        type=int,
+        help="Optional cap on the tasks that run at once in --simulate (default: unlimited).",
         required=False,
         default=None,
     )
@@ -399,6 +765,47 @@ def parse_args():
     if not isinstance(args.extra_dbt_command_options, str):
         args.extra_dbt_command_options = "--"
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    if args.build_mode and args.bundle_tests:
+        parser.error("--build-mode and --bundle-tests are mutually exclusive")
+
+    if not args.bundle_tests and (
+        args.bundle_strategy != "parent" or args.max_bundle_tests is not None or args.max_bundle_seconds is not None
+    ):
+        parser.error("--bundle-strategy, --max-bundle-tests and --max-bundle-seconds require --bundle-tests")
+
+    if args.max_bundle_tests is not None and args.max_bundle_tests < 1:
+        parser.error("--max-bundle-tests must be at least 1")
+
+    if args.max_bundle_seconds is not None and (args.max_bundle_seconds <= 0 or not args.run_results):
+        parser.error("--max-bundle-seconds must be positive and requires --run-results")
+
+    if args.max_parallel_tasks is not None and args.max_parallel_tasks < 1:
+        parser.error("--max-parallel-tasks must be at least 1")
+
+    if args.simulate_max_concurrency is not None and args.simulate_max_concurrency < 1:
+        parser.error("--simulate-max-concurrency must be at least 1")
+
+    if args.target_task_seconds < 0 or args.task_startup_seconds < 0:
+        parser.error("--target-task-seconds and --task-startup-seconds cannot be negative")
+
+    try:
+        warehouses = _compute_pool(args.warehouse_id)
+        clusters = _compute_pool(args.job_cluster_key)
+    except ValueError as error:
+        parser.error(f"--warehouse_id and --job-cluster-key: {error}")
+    if len(warehouses) > 1 and len(clusters) > 1:
+        parser.error("several warehouses and several job clusters cannot be balanced at once; list only one")
+    args.warehouse_id = warehouses[0][0] if warehouses else None
+    args.job_cluster_key = clusters[0][0] if clusters else None
+    args.compute_targets = None
+    if len(warehouses) > 1:
+        args.compute_targets = [ComputeTarget(warehouse_id=name, capacity=share) for name, share in warehouses]
+    elif len(clusters) > 1:
+        args.compute_targets = [ComputeTarget(job_cluster_key=name, capacity=share) for name, share in clusters]
+
     if args.job_cluster_key and args.environment_key is not None:
         parser.error("--job-cluster-key and --environment-key are mutually exclusive")
 
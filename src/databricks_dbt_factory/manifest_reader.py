@@ -0,0 +1,303 @@
+import json
+import re
+from collections.abc import Callable, Iterator
+from typing import Any, TextIO
+
+from databricks_dbt_factory.dbt_node import DbtNode
+
+# The manifest sections `DbtFactory` reads. Everything else — `macros`, `docs`, `exposures`,
+# `semantic_models`, `parent_map`, ... — is stepped over without being decoded.
+_FACTORY_SECTIONS = frozenset({"nodes", "sources", "unit_tests"})
+
+# The fields of a `nodes`/`sources`/`unit_tests` entry that the factory reads, as a nested allow-list.
+# `None` keeps the whole value; a mapping keeps only the listed sub-fields of an object value. Fields a
+# node carries in bulk — `raw_code`, `compiled_code`, `columns`, `description`, the rest of `config` —
+# are dropped as soon as their entry is decoded.
+_FACTORY_ENTRY_FIELDS: dict[str, Any] = {
+    "unique_id": None,
+    "resource_type": None,
+    "name": None,
+    "package_name": None,
+    "fqn": None,
+    "original_file_path": None,
+    "version": None,
+    "source_name": None,
+    "model": None,
+    "attached_node": None,
+    "depends_on": {"nodes": None},
+    "config": {"enabled": None, "meta": {"databricks": None}},
+    "meta": {"databricks": None},
+    "test_metadata": {"name": None},
+}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# The unrolled form keeps long strings (compiled SQL runs to megabytes) inside one regex loop.
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# A run of container content up to the next bracket, with whole strings consumed so brackets inside
+# them are not counted. Matching it leaves the cursor on a bracket, an unterminated string, or the end.
+_CONTAINER_RUN = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+_SCALAR = re.compile(r"-?[0-9][0-9eE.+-]*|true|false|null")
+_DECODER = json.JSONDecoder()
+
+# Characters read per refill. The window only has to hold the value being decoded, so this bounds the
+# reader's working set rather than its throughput.
+_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class _ManifestSyntaxError(ValueError):
+    """Malformed JSON found while scanning, located by its character offset in the file."""
+
+
+class _ManifestScanner:
+    """
+    A forward-only cursor over a manifest file that decodes chosen values and steps over the rest.
+
+    The file is read in chunks into a sliding window; text before the cursor is dropped on every
+    refill, so memory holds the window and whatever the caller keeps, never the whole file. Stepping
+    over a value only tracks bracket depth and string boundaries, so a skipped section costs a regex
+    scan rather than the objects `json.load` would have built for it.
+
+    Every match that reaches the end of the window is retried after a refill: a string, number or
+    whitespace run cut by a chunk boundary must not be mistaken for a complete one.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.position = 0
+        self.offset = 0  # characters dropped from the front of the window
+        self.eof = False
+
+    def refill(self) -> bool:
+        """Drops consumed text and appends the next chunk; returns False at the end of the file."""
+        if self.eof:
+            return False
+        if self.position:
+            self.offset += self.position
+            self.text = self.text[self.position :]
+            self.position = 0
+        # Read at least as much as the window already holds, so a value spanning many chunks is
+        # retried a logarithmic rather than linear number of times.
+        chunk = self.file.read(max(self.chunk_size, len(self.text)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text += chunk
+        return True
+
+    def match(self, pattern: re.Pattern[str]) -> re.Match[str] | None:
+        """Matches `pattern` at the cursor, refilling until the match no longer touches the window's end."""
+        while True:
+            match = pattern.match(self.text, self.position)
+            if (match is not None and match.end() < len(self.text)) or not self.refill():
+                return match
+
+    def skip_whitespace(self) -> None:
+        """Advances past insignificant whitespace."""
+        match = self.match(_WHITESPACE)
+        assert match is not None  # `*` always matches
+        self.position = match.end()
+
+    def peek(self) -> str:
+        """The character at the cursor, or `""` at the end of the file."""
+        if self.position >= len(self.text):
+            self.refill()
+        return self.text[self.position : self.position + 1]
+
+    def expect(self, token: str, description: str) -> None:
+        """Consumes `token`, or raises naming what was expected."""
+        self.skip_whitespace()
+        if self.peek() != token:
+            raise self.error(f"Expecting {description}")
+        self.position += 1
+
+    def error(self, message: str) -> _ManifestSyntaxError:
+        """Builds a syntax error at the cursor."""
+        return _ManifestSyntaxError(f"{message} (char {self.offset + self.position})")
+
+    def members(self) -> Iterator[str]:
+        """
+        Yields each key of the object at the cursor, leaving the cursor on that key's value.
+
+        The caller must consume the value — `read_value` or `skip_value` — before asking for the next
+        key. The cursor ends just past the closing brace.
+        """
+        self.expect("{", "'{'")
+        self.skip_whitespace()
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            self.skip_whitespace()
+            key_match = self.match(_STRING)
+            if key_match is None:
+                raise self.error("Expecting property name enclosed in double quotes")
+            self.position = key_match.end()
+            key = key_match.group()
+            self.expect(":", "':' delimiter")
+            self.skip_whitespace()
+            yield key[1:-1] if "\\" not in key else json.loads(key)
+            self.skip_whitespace()
+            delimiter = self.peek()
+            if delimiter not in ("}", ","):
+                raise self.error("Expecting ',' delimiter")
+            self.position += 1
+            if delimiter == "}":
+                return
+
+    def read_value(self) -> Any:
+        """Decodes the value at the cursor with the C decoder, refilling until it is complete."""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.position)
+            except json.JSONDecodeError as error:
+                if self.refill():
+                    continue
+                raise _ManifestSyntaxError(f"{error.msg} (char {self.offset + error.pos})") from error
+            # A number ending at the window's edge may continue in the next chunk.
+            if end < len(self.text) or not self.refill():
+                self.position = end
+                return value
+
+    def skip_value(self) -> None:
+        """Advances past one complete value without decoding it."""
+        self.skip_whitespace()
+        first = self.peek()
+        if first in {"{", "["}:
+            self._skip_container()
+            return
+        match = self.match(_STRING if first == '"' else _SCALAR)
+        if match is None:
+            raise self.error("Expecting value")
+        self.position = match.end()
+
+    def _skip_container(self) -> None:
+        depth = 0
+        while True:
+            run = _CONTAINER_RUN.match(self.text, self.position)
+            assert run is not None  # `*` always matches
+            self.position = run.end()
+            token = self.text[self.position : self.position + 1]
+            if token in {"{", "["}:
+                depth += 1
+            elif token in {"}", "]"}:
+                depth -= 1
+            elif self.refill():
+                # The run stopped at the window's end or at a string the window cuts short.
+                continue
+            else:
+                raise self.error("Unterminated object, array or string")
+            self.position += 1
+            if depth == 0:
+                return
+
+
+def read_slim_dbt_manifest(path: str) -> dict:
+    """
+    Reads only the parts of a dbt manifest that job generation uses.
+
+    `read_dbt_manifest` decodes the whole file, and a large project's manifest — compiled SQL, docs,
+    macros, semantic models — grows several-fold as Python objects before the factory looks at three
+    of its sections. This reader streams the file once through a bounded window: other sections are
+    stepped over without being decoded, and each `nodes`, `sources` and `unit_tests` entry is decoded
+    on its own and trimmed at once to the fields in `_FACTORY_ENTRY_FIELDS`. Neither the file's text
+    nor an untrimmed section is ever held whole. The result has the manifest's own shape, so
+    `DbtFactory.create_tasks` consumes it unchanged.
+
+    Skipped sections are checked for balanced structure rather than decoded, so malformed JSON inside a
+    section the factory never reads goes unreported; malformed JSON in the sections it reads is refused.
+
+    Args:
+        path (str): Path to the manifest file.
+
+    Returns:
+        dict: The factory's sections of the manifest, each entry trimmed to the fields it uses.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not valid JSON, or is valid JSON that is not an object.
+    """
+    return _read_manifest(path, lambda _, entry: _trimmed(entry, _FACTORY_ENTRY_FIELDS))
+
+
+def read_dbt_manifest_nodes(path: str) -> dict[str, dict[str, DbtNode]]:
+    """
+    Reads the factory's sections of a dbt manifest as `DbtNode` records.
+
+    Streams the file like `read_slim_dbt_manifest`, but converts each `nodes`, `sources` and `unit_tests`
+    entry to its record as soon as it is decoded, so not even the trimmed dict outlives its entry.
+    A record holds its derived fields with interned strings and no per-instance dict, a fraction of
+    the entry's size. `DbtFactory.create_tasks` accepts the result in place of a manifest.
+
+    Args:
+        path (str): Path to the manifest file.
+
+    Returns:
+        dict[str, dict[str, DbtNode]]: The factory's sections, each mapping ids to records.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file is not valid JSON, is valid JSON that is not an object, or holds an
+            entry that is not an object.
+    """
+    return _read_manifest(path, _node_record)
+
+
+def _node_record(unique_id: str, entry: Any) -> DbtNode:
+    """Converts one decoded section entry to its record."""
+    if not isinstance(entry, dict):
+        raise _ManifestSyntaxError(f"Manifest entry {unique_id!r} must be a JSON object, got {type(entry).__name__}")
+    return DbtNode.from_manifest(unique_id, entry)
+
+
+def _read_manifest(path: str, build_entry: Callable[[str, Any], Any]) -> dict:
+    """Opens and scans a manifest, mapping the file's failures to the reader's documented errors."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return _read_manifest_file(file, path, build_entry)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Manifest file not found: {path}. Details: {e}") from e
+    except (_ManifestSyntaxError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Error parsing JSON from manifest file: {path}. Details: {e}") from e
+
+
+def _read_manifest_file(file: TextIO, path: str, build_entry: Callable[[str, Any], Any]) -> dict:
+    """Scans an open manifest, refusing anything but a single JSON object."""
+    scanner = _ManifestScanner(file, _CHUNK_SIZE)
+    scanner.skip_whitespace()
+    if scanner.peek() != "{":
+        # Not an object: decode it whole, which either fails to parse or names the type it found.
+        # Such a file is unusable either way, so the cost of decoding it does not matter.
+        manifest = json.loads(scanner.text + file.read())
+        raise ValueError(f"Manifest file {path} must contain a JSON object, got {type(manifest).__name__}.")
+    manifest = _read_factory_sections(scanner, build_entry)
+    scanner.skip_whitespace()
+    if scanner.peek():
+        raise scanner.error("Extra data")
+    return manifest
+
+
+def _read_factory_sections(scanner: _ManifestScanner, build_entry: Callable[[str, Any], Any]) -> dict:
+    """
+    Reads the top-level object, decoding the factory's sections entry by entry and skipping the rest.
+
+    Each decoded entry is passed through `build_entry` with its id before the next one is read.
+    """
+    manifest: dict = {}
+    for key in scanner.members():
+        if key not in _FACTORY_SECTIONS:
+            scanner.skip_value()
+        elif scanner.peek() == "{":
+            manifest[key] = {entry_key: build_entry(entry_key, scanner.read_value()) for entry_key in scanner.members()}
+        else:
+            manifest[key] = scanner.read_value()
+    return manifest
+
+
+def _trimmed(value: Any, fields: dict[str, Any] | None) -> Any:
+    """Keeps only `fields` of an object value, recursively; any other value is kept whole."""
+    if fields is None or not isinstance(value, dict):
+        return value
+    return {key: _trimmed(item, fields[key]) for key, item in value.items() if key in fields}
@@ -0,0 +1,94 @@
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows has no `resource` module
+    resource = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class PhaseTiming:
+    """
+    One measured phase of job generation.
+
+    `peak_traced_bytes` is the peak of Python allocations during the phase, and is only known while
+    `tracemalloc` is tracing: starting it is the caller's choice, as it slows generation severalfold.
+    `max_rss_bytes` is the process's peak resident set size so far, so it only grows from phase to phase;
+    it is unknown where the platform does not report it.
+    """
+
+    name: str
+    wall_seconds: float
+    peak_traced_bytes: int | None = None
+    max_rss_bytes: int | None = None
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+PhaseListener = Callable[[PhaseTiming], None]
+
+
+@contextmanager
+def timed_phase(listener: PhaseListener | None, name: str) -> Iterator[dict[str, int]]:
+    """
+    Measures the enclosed block and reports it to `listener` as the phase `name`.
+
+    Yields the phase's counts for the block to fill in. Without a listener nothing is measured, so an
+    unobserved run pays only for the dictionary. A block that raises is not reported.
+
+    Args:
+        listener (PhaseListener | None): Receives the finished phase.
+        name (str): The phase's name.
+    """
+    counts: dict[str, int] = {}
+    if listener is None:
+        yield counts
+        return
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    yield counts
+    wall_seconds = time.perf_counter() - start
+    listener(
+        PhaseTiming(
+            name,
+            wall_seconds,
+            tracemalloc.get_traced_memory()[1] if tracing else None,
+            _max_rss_bytes(),
+            counts,
+        )
+    )
+
+
+def _max_rss_bytes() -> int | None:
+    """The process's peak resident set size, which Linux reports in KiB and macOS in bytes."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class PhaseRecorder:
+    """A `PhaseListener` that keeps every phase, in order, for a machine-readable report."""
+
+    def __init__(self):
+        self.phases: list[PhaseTiming] = []
+
+    def __call__(self, timing: PhaseTiming) -> None:
+        self.phases.append(timing)
+
+    def to_json(self) -> str:
+        """The recorded phases as a JSON document: `{"phases": [...], "total_seconds": ...}`."""
+        return json.dumps(
+            {
+                "phases": [asdict(phase) for phase in self.phases],
+                "total_seconds": sum(phase.wall_seconds for phase in self.phases),
+            },
+            indent=2,
+        )
@@ -0,0 +1,69 @@
+import json
+import math
+from collections.abc import Iterable
+
+# Results dbt did not execute, whose `execution_time` says nothing about how long the node takes.
+_UNEXECUTED_STATUSES = frozenset({"skipped"})
+
+
+def read_node_durations(paths: Iterable[str]) -> dict[str, float]:
+    """
+    Reads how long each dbt node takes to run, averaged over one or more timing files.
+
+    Each file is either a dbt `run_results.json`, whose `results` carry each executed node's
+    `unique_id` and `execution_time`, or an aggregated timing file: a JSON object mapping `unique_id`s
+    to seconds. A node observed in several files, or several times in one, gets the mean of its
+    observations; skipped results are ignored.
+
+    Args:
+        paths (Iterable[str]): Paths to the timing files.
+
+    Returns:
+        dict[str, float]: Mean execution seconds per node `unique_id`.
+
+    Raises:
+        FileNotFoundError: If a file does not exist.
+        ValueError: If a file is not valid JSON, or is neither of the two shapes.
+    """
+    totals: dict[str, float] = {}
+    observations: dict[str, int] = {}
+    for path in paths:
+        for unique_id, seconds in _durations_in(path):
+            totals[unique_id] = totals.get(unique_id, 0.0) + seconds
+            observations[unique_id] = observations.get(unique_id, 0) + 1
+    return {unique_id: total / observations[unique_id] for unique_id, total in totals.items()}
+
+
+def _durations_in(path: str) -> list[tuple[str, float]]:
+    """The `(unique_id, seconds)` observations of one timing file, raising as `read_node_durations` does."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            content = json.load(file)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Timing file not found: {path}. Details: {e}") from e
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Error parsing JSON from timing file: {path}. Details: {e}") from e
+    if not isinstance(content, dict):
+        raise ValueError(
+            f"Timing file {path} must be a dbt run_results.json or a JSON object of seconds per unique_id."
+        )
+    if isinstance(content.get("results"), list):
+        observed = [
+            (result.get("unique_id"), result.get("execution_time"))
+            for result in content["results"]
+            if isinstance(result, dict) and result.get("status") not in _UNEXECUTED_STATUSES
+        ]
+    else:
+        observed = list(content.items())
+    for unique_id, seconds in observed:
+        if not isinstance(unique_id, str) or not _is_duration(seconds):
+            raise ValueError(
+                f"Timing file {path} has no usable duration for {unique_id!r}: expected a unique_id with "
+                f"non-negative seconds, got {seconds!r}."
+            )
+    return observed
+
+
+def _is_duration(value: object) -> bool:
+    """Whether `value` is a finite, non-negative JSON number of seconds."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value >= 0
@@ -0,0 +1,139 @@
+import hashlib
+import json
+from collections.abc import Callable, Iterable
+from operator import attrgetter
+from pathlib import Path
+
+from databricks_dbt_factory.__version__ import __version__
+from databricks_dbt_factory.dbt_node import DbtNode
+from databricks_dbt_factory.file_io import atomic_write_bytes
+
+# Bumped whenever the entry layout or what a fingerprint covers changes, so an old file is discarded.
+_FORMAT = 2
+_CACHE_FILE_NAME = "selector-cache.json"
+
+_FIELD_NAMES: tuple[str, ...] = DbtNode.__slots__  # pylint: disable=no-member
+_record_fields = attrgetter(*_FIELD_NAMES)
+_FILE_TERMS_POSITION = _FIELD_NAMES.index("file_terms")
+
+# One recorded read of the selector index: the bucket kind, its key, and the bucket's fingerprint.
+Read = tuple[str, str, str]
+
+
+def _digest(parts: Iterable[str]) -> str:
+    """A stable digest of `parts`; unlike `hash`, it does not change between interpreter runs."""
+    return hashlib.blake2b("\0".join(parts).encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def _record_fingerprint(info: DbtNode) -> str:
+    """
+    A digest of every field of a record.
+
+    Every field feeds selection somewhere — the selector terms, the exactness predicates, the
+    test-to-parent index — so none is left out. `file_terms` is sorted, since a frozenset's iteration
+    order follows string hashes, which are salted per interpreter run.
+    """
+    fields = list(_record_fields(info))
+    fields[_FILE_TERMS_POSITION] = sorted(fields[_FILE_TERMS_POSITION])
+    return _digest((repr(fields),))
+
+
+class SelectorCache:
+    """
+    Proven selectors and selection plans persisted across generation runs.
+
+    Proving a selector exact — `_node_select` with `_assert_exact` for a resource, `_test_selection_plan`
+    for a test — dominates generation on a large manifest, and in CI nearly every node is unchanged
+    between runs. Each proof is stored with the fingerprints of what it depended on: the node's own
+    record (and, for a test, its parents' records), plus every selector-index bucket the proof read,
+    keyed by bucket. A bucket holds every peer a selector term could match, so a proof is a function of
+    the records in the buckets it read; when all of them fingerprint the same in a later run, the stored
+    result is reused without re-proving. Anything else — a changed node, a new peer sharing its file or
+    fqn prefix, a removed test — changes a fingerprint and forces a fresh proof.
+
+    Failed proofs are never stored, so a refused node raises its usual error on every run.
+
+    The cache is one JSON file in `directory`, written atomically by `save`. Entries not used for the
+    longest are evicted beyond `max_entries`. A missing, unreadable or outdated file — written by another
+    format or package version — is treated as empty: the cache can only save time, never fail a run.
+    """
+
+    def __init__(self, directory: str | Path, max_entries: int = 100_000):
+        """
+        Args:
+            directory (str | Path): The cache directory; created on first `save`.
+            max_entries (int): How many proofs to keep. Each is a few hundred bytes on disk.
+
+        Raises:
+            ValueError: If `max_entries` is not positive.
+        """
+        if max_entries < 1:
+            raise ValueError(f"The selector cache must hold at least one entry, got max_entries={max_entries}.")
+        self.path = Path(directory) / _CACHE_FILE_NAME
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._run, self._entries = self._load(self.path)
+        self._run += 1
+
+    @staticmethod
+    def _load(path: Path) -> tuple[int, dict[str, dict]]:
+        """Reads the cache file, or starts empty when it is absent, unreadable or outdated."""
+        try:
+            content = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return 0, {}
+        if (
+            not isinstance(content, dict)
+            or content.get("format") != _FORMAT
+            or content.get("version") != __version__
+            or not isinstance(content.get("entries"), dict)
+            or not isinstance(content.get("run"), int)
+        ):
+            return 0, {}
+        return content["run"], content["entries"]
+
+    def lookup(self, key: str, fingerprint: str, current: Callable[[str, str], str]) -> tuple[str, str] | None:
+        """
+        Returns the stored `(select, indirect_selection)` for `key` if nothing it depended on changed.
+
+        Args:
+            key (str): The proof's key, e.g. `plan:<unique_id>`.
+            fingerprint (str): The fingerprint of the node's own inputs in this run.
+            current (Callable[[str, str], str]): Fingerprints a selector-index bucket, by kind and key, in
+                this run.
+
+        Returns:
+            tuple[str, str] | None: The stored result, or None on a miss.
+        """
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and all(current(kind, bucket) == bucket_fingerprint for kind, bucket, bucket_fingerprint in entry["reads"])
+        ):
+            entry["used"] = self._run
+            self.hits += 1
+            return entry["select"], entry["indirect_selection"]
+        self.misses += 1
+        return None
+
+    def store(self, key: str, fingerprint: str, reads: list[Read], select: str, indirect_selection: str) -> None:
+        """Records a successful proof and the fingerprints of everything it read."""
+        self._entries[key] = {
+            "fingerprint": fingerprint,
+            "reads": [list(read) for read in reads],
+            "select": select,
+            "indirect_selection": indirect_selection,
+            "used": self._run,
+        }
+
+    def save(self) -> None:
+        """Writes the cache atomically, keeping the `max_entries` most recently used proofs."""
+        entries = self._entries
+        if len(entries) > self.max_entries:
+            kept = sorted(entries, key=lambda key: entries[key]["used"], reverse=True)[: self.max_entries]
+            entries = {key: entries[key] for key in kept}
+            self._entries = entries
+        content = {"format": _FORMAT, "version": __version__, "run": self._run, "entries": entries}
+        atomic_write_bytes(self.path, json.dumps(content, separators=(",", ":")).encode("utf-8"), 0o644)
@@ -0,0 +1,147 @@
+import heapq
+import json
+import statistics
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class SimulationReport:
+    """
+    How a simulated job run went.
+
+    `critical_path` is the chain of tasks that determined the makespan, first task first: each task's
+    predecessor is the dependency it waited for last or, when it was ready but every slot was taken,
+    the task whose finish freed its slot. `idle_slot_seconds` is the slot time no task used between
+    the start and the end of the run, over `max_concurrent_tasks` slots or, without a cap, over as many
+    as ever ran at once.
+    """
+
+    tasks: int
+    makespan_seconds: float
+    critical_path: list[str]
+    busy_seconds: float
+    idle_slot_seconds: float
+    peak_concurrency: int
+    max_concurrent_tasks: int | None
+
+    def to_json(self) -> str:
+        """The report as a JSON document."""
+        return json.dumps(asdict(self), indent=2)
+
+
+def estimate_task_seconds(
+    task_nodes: Mapping[str, Iterable[str]],
+    node_durations: Mapping[str, float],
+    default_node_seconds: float | None = None,
+) -> dict[str, float]:
+    """
+    Estimates each task's run time, without its startup, as the sum of the durations of the nodes it runs.
+
+    Args:
+        task_nodes (Mapping[str, Iterable[str]]): The node `unique_id`s each task runs, by task key (see
+            `DbtFactory.task_nodes`).
+        node_durations (Mapping[str, float]): Seconds per node `unique_id` (see
+            `run_results.read_node_durations`).
+        default_node_seconds (float | None): The duration of a node without one. Defaults to the median
+            of `node_durations`, or zero when it is empty.
+
+    Returns:
+        dict[str, float]: Estimated seconds per task key.
+    """
+    if default_node_seconds is None:
+        default_node_seconds = statistics.median(node_durations.values()) if node_durations else 0.0
+    return {
+        task_key: sum(node_durations.get(node, default_node_seconds) for node in nodes)
+        for task_key, nodes in task_nodes.items()
+    }
+
+
+def simulate_job(
+    tasks: list[dict],
+    task_seconds: Mapping[str, float],
+    max_concurrent_tasks: int | None = None,
+    task_startup_seconds: float = 60.0,
+) -> SimulationReport:
+    """
+    Simulates a run of a job's tasks under Databricks' ready-queue scheduling, without running anything.
+
+    A task becomes ready once every task it depends on has finished, and starts as soon as a slot is
+    free; ready tasks wait in the order they became ready, ties broken by their order in `tasks`. Each
+    task then runs for `task_startup_seconds` plus its `task_seconds`. Every task is assumed to succeed.
+
+    Args:
+        tasks (list[dict]): Task dictionaries, as returned by `DbtFactory.create_tasks`.
+        task_seconds (Mapping[str, float]): Each task's run time without its startup, by task key (see
+            `estimate_task_seconds`); a task without one takes no time beyond its startup.
+        max_concurrent_tasks (int | None): The most tasks that run at once; unlimited when None.
+        task_startup_seconds (float): What starting a task costs: compute startup plus dbt's parse.
+
+    Returns:
+        SimulationReport: The simulated run.
+
+    Raises:
+        ValueError: If `max_concurrent_tasks` is not positive, or the tasks depend on a missing task or
+            form a cycle.
+    """
+    if max_concurrent_tasks is not None and max_concurrent_tasks < 1:
+        raise ValueError(f"A job runs at least one task at a time, got max_concurrent_tasks={max_concurrent_tasks}.")
+    keys = [task["task_key"] for task in tasks]
+    position = {task_key: index for index, task_key in enumerate(keys)}
+    dependents: list[list[int]] = [[] for _ in keys]
+    pending = [0] * len(keys)
+    for index, task in enumerate(tasks):
+        for dependency in dict.fromkeys(item["task_key"] for item in task.get("depends_on") or []):
+            if dependency not in position:
+                raise ValueError(f"Task {keys[index]!r} depends on {dependency!r}, which is not in the job.")
+            dependents[position[dependency]].append(index)
+            pending[index] += 1
+    duration = [task_startup_seconds + task_seconds.get(task_key, 0.0) for task_key in keys]
+
+    # Ready tasks by (ready time, order); running tasks by (finish time, order).
+    ready = [(0.0, index) for index, count in enumerate(pending) if count == 0]
+    heapq.heapify(ready)
+    running: list[tuple[float, int]] = []
+    finish = [0.0] * len(keys)
+    predecessor: list[int | None] = [None] * len(keys)
+    last_ready_by: list[int | None] = [None] * len(keys)
+    finished, peak, now = 0, 0, 0.0
+    freed_by: int | None = None
+    while ready or running:
+        while ready and (max_concurrent_tasks is None or len(running) < max_concurrent_tasks):
+            ready_at, index = heapq.heappop(ready)
+            start = max(now, ready_at)
+            # A task that waited past its readiness waited for the slot the last finished task freed.
+            predecessor[index] = freed_by if start > ready_at else last_ready_by[index]
+            finish[index] = start + duration[index]
+            heapq.heappush(running, (finish[index], index))
+        peak = max(peak, len(running))
+        now, index = heapq.heappop(running)
+        freed_by = index
+        finished += 1
+        for dependent in dependents[index]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                last_ready_by[dependent] = index
+                heapq.heappush(ready, (now, dependent))
+    if finished < len(keys):
+        raise ValueError("Task dependencies form a cycle, so the job cannot run.")
+
+    makespan = max(finish, default=0.0)
+    critical_path: list[str] = []
+    step = max(range(len(keys)), key=finish.__getitem__, default=None)
+    while step is not None:
+        critical_path.append(keys[step])
+        step = predecessor[step]
+    critical_path.reverse()
+    busy = sum(duration)
+    slots = max_concurrent_tasks if max_concurrent_tasks is not None else peak
+    return SimulationReport(
+        tasks=len(keys),
+        makespan_seconds=makespan,
+        critical_path=critical_path,
+        busy_seconds=busy,
+        idle_slot_seconds=max(slots * makespan - busy, 0.0),
+        peak_concurrency=peak,
+        max_concurrent_tasks=max_concurrent_tasks,
+    )
@@ -2,6 +2,7 @@ import shlex
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
 
+from databricks_dbt_factory.dbt_node import DbtNode, to_dbt_node
 from databricks_dbt_factory.dbt_task import DbtTask, DbtTaskOptions
 from databricks_dbt_factory.utils import DYNAMIC_VALUE_REFERENCE
 
@@ -33,6 +34,13 @@ _EXTRA_DBT_PARSE_CONTEXT_REMEDIES = {
 }
 
 
+def _check_indirect_selection_modes(selects_by_indirect_selection: dict[str, list[str]]) -> None:
+    """Rejects test selector groups under a mode other than the two exact selection plans use."""
+    unsupported_modes = set(selects_by_indirect_selection) - {"empty", "cautious"}
+    if unsupported_modes:
+        raise ValueError(f"Unsupported dbt indirect-selection modes: {', '.join(sorted(unsupported_modes))}.")
+
+
 def _reserved_short_option(token: str, reserved_options: frozenset[str]) -> str | None:
     """Returns a reserved option embedded in one dbt short-option token."""
     if not token.startswith("-") or token.startswith("--"):
@@ -161,18 +169,18 @@ def validate_extra_dbt_options(dbt_options: str) -> None:
 
 class DbtDependencyResolver:
     @staticmethod
-    def resolve(node_info: dict, task_keys: dict[str, str]) -> list[str]:
+    def resolve(node_info: DbtNode | dict, task_keys: dict[str, str]) -> list[str]:
         """
         Resolves every scheduled direct dbt dependency to its Databricks task key.
 
         Args:
-            node_info (dict): The dbt manifest entry for the node.
+            node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
             task_keys (dict[str, str]): Effective task key per scheduled dbt dependency.
 
         Returns:
             list[str]: Resolved upstream task keys.
         """
-        deps = node_info.get("depends_on", {}).get("nodes", [])
+        deps = to_dbt_node(node_info).depends_on
         resolved_deps = []
         for node_full_name in deps:
             task_key = task_keys.get(node_full_name)
@@ -209,7 +217,12 @@ class TaskFactory(ABC):
 
     @abstractmethod
     def create_task(
-        self, select: str, deps_command_name: str, dbt_node_info: dict, task_key: str, task_keys: dict[str, str]
+        self,
+        select: str,
+        deps_command_name: str,
+        dbt_node_info: DbtNode | dict,
+        task_key: str,
+        task_keys: dict[str, str],
     ) -> DbtTask:
         """
         Abstract method to create a task.
@@ -218,7 +231,7 @@ class TaskFactory(ABC):
             select (str): dbt `--select` argument identifying the node (its full dot-joined FQN).
             deps_command_name (str): Bare node name used by `get_dbt_deps_command` to decide whether
                 to prepend `dbt deps` (matched against `--dbt-tasks-deps`).
-            dbt_node_info (dict): Information about the DBT node.
+            dbt_node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
             task_key (str): Key for the task.
             task_keys (dict[str, str]): Task key per dbt node, for resolving dependencies.
 
@@ -239,6 +252,48 @@ class TaskFactory(ABC):
             return self._build_dbt_command("deps")
         return None
 
+    def create_build_task(
+        self,
+        select: str,
+        deps_command_name: str,
+        dbt_node_info: DbtNode | dict,
+        task_key: str,
+        task_keys: dict[str, str],
+        test_selects_by_indirect_selection: dict[str, list[str]],
+    ) -> DbtTask:
+        """
+        Creates one task that builds a resource and runs an exact set of its tests with `dbt build`.
+
+        The resource's selector and the tests' direct (`empty`) selectors form one `dbt build` union under
+        `--indirect-selection empty`, so dbt builds the resource, runs its tests, and fails the task when
+        one fails. Parent-scoped (`cautious`) selectors follow in a `dbt test`: under `cautious`, the
+        resource's own selector would pull in every test attached to it alone.
+
+        Args:
+            select (str): dbt `--select` argument identifying the node (its full dot-joined FQN).
+            deps_command_name (str): Bare node name used to decide whether to prepend `dbt deps`.
+            dbt_node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
+            task_key (str): Key for the task.
+            task_keys (dict[str, str]): Task key per dbt node, for resolving dependencies.
+            test_selects_by_indirect_selection (dict[str, list[str]]): Exact test selectors grouped by
+                the indirect-selection mode required by their selection plans.
+
+        Returns:
+            DbtTask: An instance of Task.
+        """
+        _check_indirect_selection_modes(test_selects_by_indirect_selection)
+        depends_on = self.resolver.resolve(dbt_node_info, task_keys)
+
+        dbt_deps = self.get_dbt_deps_command(deps_command_name)
+        commands = [dbt_deps] if dbt_deps else []
+        selects = [select, *sorted(test_selects_by_indirect_selection.get("empty", []))]
+        commands.append(self._build_dbt_command("build", select=selects, indirect_selection="empty"))
+        if "cautious" in test_selects_by_indirect_selection:
+            cautious_selects = sorted(test_selects_by_indirect_selection["cautious"])
+            commands.append(self._build_dbt_command("test", select=cautious_selects, indirect_selection="cautious"))
+
+        return DbtTask(task_key, commands, self.task_options, depends_on)
+
     def _build_dbt_command(
         self,
         subcommand: str,
@@ -276,7 +331,12 @@ class ModelTaskFactory(TaskFactory):
     """Factory for creating model tasks."""
 
     def create_task(
-        self, select: str, deps_command_name: str, dbt_node_info: dict, task_key: str, task_keys: dict[str, str]
+        self,
+        select: str,
+        deps_command_name: str,
+        dbt_node_info: DbtNode | dict,
+        task_key: str,
+        task_keys: dict[str, str],
     ) -> DbtTask:
         """
         Creates a model task.
@@ -284,7 +344,7 @@ class ModelTaskFactory(TaskFactory):
         Args:
             select (str): dbt `--select` argument identifying the node (its full dot-joined FQN).
             deps_command_name (str): Bare node name used to decide whether to prepend `dbt deps`.
-            dbt_node_info (dict): Information about the DBT node.
+            dbt_node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
             task_key (str): Key for the task.
             task_keys (dict[str, str]): Task key per dbt node, for resolving dependencies.
 
@@ -299,12 +359,46 @@ class ModelTaskFactory(TaskFactory):
 
         return DbtTask(task_key, commands, self.task_options, depends_on)
 
+    def create_chained_task(
+        self,
+        task_key: str,
+        selects: list[str],
+        deps_command_names: list[str],
+        depends_on: list[str],
+    ) -> DbtTask:
+        """
+        Creates one Databricks task that runs a chain, or any connected group, of models with a single `dbt run`.
+
+        Each model keeps its exact selector, passed as a repeated `--select`, so the union selects exactly
+        the group; dbt runs the selected models in dependency order and skips a failed model's
+        dependents.
+
+        Args:
+            task_key (str): Key for the chained task.
+            selects (list[str]): The exact selector of each model in the group, upstream first.
+            deps_command_names (list[str]): The models' names; `dbt deps` is prepended if any of them needs it.
+            depends_on (list[str]): Upstream task keys the chain's first model waits for.
+
+        Returns:
+            DbtTask: An instance of Task.
+        """
+        dbt_deps = next(filter(None, map(self.get_dbt_deps_command, deps_command_names)), None)
+        commands = [dbt_deps] if dbt_deps else []
+        commands.append(self._build_dbt_command("run", select=selects))
+
+        return DbtTask(task_key, commands, self.task_options, depends_on)
+
 
 class SnapshotTaskFactory(TaskFactory):
     """Factory for creating snapshot tasks."""
 
     def create_task(
-        self, select: str, deps_command_name: str, dbt_node_info: dict, task_key: str, task_keys: dict[str, str]
+        self,
+        select: str,
+        deps_command_name: str,
+        dbt_node_info: DbtNode | dict,
+        task_key: str,
+        task_keys: dict[str, str],
     ) -> DbtTask:
         """
         Creates a snapshot task.
@@ -312,7 +406,7 @@ class SnapshotTaskFactory(TaskFactory):
         Args:
             select (str): dbt `--select` argument identifying the node (its full dot-joined FQN).
             deps_command_name (str): Bare node name used to decide whether to prepend `dbt deps`.
-            dbt_node_info (dict): Information about the DBT node.
+            dbt_node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
             task_key (str): Key for the task.
             task_keys (dict[str, str]): Task key per dbt node, for resolving dependencies.
 
@@ -332,7 +426,12 @@ class SeedTaskFactory(TaskFactory):
     """Factory for creating seed tasks."""
 
     def create_task(
-        self, select: str, deps_command_name: str, dbt_node_info: dict, task_key: str, task_keys: dict[str, str]
+        self,
+        select: str,
+        deps_command_name: str,
+        dbt_node_info: DbtNode | dict,
+        task_key: str,
+        task_keys: dict[str, str],
     ) -> DbtTask:
         """
         Creates a seed task.
@@ -340,7 +439,7 @@ class SeedTaskFactory(TaskFactory):
         Args:
             select (str): dbt `--select` argument identifying the node (its full dot-joined FQN).
             deps_command_name (str): Bare node name used to decide whether to prepend `dbt deps`.
-            dbt_node_info (dict): Information about the DBT node.
+            dbt_node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
             task_key (str): Key for the task.
             task_keys (dict[str, str]): Task key per dbt node, for resolving dependencies.
 
@@ -363,7 +462,7 @@ class TestTaskFactory(TaskFactory):
         self,
         select: str,
         deps_command_name: str,
-        dbt_node_info: dict,
+        dbt_node_info: DbtNode | dict,
         task_key: str,
         task_keys: dict[str, str],
         indirect_selection: str = "empty",
@@ -374,7 +473,7 @@ class TestTaskFactory(TaskFactory):
         Args:
             select (str): dbt `--select` argument identifying the node (its full dot-joined FQN).
             deps_command_name (str): Bare node name used to decide whether to prepend `dbt deps`.
-            dbt_node_info (dict): Information about the DBT node.
+            dbt_node_info (DbtNode | dict): The node's record, or its dbt manifest entry.
             task_key (str): Key for the task.
             task_keys (dict[str, str]): Task key per dbt node, for resolving dependencies.
             indirect_selection (str): dbt indirect-selection mode required by the selection plan.
@@ -396,7 +495,7 @@ class TestTaskFactory(TaskFactory):
         self,
         task_key: str,
         selects_by_indirect_selection: dict[str, list[str]],
-        deps_command_name: str,
+        deps_command_name: str | Sequence[str],
         depends_on: list[str],
     ) -> DbtTask:
         """
@@ -410,17 +509,17 @@ class TestTaskFactory(TaskFactory):
             task_key (str): Key for the bundled task.
             selects_by_indirect_selection (dict[str, list[str]]): Exact test selectors grouped by
                 the indirect-selection mode required by their selection plans.
-            deps_command_name (str): Name used by `get_dbt_deps_command` to decide whether to prepend `dbt deps`.
+            deps_command_name (str | Sequence[str]): Name, or names of the tested resources, used by
+                `get_dbt_deps_command` to decide whether to prepend `dbt deps`; it is if any of them needs it.
             depends_on (list[str]): Upstream task keys this bundled task should gate on.
 
         Returns:
             DbtTask: An instance of Task.
         """
-        dbt_deps = self.get_dbt_deps_command(deps_command_name)
+        names = [deps_command_name] if isinstance(deps_command_name, str) else deps_command_name
+        dbt_deps = next(filter(None, map(self.get_dbt_deps_command, names)), None)
         commands = [dbt_deps] if dbt_deps else []
-        unsupported_modes = set(selects_by_indirect_selection) - {"empty", "cautious"}
-        if unsupported_modes:
-            raise ValueError(f"Unsupported dbt indirect-selection modes: {', '.join(sorted(unsupported_modes))}.")
+        _check_indirect_selection_modes(selects_by_indirect_selection)
         for indirect_selection in ("empty", "cautious"):
             if indirect_selection not in selects_by_indirect_selection:
                 continue
@@ -1,7 +1,9 @@
 import hashlib
+import heapq
 import json
 import re
-from collections.abc import Iterable
+from collections.abc import Collection, Iterable
+from itertools import chain
 
 # Databricks substitutes complete dynamic value references in task string fields before execution.
 DYNAMIC_VALUE_REFERENCE = re.compile(r"\{\{[^{}]+\}\}")
@@ -102,6 +104,25 @@ def bundled_test_key(unique_id: str) -> str:
     return f"{_resource_name(unique_id)}_test"
 
 
+def grouped_test_key(label: str) -> str:
+    """
+    Key for a task bundling the tests grouped under `label` — a file, directory or package — with each run
+    of characters a task key cannot hold turned into one underscore:
+    `models/staging/schema.yml` -> `models_staging_schema_yml_test`.
+    """
+    return f"{re.sub(r'[^A-Za-z0-9_-]+', '_', label).strip('_') or 'root'}_test"
+
+
+def reserve_task_keys(candidates: Iterable[str], taken: Iterable[str]) -> list[str]:
+    """
+    A unique key within the length limit for each of `candidates`, in order, none of them in `taken`.
+
+    A free candidate is kept as is; a taken one gets the numeric suffix `build_task_key_maps` falls back to.
+    """
+    reserved = set(taken)
+    return [_reserve(candidate, reserved) for candidate in candidates]
+
+
 def build_task_key_maps(
     task_ids: Iterable[str], bundled_test_ids: Iterable[str] = ()
 ) -> tuple[dict[str, str], dict[str, str]]:
@@ -227,6 +248,289 @@ def _hashed_test_key(test_name: str, test_hash: str) -> str:
     return test_name[: MAX_TASK_KEY_LENGTH - len(tail)] + tail
 
 
+def transitive_reduction(dependencies: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    Drops every dependency another dependency of the same task already implies.
+
+    A task that depends on `a` and on `b`, where `b` already (transitively) depends on `a`, cannot
+    start before `a` finishes either way, so its edge to `a` is redundant. Removing every such edge
+    leaves the smallest graph with the same reachability. Tasks are visited in topological order,
+    each carrying the set of its ancestors as an integer bitset: a dependency is redundant exactly
+    when it is an ancestor of a later-visited dependency of the same task. With `E` edges over `N`
+    tasks this is `O(E * N / 64)` word operations.
+
+    Args:
+        dependencies (dict[str, list[str]]): Each task's direct dependencies. A dependency that is
+            not itself a key is treated as a task with none.
+
+    Returns:
+        dict[str, list[str]]: The same tasks, each keeping its non-redundant dependencies in their
+        original order, without duplicates.
+
+    Raises:
+        ValueError: If the dependencies form a cycle.
+    """
+    keys = list(dict.fromkeys(chain(dependencies, chain.from_iterable(dependencies.values()))))
+    position = {key: index for index, key in enumerate(keys)}
+    direct = [[position[dependency] for dependency in dict.fromkeys(dependencies.get(key, []))] for key in keys]
+    order = _topological_order(direct)
+    if len(order) < len(keys):
+        raise ValueError("Task dependencies form a cycle, so they have no transitive reduction.")
+
+    rank = {index: ordinal for ordinal, index in enumerate(order)}
+    ancestors = [0] * len(keys)
+    redundant: list[set[int]] = [set() for _ in keys]
+    for index in order:
+        covered = 0
+        # Latest first: every dependency that could imply this one has then been seen.
+        for dependency in sorted(direct[index], key=rank.__getitem__, reverse=True):
+            if covered >> dependency & 1:
+                redundant[index].add(dependency)
+            covered |= ancestors[dependency] | 1 << dependency
+        ancestors[index] = covered
+    return {
+        key: [keys[dependency] for dependency in direct[position[key]] if dependency not in redundant[position[key]]]
+        for key in dependencies
+    }
+
+
+def partition_tasks(dependencies: dict[str, list[str]], capacity: int) -> list[list[str]]:
+    """
+    Splits a task DAG into consecutive groups of at most `capacity` tasks, to run as a chain of jobs.
+
+    Every task lands after all of its dependencies, so a group only depends on earlier groups and a job
+    chain that starts each job once the previous one has finished keeps every ordering constraint. A
+    chain runs its jobs one after the other, so its wall time is the sum of each job's longest path.
+    Tasks are therefore placed level by level, where a task's level is the latest it can run without
+    lengthening the critical path: the groups then tile the DAG's depth, and the critical path crosses
+    as few groups as the task count allows. Running a task as late as possible also puts it next to its
+    dependents, and each level is ordered by where its tasks' dependencies were placed, so neighbouring
+    tasks share a group and few edges cross between groups. With `E` edges over `N` tasks this is
+    `O(E + N log N)`.
+
+    Args:
+        dependencies (dict[str, list[str]]): Each task's direct dependencies. A dependency that is
+            not itself a key is ignored, as it cannot be placed.
+        capacity (int): The most tasks a group holds.
+
+    Returns:
+        list[list[str]]: The groups, in the order they must run, each listing its tasks in the order
+        of `dependencies`. A single group when every task fits in one.
+
+    Raises:
+        ValueError: If `capacity` is not positive or the dependencies form a cycle.
+    """
+    if capacity < 1:
+        raise ValueError(f"A job needs room for at least one task, got capacity={capacity}.")
+    keys = list(dependencies)
+    if len(keys) <= capacity:
+        return [keys]
+    position = {key: index for index, key in enumerate(keys)}
+    direct = [
+        [position[dependency] for dependency in dict.fromkeys(dependencies[key]) if dependency in position]
+        for key in keys
+    ]
+    order = _topological_order(direct)
+    if len(order) < len(keys):
+        raise ValueError("Task dependencies form a cycle, so they cannot be split into chained jobs.")
+
+    # Height: the longest path from a task down to a sink. The latest level a task can take is the DAG's
+    # depth less its height, which keeps every dependency on an earlier level.
+    dependents: list[list[int]] = [[] for _ in keys]
+    for index, task_dependencies in enumerate(direct):
+        for dependency in task_dependencies:
+            dependents[dependency].append(index)
+    height = [0] * len(keys)
+    for index in reversed(order):
+        height[index] = 1 + max((height[dependent] for dependent in dependents[index]), default=0)
+    depth = max(height)
+    levels: list[list[int]] = [[] for _ in range(depth)]
+    for index in range(len(keys)):
+        levels[depth - height[index]].append(index)
+
+    placed = [0] * len(keys)
+    sequence: list[int] = []
+    for level in levels:
+        # Tasks whose dependencies were placed earliest come first; tasks without any keep their order.
+        level.sort(key=lambda index: min((placed[dependency] for dependency in direct[index]), default=-1))
+        for index in level:
+            placed[index] = len(sequence)
+            sequence.append(index)
+    groups = [sorted(sequence[start : start + capacity]) for start in range(0, len(sequence), capacity)]
+    return [[keys[index] for index in group] for group in groups]
+
+
+def limit_concurrency(
+    dependencies: dict[str, list[str]], max_parallel: int, seconds: dict[str, float] | None = None
+) -> dict[str, str]:
+    """
+    Picks ordering dependencies that keep at most `max_parallel` tasks of a DAG running at once.
+
+    The tasks are list-scheduled on `max_parallel` slots: whenever a slot is free, the ready task with
+    the longest path to a sink — the critical path first — takes it, and once it has it, runs after the
+    slot's previous task. Each slot's tasks thus form a chain, so whatever the tasks really take, no
+    more than `max_parallel` of them can run at once. A task only needs an ordering dependency when the
+    slot's previous task is not already among its ancestors, and a free slot that needs none — unused,
+    or last run by an ancestor — is preferred, so dependencies already imply most of the order. Every
+    ordering dependency points from a task the schedule finished to one it started later, so none
+    closes a cycle. With `E` edges over `N` tasks this is `O(N * max_parallel + E * N / 64)`.
+
+    Args:
+        dependencies (dict[str, list[str]]): Each task's direct dependencies. A dependency that is
+            not itself a key is ignored.
+        max_parallel (int): The most tasks that may run at once.
+        seconds (dict[str, float] | None): How long each task takes, to weigh its path to a sink; a task
+            without one takes none. Every task counts one when None.
+
+    Returns:
+        dict[str, str]: The task each task must additionally wait for, for the tasks that need one.
+
+    Raises:
+        ValueError: If `max_parallel` is not positive or the dependencies form a cycle.
+    """
+    if max_parallel < 1:
+        raise ValueError(f"At least one task must be able to run, got max_parallel={max_parallel}.")
+    keys = list(dependencies)
+    position = {key: index for index, key in enumerate(keys)}
+    direct = [
+        [position[dependency] for dependency in dict.fromkeys(dependencies[key]) if dependency in position]
+        for key in keys
+    ]
+    order = _topological_order(direct)
+    if len(order) < len(keys):
+        raise ValueError("Task dependencies form a cycle, so they cannot be scheduled.")
+    if len(keys) <= max_parallel:
+        return {}
+
+    duration = [1.0 if seconds is None else seconds.get(key, 0.0) for key in keys]
+    dependents: list[list[int]] = [[] for _ in keys]
+    for index, task_dependencies in enumerate(direct):
+        for dependency in task_dependencies:
+            dependents[dependency].append(index)
+    rank = [0.0] * len(keys)
+    for index in reversed(order):
+        rank[index] = duration[index] + max((rank[dependent] for dependent in dependents[index]), default=0.0)
+
+    pending = [len(task_dependencies) for task_dependencies in direct]
+    ready = [(-rank[index], index) for index, count in enumerate(pending) if count == 0]
+    heapq.heapify(ready)
+    # Each free slot's last task, or None for a slot no task has used yet.
+    free: list[int | None] = [None] * max_parallel
+    running: list[tuple[float, int]] = []
+    ancestors = [0] * len(keys)
+    ordering: dict[str, str] = {}
+    now = 0.0
+    while ready or running:
+        while ready and free:
+            _, index = heapq.heappop(ready)
+            for dependency in direct[index]:
+                ancestors[index] |= ancestors[dependency] | 1 << dependency
+            slot = next((slot for slot, last in enumerate(free) if last is None or ancestors[index] >> last & 1), 0)
+            last = free.pop(slot)
+            if last is not None and not ancestors[index] >> last & 1:
+                ordering[keys[index]] = keys[last]
+                ancestors[index] |= ancestors[last] | 1 << last
+            heapq.heappush(running, (now + duration[index], index))
+        now = running[0][0]
+        while running and running[0][0] == now:
+            _, index = heapq.heappop(running)
+            free.append(index)
+            for dependent in dependents[index]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    heapq.heappush(ready, (-rank[dependent], dependent))
+    return ordering
+
+
+def balance_tasks(
+    dependencies: dict[str, list[str]],
+    capacities: list[float],
+    weights: dict[str, float] | None = None,
+    fixed: Collection[str] = (),
+) -> dict[str, int]:
+    """
+    Assigns each task of a DAG to one of several compute targets, balancing their load over time.
+
+    Every task is placed on an as-soon-as-possible schedule, starting once its dependencies finish and
+    taking its weight to run. Visiting tasks by start time, each goes to the target that would then
+    have the fewest running tasks per unit of capacity, ties going to the one with the least total
+    weight per unit of capacity, then to the first. Targets so share the tasks that run at the same
+    time, which is when a warehouse queues, in proportion to their capacity. The result depends only on
+    the dependencies, weights and capacities, not on the order of `dependencies`, so regenerating an
+    unchanged DAG keeps every assignment. With `T` targets this is `O(E + N * T * log N)`.
+
+    Args:
+        dependencies (dict[str, list[str]]): Each task's direct dependencies. A dependency that is
+            not itself a key is ignored.
+        capacities (list[float]): Each target's relative capacity.
+        weights (dict[str, float] | None): How long each task runs, e.g. its predicted seconds or its node
+            count; a task without one takes none. Every task weighs one when None.
+        fixed (Collection[str]): Tasks that keep compute of their own: they still delay their dependents,
+            but take no target's capacity.
+
+    Returns:
+        dict[str, int]: The position in `capacities` of each task's target, for every task not `fixed`.
+
+    Raises:
+        ValueError: If there is no target, a capacity is not positive, or the dependencies form a cycle.
+    """
+    if not capacities or not all(capacity > 0 for capacity in capacities):
+        raise ValueError(f"Tasks need targets of positive capacity, got capacities={capacities}.")
+    keys = list(dependencies)
+    position = {key: index for index, key in enumerate(keys)}
+    direct = [
+        [position[dependency] for dependency in dict.fromkeys(dependencies[key]) if dependency in position]
+        for key in keys
+    ]
+    order = _topological_order(direct)
+    if len(order) < len(keys):
+        raise ValueError("Task dependencies form a cycle, so they cannot be scheduled.")
+
+    weight = [1.0 if weights is None else weights.get(key, 0.0) for key in keys]
+    start = [0.0] * len(keys)
+    for index in order:
+        start[index] = max((start[dependency] + weight[dependency] for dependency in direct[index]), default=0.0)
+
+    # Each target's running tasks by finish time, and the weight assigned to it so far.
+    running: list[list[float]] = [[] for _ in capacities]
+    assigned = [0.0] * len(capacities)
+    targets: dict[str, int] = {}
+    for index in sorted(range(len(keys)), key=lambda index: (start[index], keys[index])):
+        if keys[index] in fixed:
+            continue
+        for finishes in running:
+            while finishes and finishes[0] <= start[index]:
+                heapq.heappop(finishes)
+        target = min(
+            range(len(capacities)),
+            key=lambda target: (
+                (len(running[target]) + 1) / capacities[target],
+                (assigned[target] + weight[index]) / capacities[target],
+                target,
+            ),
+        )
+        heapq.heappush(running[target], start[index] + weight[index])
+        assigned[target] += weight[index]
+        targets[keys[index]] = target
+    return {key: targets[key] for key in keys if key in targets}
+
+
+def _topological_order(direct: list[list[int]]) -> list[int]:
+    """Kahn's order of `direct`'s nodes, dependencies first; shorter than `direct` if there is a cycle."""
+    pending = [len(dependencies) for dependencies in direct]
+    dependents: list[list[int]] = [[] for _ in direct]
+    for index, dependencies in enumerate(direct):
+        for dependency in dependencies:
+            dependents[dependency].append(index)
+    order = [index for index, count in enumerate(pending) if count == 0]
+    for index in order:
+        for dependent in dependents[index]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                order.append(dependent)
+    return order
+
+
 def read_dbt_manifest(path: str) -> dict:
     """
     Reads a dbt manifest JSON file and returns its parsed content.
@@ -0,0 +1,174 @@
+"""Synthetic manifests for the generation benchmarks.
+
+Real projects are too large to commit and too varied to stand for one another, so the benchmarks run on
+manifests generated from a handful of shape parameters. Each parameter exercises a different scaling
+hazard: shared `schema.yml` files make large `file:` buckets, tests sharing names need parent-scoped plans, many packages and a deep DAG stress the
+fqn index and per-test gating, versioned models and unit tests take the factory's less common selector
+paths. Generation is seeded, so a size always yields the same manifest.
+"""
+
+import json
+import os
+import random
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+import pytest
+
+# Model counts to benchmark at; override with e.g. `DBT_FACTORY_BENCHMARK_SIZES=1000` for a quick run.
+SIZES = tuple(int(size) for size in os.environ.get("DBT_FACTORY_BENCHMARK_SIZES", "1000,10000,50000").split(","))
+
+_TEST_TYPES = ("not_null", "unique", "accepted_values")
+
+
+@dataclass(frozen=True)
+class ManifestShape:
+    """The parameters of a synthetic manifest."""
+
+    models: int
+    packages: int = 3
+    directories: int = 25
+    tests_per_model: float = 1.5
+    tests_per_schema_file: int = 200
+    versioned_fraction: float = 0.05
+    unit_test_fraction: float = 0.05
+    dag_depth: int = 20
+    tests_per_name: int = 1
+    seed: int = 0
+
+
+def synthetic_manifest(shape: ManifestShape) -> dict:
+    """
+    Generates a manifest with the given shape, in the layout dbt writes.
+
+    Models are spread over `dag_depth` layers; each depends on one to three models of earlier layers, so
+    the longest path has `dag_depth` models. A versioned model contributes two versions. Every model gets
+    `tests_per_model` data tests on average, declared `tests_per_schema_file` to a `schema.yml`, and one in
+    twenty is a two-parent `relationships` test. With `tests_per_name` above one, that many single-parent
+    tests in each package directory share a name, as tests given the same `name:` in a shared `schema.yml`
+    do, so their direct selectors collide. Entries carry bulky `raw_code` the factory never reads.
+    """
+    rnd = random.Random(shape.seed)
+    nodes: dict[str, dict] = {}
+    unit_tests: dict[str, dict] = {}
+    layers: list[list[str]] = [[] for _ in range(shape.dag_depth)]
+    for index in range(shape.models):
+        package = f"pkg_{index % shape.packages}"
+        directory = f"dir_{index % shape.directories}"
+        name = f"model_{index}"
+        layer = index * shape.dag_depth // shape.models
+        upstream = [full_name for earlier in layers[max(0, layer - 2) : layer] for full_name in earlier]
+        depends_on = rnd.sample(upstream, min(len(upstream), rnd.randint(1, 3))) if upstream else []
+        versions = (1, 2) if rnd.random() < shape.versioned_fraction else (None,)
+        for version in versions:
+            full_name, info = _model(package, directory, name, depends_on, version)
+            nodes[full_name] = info
+            layers[layer].append(full_name)
+        if versions == (None,) and rnd.random() < shape.unit_test_fraction:
+            full_name, info = _unit_test(package, directory, name)
+            unit_tests[full_name] = info
+
+    models = [full_name for layer in layers for full_name in layer]
+    test_count = int(len(models) * shape.tests_per_model)
+    for index in range(test_count):
+        parent = models[index % len(models)]
+        parent_package, parent_directory = nodes[parent]["package_name"], nodes[parent]["fqn"][1]
+        parents = [parent]
+        if index % 20 == 0:
+            parents.append(rnd.choice(models))
+        schema_file = f"models/{parent_directory}/schema_{index // shape.tests_per_schema_file}.yml"
+        # Consecutive tests have parents in distinct package directories, each of a single test type.
+        group = shape.packages * shape.directories * shape.tests_per_name
+        name_index = index // group if shape.tests_per_name > 1 and len(parents) == 1 else index
+        full_name, info = _data_test(parent_package, parent_directory, index, name_index, parents, schema_file)
+        nodes[full_name] = info
+
+    return {"metadata": {"dbt_schema_version": "v12"}, "nodes": nodes, "sources": {}, "unit_tests": unit_tests}
+
+
+def _model(package: str, directory: str, name: str, depends_on: list[str], version: int | None) -> tuple[str, dict]:
+    full_name = f"model.{package}.{name}" + (f".v{version}" if version is not None else "")
+    fqn = [package, directory, name] + ([f"v{version}"] if version is not None else [])
+    info = {
+        "unique_id": full_name,
+        "resource_type": "model",
+        "name": name,
+        "package_name": package,
+        "fqn": fqn,
+        "original_file_path": f"models/{directory}/{name}.sql",
+        "depends_on": {"macros": [], "nodes": depends_on},
+        "config": {"enabled": True, "materialized": "table"},
+        "raw_code": "select * from upstream\n" * 20,
+    }
+    if version is not None:
+        info["version"] = version
+    return full_name, info
+
+
+def _data_test(
+    package: str, directory: str, index: int, name_index: int, parents: list[str], path: str
+) -> tuple[str, dict]:
+    test_type = "relationships" if len(parents) > 1 else _TEST_TYPES[index % len(_TEST_TYPES)]
+    name = f"{test_type}_{name_index}"
+    full_name = f"test.{package}.{name}.{index:010x}"
+    return full_name, {
+        "unique_id": full_name,
+        "resource_type": "test",
+        "name": name,
+        "package_name": package,
+        "fqn": [package, directory, name],
+        "original_file_path": path,
+        "depends_on": {"macros": [f"macro.dbt.test_{test_type}"], "nodes": parents},
+        "config": {"enabled": True, "severity": "ERROR"},
+        "test_metadata": {"name": test_type, "kwargs": {"column_name": "id"}},
+        "raw_code": "{{ test_" + test_type + "(**_dbt_generic_test_kwargs) }}",
+    }
+
+
+def _unit_test(package: str, directory: str, model: str) -> tuple[str, dict]:
+    name = f"test_{model}"
+    full_name = f"unit_test.{package}.{model}.{name}"
+    return full_name, {
+        "unique_id": full_name,
+        "resource_type": "unit_test",
+        "name": name,
+        "model": model,
+        "package_name": package,
+        "fqn": [package, directory, model, name],
+        "original_file_path": f"models/{directory}/{model}_unit_tests.yml",
+        "depends_on": {"macros": [], "nodes": [f"model.{package}.{model}"]},
+        "config": {"enabled": True},
+    }
+
+
+@cache
+def manifest_of_size(models: int) -> dict:
+    """The default-shaped manifest with `models` models, generated once per session."""
+    return synthetic_manifest(ManifestShape(models=models))
+
+
+@cache
+def shared_schema_manifest_of_size(models: int) -> dict:
+    """
+    A manifest with `models` models whose tests are declared 5,000 to a `schema.yml`, in pairs sharing a name.
+
+    Every test's `file:` and `test_name:` buckets hold thousands of tests, and the colliding names send
+    single-parent tests through parent-scoped plans, whose proofs match each term on its own.
+    """
+    return synthetic_manifest(ManifestShape(models=models, tests_per_schema_file=5_000, tests_per_name=2))
+
+
+@pytest.fixture(scope="session")
+def manifest_path(tmp_path_factory):
+    """Writes the manifest of a size to a file once per session, for the reader benchmarks."""
+    written: dict[int, Path] = {}
+
+    def write(models: int) -> Path:
+        if models not in written:
+            path = tmp_path_factory.mktemp("manifests") / f"manifest_{models}.json"
+            path.write_text(json.dumps(manifest_of_size(models)), encoding="utf-8")
+            written[models] = path
+        return written[models]
+
+    return write
@@ -0,0 +1,114 @@
+"""Generation throughput at growing manifest sizes.
+
+Run with `make benchmark`; compare runs with pytest-benchmark's `--benchmark-autosave` and
+`--benchmark-compare`. Each phase the CLI goes through is measured on its own so a scaling regression
+points at its cause. Manifests above the 1,000-task limit are generated unrendered, through
+`_create_tasks`: the proofs and gates scale with the manifest, not with what one job can hold.
+"""
+
+import pytest
+
+from databricks_dbt_factory.dbt_factory import DbtFactory, _SelectorIndex
+from databricks_dbt_factory.dbt_node import to_dbt_nodes
+from databricks_dbt_factory.fqn_matrix import FqnMatrix
+from databricks_dbt_factory.job_spec import render_job_spec
+from databricks_dbt_factory.manifest_reader import read_dbt_manifest_nodes
+from databricks_dbt_factory.utils import build_task_key_maps, read_dbt_manifest
+from tests.benchmarks.conftest import SIZES, manifest_of_size, shared_schema_manifest_of_size
+from tests.conftest import create_dbt_factory
+
+pytest.importorskip("pytest_benchmark")
+
+TEMPLATE_JOB_SPEC = "tests/test_data/job_definition_template.yaml"
+
+# One round of the largest sizes takes seconds; a few rounds are enough to tell a scaling regression.
+_ROUNDS = 3
+
+pytestmark = pytest.mark.parametrize("models", SIZES, ids=[f"{size}_models" for size in SIZES])
+
+
+def _records(models: int, manifest: dict | None = None) -> dict[str, dict]:
+    manifest = manifest or manifest_of_size(models)
+    return {section: to_dbt_nodes(manifest[section]) for section in ("nodes", "sources", "unit_tests")}
+
+
+def test_read_dbt_manifest(benchmark, manifest_path, models):
+    path = str(manifest_path(models))
+
+    benchmark.pedantic(read_dbt_manifest, args=(path,), rounds=_ROUNDS)
+
+
+def test_read_dbt_manifest_nodes(benchmark, manifest_path, models):
+    path = str(manifest_path(models))
+
+    benchmark.pedantic(read_dbt_manifest_nodes, args=(path,), rounds=_ROUNDS)
+
+
+def test_selector_index_construction(benchmark, models):
+    records = _records(models)
+    peers = {**records["nodes"], **records["unit_tests"], **records["sources"]}
+
+    benchmark.pedantic(_SelectorIndex, args=(peers,), rounds=_ROUNDS)
+
+
+def test_vectorized_fqn_matching(benchmark, models):
+    pytest.importorskip("numpy")
+    nodes = list(_records(models)["nodes"].values())
+    matrix = FqnMatrix(nodes)
+    rows = range(len(nodes))
+
+    # A directory term, matching a few hundred of the manifest's nodes, as an unnarrowed check would scan.
+    matched = benchmark.pedantic(matrix.matching_rows, args=(["pkg_1.dir_3"], rows), rounds=_ROUNDS)
+
+    expected = [node for node in nodes if DbtFactory._fqn_term_matches("pkg_1.dir_3", node)]
+    assert [nodes[row] for row in matched] == expected
+
+
+def test_dependency_graph(benchmark, models):
+    records = _records(models)
+    factory = create_dbt_factory()
+
+    benchmark.pedantic(factory._dependency_graph, args=(records["nodes"], records["sources"]), rounds=_ROUNDS)
+
+
+def test_build_task_key_maps(benchmark, models):
+    records = _records(models)
+    task_ids = [full_name for full_name in records["nodes"] if not full_name.startswith("test.")]
+    tested = sorted({parent for info in records["nodes"].values() if info.test_name for parent in info.depends_on})
+
+    benchmark.pedantic(build_task_key_maps, args=(task_ids, tested), rounds=_ROUNDS)
+
+
+# Per-test gating takes minutes at this size and is skipped beyond it, so the suite stays runnable.
+_PER_TEST_MAX_MODELS = 10_000
+
+
+@pytest.mark.parametrize("bundle_tests", [True, False], ids=["bundled", "per_test"])
+def test_create_tasks(benchmark, models, bundle_tests):
+    if not bundle_tests and models > _PER_TEST_MAX_MODELS:
+        pytest.skip(f"per-test generation is benchmarked up to {_PER_TEST_MAX_MODELS:,} models")
+    factory: DbtFactory = create_dbt_factory(bundle_tests=bundle_tests)
+    manifest = _records(models)
+
+    rounds = 1 if not bundle_tests and models > 1_000 else _ROUNDS
+    tasks = benchmark.pedantic(factory._create_tasks, args=(manifest,), rounds=rounds)
+
+    assert tasks
+
+
+def test_create_tasks_with_shared_schema_files(benchmark, models):
+    # Every test's `file:` and `test_name:` buckets are large, and most terms are decided by narrowing alone.
+    factory: DbtFactory = create_dbt_factory(bundle_tests=True)
+    manifest = _records(models, shared_schema_manifest_of_size(models))
+
+    tasks = benchmark.pedantic(factory._create_tasks, args=(manifest,), rounds=1 if models > 1_000 else _ROUNDS)
+
+    assert tasks
+
+
+def test_render_job_spec(benchmark, models):
+    # A job holds at most 1,000 tasks, so every size renders the first thousand of its bundled tasks.
+    tasks = create_dbt_factory(bundle_tests=True)._create_tasks(_records(models))[:1_000]
+    rendered = [task.to_dict() for task in tasks]
+
+    benchmark.pedantic(render_job_spec, args=(TEMPLATE_JOB_SPEC, rendered, "benchmark"), rounds=_ROUNDS)
@@ -38,12 +38,18 @@ def dbt_factory_bundled():
     return create_dbt_factory(bundle_tests=True)
 
 
+@pytest.fixture
+def dbt_factory_build():
+    return create_dbt_factory(build_mode=True)
+
+
 def create_dbt_factory(
     dbt_deps_enabled: bool = False,
     dbt_tasks_deps: list[str] | None = None,
     task_type: str = "dbt",
     notebook_path: str | None = None,
     bundle_tests: bool = False,
+    build_mode: bool = False,
     dbt_options: str = "--target dev",
 ) -> DbtFactory:
     resolver = DbtDependencyResolver()
@@ -62,4 +68,4 @@ def create_dbt_factory(
         "test": TestTaskFactory(resolver, task_options, dbt_options),
     }
 
-    return DbtFactory(task_factories, bundle_tests=bundle_tests)
+    return DbtFactory(task_factories, bundle_tests=bundle_tests, build_mode=build_mode)
@@ -1,4 +1,5 @@
 import argparse
+import ast
 import hashlib
 import json
 import os
@@ -155,6 +156,406 @@ def test_main_dry_run_prints_tasks_and_writes_nothing(monkeypatch, capsys, tmp_p
     assert not list(tmp_path.iterdir())
 
 
+def test_main_selector_cache_dir_persists_proofs_and_keeps_output(monkeypatch, capsys, tmp_path):
+    cache_dir = tmp_path / "cache"
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--task-type",
+        "dbt",
+        "--dry-run",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+    uncached = capsys.readouterr().out
+
+    monkeypatch.setattr("sys.argv", [*argv, "--selector-cache-dir", str(cache_dir)])
+    main()
+    cold = capsys.readouterr().out
+    main()
+    warm = capsys.readouterr().out
+
+    assert uncached == cold == warm
+    assert json.loads((cache_dir / "selector-cache.json").read_bytes())["entries"]
+
+
+def test_main_timings_writes_a_json_breakdown_by_phase(monkeypatch, tmp_path):
+    timings_path = tmp_path / "timings.json"
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            "main.py",
+            "--dbt-manifest-path",
+            BASE_PATH + "/test_data/manifest.json",
+            "--input-job-spec-path",
+            BASE_PATH + "/test_data/job_definition_template.yaml",
+            "--target-job-spec-path",
+            str(tmp_path / "out.yaml"),
+            "--task-type",
+            "dbt",
+            "--timings",
+            str(timings_path),
+        ],
+    )
+    main()
+
+    report = json.loads(timings_path.read_text(encoding="utf-8"))
+    phases = {phase["name"]: phase for phase in report["phases"]}
+    assert list(phases) == [
+        "read_manifest",
+        "layout",
+        "selector_index",
+        "gating",
+        "build_tasks",
+        "render_tasks",
+        "render_job_spec",
+        "publish",
+    ]
+    assert all(phase["wall_seconds"] >= 0 and phase["peak_traced_bytes"] > 0 for phase in phases.values())
+    assert phases["build_tasks"]["counts"]["selectors_proven"] == phases["layout"]["counts"]["tasks"]
+    assert phases["build_tasks"]["counts"]["candidates_scanned"] > 0
+    assert report["total_seconds"] == pytest.approx(sum(phase["wall_seconds"] for phase in phases.values()))
+
+
+def test_main_timings_dash_writes_to_stderr_and_keeps_stdout(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--dry-run",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+    untimed = capsys.readouterr().out
+
+    monkeypatch.setattr("sys.argv", [*argv, "--timings", "-"])
+    main()
+    captured = capsys.readouterr()
+
+    assert captured.out == untimed
+    assert [phase["name"] for phase in json.loads(captured.err)["phases"]][0] == "read_manifest"
+
+
+def test_main_reduce_dependencies_reports_the_removed_edges(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--reduce-dependencies",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    assert re.fullmatch(r"Removed [1-9]\d* redundant task dependencies\.\n", capsys.readouterr().err)
+    assert (tmp_path / "out.yaml").exists()
+
+
+def test_main_max_parallel_tasks_reports_the_added_edges(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--max-parallel-tasks",
+        "2",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    err = capsys.readouterr().err
+    assert re.fullmatch(r"Added [1-9]\d* ordering dependencies to run at most 2 tasks at once\.\n", err)
+    assert (tmp_path / "out.yaml").exists()
+
+
+def test_main_balances_tasks_over_listed_warehouses(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--task-type",
+        "dbt",
+        "--warehouse_id",
+        "wh_a:2, wh_b",
+        "--dry-run",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    tasks = ast.literal_eval(capsys.readouterr().out)
+    assert {task["dbt_task"]["warehouse_id"] for task in tasks} == {"wh_a", "wh_b"}
+
+
+@pytest.mark.parametrize(
+    ("extra", "message"),
+    [
+        (["--warehouse_id", "wh_a:0,wh_b"], "positive capacity, got 'wh_a:0'"),
+        (["--warehouse_id", "wh_a,wh_b", "--job-cluster-key", "c1,c2"], "list only one"),
+        (["--build-mode", "--bundle-tests"], "--build-mode and --bundle-tests are mutually exclusive"),
+        (["--bundle-strategy", "file"], "require --bundle-tests"),
+        (["--bundle-tests", "--max-bundle-seconds", "60"], "requires --run-results"),
+    ],
+)
+def test_main_rejects_an_unbalanceable_compute_pool(monkeypatch, capsys, extra, message):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        "out.yaml",
+        "--task-type",
+        "dbt",
+        *extra,
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    with pytest.raises(SystemExit):
+        main()
+
+    assert message in capsys.readouterr().err
+
+
+def test_main_routes_nodes_by_meta_databricks_within_the_declared_compute(monkeypatch, capsys, tmp_path):
+    manifest = json.loads(Path(BASE_PATH + "/test_data/manifest.json").read_text(encoding="utf-8"))
+    node = manifest["nodes"]["model.dbt_demo.diamonds_list_colors"]
+    node["config"]["meta"] = {"databricks": {"size_class": "large"}}
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        str(tmp_path / "manifest.json"),
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--task-type",
+        "dbt",
+        "--dry-run",
+    ]
+    monkeypatch.setattr("sys.argv", [*argv, "--compute-class", "large=environment_key:Default,warehouse_id:wh_big"])
+    main()
+    tasks = {task["task_key"]: task for task in ast.literal_eval(capsys.readouterr().out)}
+    assert tasks["diamonds_list_colors_model"]["dbt_task"]["warehouse_id"] == "wh_big"
+
+    # The template declares no job clusters, so a class running on one is refused.
+    monkeypatch.setattr("sys.argv", [*argv, "--compute-class", "large=job_cluster_key:big_cluster"])
+    with pytest.raises(SystemExit, match="job cluster 'big_cluster', which the job spec does not declare"):
+        main()
+
+    monkeypatch.setattr("sys.argv", [*argv, "--compute-class", "large"])
+    with pytest.raises(SystemExit):
+        main()
+    assert "expected NAME=FIELD:VALUE" in capsys.readouterr().err
+
+
+def test_main_partition_jobs_chains_jobs_over_the_task_limit(monkeypatch, capsys, tmp_path):
+    monkeypatch.setattr(main_module.DbtFactory, "_MAX_JOB_TASKS", 10)
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--partition-jobs",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    jobs = yaml.safe_load((tmp_path / "out.yaml").read_text(encoding="utf-8"))["resources"]["jobs"]
+    assert re.fullmatch(rf"Split [1-9]\d* tasks into {len(jobs)} chained jobs\.\n", capsys.readouterr().err)
+    assert len(jobs) > 1 and all(len(job["tasks"]) <= 10 for job in jobs.values())
+    assert all(job["tasks"][-1]["task_key"] == "run_next_job" for job in list(jobs.values())[:-1])
+
+
+def test_main_coalesce_chains_merges_model_chains(monkeypatch, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--task-type",
+        "dbt",
+        "--no-run-tests",
+    ]
+    task_counts = []
+    for extra in ([], ["--coalesce-chains"]):
+        target = tmp_path / f"out{len(task_counts)}.yaml"
+        monkeypatch.setattr("sys.argv", [*argv, "--target-job-spec-path", str(target), *extra])
+        main()
+        jobs = yaml.safe_load(target.read_text(encoding="utf-8"))["resources"]["jobs"]
+        task_counts.append(len(next(iter(jobs.values()))["tasks"]))
+
+    assert task_counts[1] < task_counts[0]
+
+
+def test_main_run_results_group_models_by_duration(monkeypatch, tmp_path):
+    timings = tmp_path / "timings.json"
+    timings.write_text(json.dumps({"model.dbt_demo.zzz_game_details": 1200}), encoding="utf-8")
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--no-run-tests",
+        "--run-results",
+        str(timings),
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+    assert (tmp_path / "out.yaml").exists()
+
+    monkeypatch.setattr("sys.argv", [*argv, "--run-results", str(tmp_path / "missing.json")])
+    with pytest.raises(SystemExit, match="Timing file not found"):
+        main()
+
+
+def test_main_simulate_reports_both_test_modes(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--dry-run",
+        "--simulate",
+        "-",
+        "--simulate-max-concurrency",
+        "4",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    report = json.loads(capsys.readouterr().err)
+    assert report["generated"] == "per_test"
+    assert report["per_test"]["tasks"] > report["bundled"]["tasks"]
+    assert report["per_test"]["peak_concurrency"] == report["per_test"]["max_concurrent_tasks"] == 4
+    assert report["bundled"]["makespan_seconds"] > 0 and report["bundled"]["critical_path"]
+
+
+def test_main_build_mode_runs_tests_in_their_resources_tasks(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--task-type",
+        "dbt",
+        "--build-mode",
+        "--dry-run",
+        "--simulate",
+        "-",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    out, err = capsys.readouterr()
+    commands = [command for task in ast.literal_eval(out) for command in task["dbt_task"]["commands"]]
+    assert any(command.startswith("dbt build --select ") for command in commands)
+    report = json.loads(err)
+    assert report["generated"] == "build"
+    assert report["build"]["tasks"] < report["bundled"]["tasks"]
+
+
+def test_main_bundle_strategy_groups_tests_by_package(monkeypatch, capsys, tmp_path):
+    argv = [
+        "main.py",
+        "--dbt-manifest-path",
+        BASE_PATH + "/test_data/manifest.json",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--target-job-spec-path",
+        str(tmp_path / "out.yaml"),
+        "--task-type",
+        "dbt",
+        "--bundle-tests",
+        "--bundle-strategy",
+        "package",
+        "--max-bundle-tests",
+        "50",
+        "--dry-run",
+    ]
+    monkeypatch.setattr("sys.argv", argv)
+    main()
+
+    tasks = ast.literal_eval(capsys.readouterr().out)
+    # Every test is in package `dbt_demo`; its parents sit at three depths, so it is bundled three times.
+    bundles = [task["task_key"] for task in tasks if task["dbt_task"]["commands"][-1].startswith("dbt test ")]
+    assert bundles == ["dbt_demo_test_1", "dbt_demo_test_2", "dbt_demo_test_3"]
+
+
+def test_main_previous_manifest_updates_the_target_spec_like_a_full_run(monkeypatch, tmp_path):
+    manifest = json.loads(Path(BASE_PATH + "/test_data/manifest.json").read_text(encoding="utf-8"))
+    previous_manifest_path = tmp_path / "previous_manifest.json"
+    previous_nodes = {
+        full_name: info for full_name, info in manifest["nodes"].items() if not full_name.startswith("test.")
+    }
+    previous_manifest_path.write_text(json.dumps({**manifest, "nodes": previous_nodes}), encoding="utf-8")
+    argv = [
+        "main.py",
+        "--input-job-spec-path",
+        BASE_PATH + "/test_data/job_definition_template.yaml",
+        "--task-type",
+        "dbt",
+    ]
+    full, updated = tmp_path / "full.yaml", tmp_path / "updated.yaml"
+    monkeypatch.setattr(
+        "sys.argv", [*argv, "--dbt-manifest-path", str(previous_manifest_path), "--target-job-spec-path", str(updated)]
+    )
+    main()
+
+    monkeypatch.setattr(
+        "sys.argv",
+        [
+            *argv,
+            "--dbt-manifest-path",
+            BASE_PATH + "/test_data/manifest.json",
+            "--previous-dbt-manifest-path",
+            str(previous_manifest_path),
+            "--target-job-spec-path",
+            str(updated),
+        ],
+    )
+    main()
+    monkeypatch.setattr(
+        "sys.argv",
+        [*argv, "--dbt-manifest-path", BASE_PATH + "/test_data/manifest.json", "--target-job-spec-path", str(full)],
+    )
+    main()
+
+    assert updated.read_bytes() == full.read_bytes()
+
+
 def test_main_notebook_mode_auto_copies_runner_notebook_next_to_spec(monkeypatch, tmp_path):
     """Without --project-directory, the content-addressed runner is published next to the spec."""
     target_job_spec_path = tmp_path / "job_definition.yaml"
@@ -529,6 +930,12 @@ def test_explicit_environment_key_with_job_cluster_key_is_rejected(monkeypatch):
         parse_args()
 
 
+def test_jobs_below_one_is_rejected(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["main.py", *REQUIRED_ARGS, "--jobs", "0"])
+    with pytest.raises(SystemExit):
+        parse_args()
+
+
 def test_job_cluster_key_alone_parses(monkeypatch):
     monkeypatch.setattr("sys.argv", ["main.py", *REQUIRED_ARGS, "--job-cluster-key", "foo"])
     args = parse_args()
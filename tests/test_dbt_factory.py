@@ -6,7 +6,6 @@ import shlex
 import subprocess
 import sys
 import textwrap
-from collections.abc import Iterator
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 
@@ -14,26 +13,16 @@ import pytest
 import yaml
 
 from databricks_dbt_factory.dbt_factory import DbtFactory
-from databricks_dbt_factory.dbt_task import DbtTaskOptions
+from databricks_dbt_factory.dbt_node import to_dbt_nodes
+from databricks_dbt_factory.dbt_task import ComputeRoute, ComputeTarget, DbtTaskOptions
 from databricks_dbt_factory.job_spec import replace_tasks_in_job_spec
+from databricks_dbt_factory.simulation import simulate_job
 from databricks_dbt_factory.task_factory import DbtDependencyResolver, TestTaskFactory as DbtTestTaskFactory
-from databricks_dbt_factory.utils import read_dbt_manifest
+from databricks_dbt_factory.utils import read_dbt_manifest, transitive_reduction
 
 BASE_PATH = str(Path(__file__).resolve().parent)
 
 
-class _IterationCountingSet(set[str]):
-    """A set that records explicit scans of its members."""
-
-    def __init__(self, values: set[str]):
-        super().__init__(values)
-        self.iterations = 0
-
-    def __iter__(self) -> Iterator[str]:
-        self.iterations += 1
-        return super().__iter__()
-
-
 def _model(
     package: str,
     name: str,
@@ -482,7 +471,7 @@ def test_flat_mode_handles_a_descending_999_model_chain_with_one_test(dbt_factor
     assert by_key["m0002_model"]["depends_on"] == [{"task_key": "m0001_model"}]
 
 
-def test_flat_mode_skips_ancestor_computation_when_no_tests_are_emitted(
+def test_flat_mode_skips_the_dependency_graph_when_no_tests_are_emitted(
     dbt_factory: DbtFactory, monkeypatch: pytest.MonkeyPatch
 ):
     nodes = dict(
@@ -494,10 +483,10 @@ def test_flat_mode_skips_ancestor_computation_when_no_tests_are_emitted(
         for index in reversed(range(999))
     )
 
-    def unexpected_ancestor_computation(*_args, **_kwargs):
-        pytest.fail("ancestor computation is unnecessary without emitted tests")
+    def unexpected_dependency_graph(*_args, **_kwargs):
+        pytest.fail("the dependency graph is unnecessary without emitted tests")
 
-    monkeypatch.setattr(dbt_factory, "_compute_ancestors", unexpected_ancestor_computation)
+    monkeypatch.setattr(dbt_factory, "_dependency_graph", unexpected_dependency_graph)
 
     tasks = dbt_factory.create_tasks({"nodes": nodes})
 
@@ -540,19 +529,14 @@ def test_first_frontier_union_caches_eligible_tests_for_converging_dependencies(
             _test("pkg", "relationship_a_b", ["model.pkg.a", "model.pkg.b"]),
         ]
     )
-    compute_ancestors = dbt_factory._compute_ancestors  # pylint: disable=protected-access
-    tracked_ancestors: dict[str, _IterationCountingSet] = {}
+    resolve_test_frontier = DbtFactory._resolve_test_frontier  # pylint: disable=protected-access
+    resolutions: dict[str, int] = {}
 
-    def compute_tracked_ancestors(dbt_nodes: dict, dbt_sources: dict) -> dict[str, set[str]]:
-        tracked_ancestors.update(
-            {
-                resource: _IterationCountingSet(ancestors)
-                for resource, ancestors in compute_ancestors(dbt_nodes, dbt_sources).items()
-            }
-        )
-        return dict(tracked_ancestors)
+    def count_resolutions(full_name: str, gating) -> None:
+        resolutions[full_name] = resolutions.get(full_name, 0) + 1
+        resolve_test_frontier(full_name, gating)
 
-    monkeypatch.setattr(DbtFactory, "_compute_ancestors", staticmethod(compute_tracked_ancestors))
+    monkeypatch.setattr(DbtFactory, "_resolve_test_frontier", staticmethod(count_resolutions))
 
     tasks = dbt_factory.create_tasks({"nodes": nodes})
     deps_by_key = {task["task_key"]: [dependency["task_key"] for dependency in task["depends_on"]] for task in tasks}
@@ -562,7 +546,41 @@ def test_first_frontier_union_caches_eligible_tests_for_converging_dependencies(
     assert deps_by_key["join_model"] == ["left_model", "right_model", "relationship_a_b_test"]
     assert deps_by_key["consumer_one_model"] == ["join_model"]
     assert deps_by_key["consumer_two_model"] == ["join_model"]
-    assert tracked_ancestors["model.pkg.join"].iterations == 1
+    assert set(resolutions.values()) == {1}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_gates_match_a_set_closure_on_a_random_dag(dbt_factory, seed):
+    # The rule, spelled out naively: a test gates a model when every ref is a strict ancestor of the
+    # model and of none of the model's direct dependencies, which would already wait for it.
+    rng = random.Random(seed)
+    names = [f"model.pkg.m{i}" for i in range(120)]
+    nodes = dict(
+        _model("pkg", f"m{i}", depends_on=rng.sample(names[:i], min(i, rng.randint(0, 3)))) for i in range(120)
+    )
+    tests = dict(_test("pkg", f"t{i}", rng.sample(names, rng.choice([1, 1, 2, 2, 3]))) for i in range(60))
+    ancestors: dict[str, set[str]] = {}
+    for full_name, info in nodes.items():
+        ancestors[full_name] = set()
+        for dependency in info["depends_on"]["nodes"]:
+            ancestors[full_name] |= {dependency} | ancestors[dependency]
+
+    def eligible(full_name: str) -> set[str]:
+        return {
+            f"{test_full_name.split('.')[-1]}_test"
+            for test_full_name, info in tests.items()
+            if set(info["depends_on"]["nodes"]) <= ancestors[full_name]
+        }
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": {**nodes, **tests}})}
+
+    for full_name, info in nodes.items():
+        parents = info["depends_on"]["nodes"]
+        inherited = set().union(*(eligible(parent) for parent in parents))
+        expected = [f"{parent.split('.')[-1]}_model" for parent in parents]
+        expected += sorted(eligible(full_name) - inherited)
+        task = tasks[f"{full_name.split('.')[-1]}_model"]
+        assert [dependency["task_key"] for dependency in task["depends_on"]] == expected
 
 
 def test_flat_mode_warn_severity_tests_gate_downstream(dbt_factory):
@@ -1816,7 +1834,85 @@ def test_fqn_index_narrows_a_large_manifest_when_file_terms_are_ambiguous():
     select = DbtFactory._node_select(peers[target_id])
 
     assert "file:" not in select
-    assert set(index.narrow(select.split(","))) == {target_id}
+    assert set(index.narrow(select.split(","))[0]) == {target_id}
+
+
+def test_fqn_index_files_each_node_once_and_hands_back_its_own_list():
+    # `pkg.pkg` strips to `pkg`, which the unstripped walk already filed the node under.
+    peers = dict([_model("pkg", "pkg", fqn=["pkg", "pkg"]), _model("pkg", "other", fqn=["pkg", "marts", "other"])])
+    index = DbtFactory._selector_index(peers)
+
+    assert list(index._fqn_candidates("pkg")) == ["model.pkg.pkg", "model.pkg.other"]
+    assert list(index._fqn_candidates("pkg.pkg")) == ["model.pkg.pkg"]
+    assert list(index._fqn_candidates("marts")) == ["model.pkg.other"]
+    assert index._fqn_postings("pkg.marts") is index._fqn_postings("pkg.marts")
+    assert not index._fqn_candidates("pkg.missing.other")
+
+
+def test_narrowing_intersects_large_buckets_and_leaves_only_undecided_terms():
+    # 400 tests share a name; every bucket holds at least 100, so narrowing intersects them all.
+    peers = dict(
+        _test(
+            "pkg",
+            f"check_{index}",
+            ["model.pkg.orders"],
+            fqn=["pkg", "check"],
+            path=f"models/schema_{index % 2}.yml",
+            test_name=("not_null", "unique")[index // 2 % 2],
+        )
+        for index in range(400)
+    )
+    index = DbtFactory._selector_index(peers)
+    terms = ["fqn:pkg.check", "package:pkg", "file:schema_0.yml", "test_name:unique"]
+
+    candidates, undecided = index.narrow(terms)
+
+    assert candidates == [f"test.pkg.check_{number}" for number in range(400) if number % 4 == 2]
+    assert undecided == ["fqn:pkg.check"]
+    assert DbtFactory._matching_ids(",".join(terms), index) == DbtFactory._matching_ids(",".join(terms), peers)
+
+
+def test_parent_scoped_proofs_reuse_parent_selectors_and_term_expansions():
+    # Both tests share an fqn, so each is scoped to its parent; the second reuses every shared term.
+    peers = dict(
+        [
+            _model("pkg", "a"),
+            _model("pkg", "b"),
+            *(
+                _test("pkg", name, [parent], fqn=["pkg", "not_null_id"], path="models/schema.yml", test_name="not_null")
+                for name, parent in [("not_null_id", "model.pkg.a"), ("not_null_id_b", "model.pkg.b")]
+            ),
+        ]
+    )
+    index = DbtFactory._selector_index(peers)
+
+    plans = [DbtFactory._prove(index[full_name], index) for full_name in index]
+
+    assert plans == [DbtFactory._prove(node, peers) for node in to_dbt_nodes(peers).values()]
+    assert {plan.indirect_selection for plan in plans[2:]} == {"cautious"}
+    assert (index.stats["node_select_misses"], index.stats["node_select_hits"]) == (2, 2)
+    assert index.stats["term_matches_hits"] > 0
+    assert index.stats["attached_tests_hits"] == index.stats["term_matches_hits"]
+
+
+def test_memoized_errors_are_raised_again_and_reads_replayed():
+    index = DbtFactory._selector_index(dict([_model("pkg", "a"), _model("pkg", "b")]))
+
+    def fail():
+        index.narrow(["package:pkg"])
+        raise ValueError("not exact")
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="not exact"):
+            index.reading(lambda: index.memoized("node_select", "model.pkg.a", fail))
+    def first():
+        return index.memoized("term_matches", "package:pkg", lambda: index.narrow(["package:pkg"]))
+
+    _, reads = index.reading(first)
+    _, replayed = index.reading(lambda: index.memoized("term_matches", "package:pkg", pytest.fail))
+
+    assert reads == replayed == [("package", "pkg")]
+    assert (index.stats["node_select_misses"], index.stats["node_select_hits"]) == (1, 1)
 
 
 def _random_model_layout(seed: int, size: int) -> dict:
@@ -1824,7 +1920,7 @@ def _random_model_layout(seed: int, size: int) -> dict:
     A randomised set of model peers built to collide on fqn tokens.
 
     dbt's fqn semantics live in three places that must agree — the truth (`_fqn_term_matches`), the
-    terms a node is filed under (`_SelectorIndex._fqn_terms`), and the keys a term is looked up under
+    terms a node is filed under (`_SelectorIndex._file_fqn_terms`), and the keys a term is looked up under
     (`_fqn_candidates`). Small pools of packages and segment words force shared prefixes, shared
     leaves, package-stripping overlaps, dotted names, and versioned models — the shapes on which a
     divergence between the three would surface.
@@ -1872,7 +1968,7 @@ def test_fqn_index_bucket_is_a_superset_of_the_truth_over_random_layouts(seed):
     # The soundness invariant behind the whole exactness check: whenever the truth predicate says an
     # fqn term matches a node, the index must file that node in the term's candidate bucket — otherwise
     # `narrow` hands `_matching_ids` a bucket missing a real collision and a non-exact selector passes
-    # `_assert_exact`. This couples `_fqn_term_matches` (truth), `_fqn_terms` (fills buckets) and
+    # `_assert_exact`. This couples `_fqn_term_matches` (truth), `_file_fqn_terms` (fills buckets) and
     # `_fqn_candidates` (reads them) directly, so a future edit to any one that diverges fails here
     # rather than surfacing as a task that runs another resource. The bucket may be a *superset* (that
     # only costs a wasted predicate eval), so only the subset direction is asserted.
@@ -2028,3 +2124,715 @@ def test_bundled_test_for_a_parent_without_a_task_factory_is_refused():
 
     with pytest.raises(ValueError, match=seed_name):
         factory.create_tasks({"nodes": {seed_name: seed_info, test_name: test_info}})
+
+
+def _random_project(rnd: random.Random, size: int) -> dict:
+    """A random manifest of models, seeds, sources, data tests and unit tests sharing files and names."""
+    words = ["orders", "items", "raw", "dim", "a"]
+    nodes: dict = {}
+    sources = dict([_source("pkg", "raw", "events"), _source("pkg", "raw", "users")])
+    resources = list(sources)
+    for index in range(size):
+        full_name, info = (
+            _seed("pkg", f"seed_{index}")
+            if rnd.random() < 0.15
+            else _model(
+                rnd.choice(["pkg", "lib"]),
+                f"{rnd.choice(words)}_{index}",
+                depends_on=rnd.sample(resources, min(len(resources), rnd.randint(0, 3))),
+                path=f"models/{rnd.choice(words)}/m_{index}.sql",
+            )
+        )
+        nodes[full_name] = info
+        resources.append(full_name)
+    for index in range(size):
+        parents = rnd.sample(resources, rnd.choice([1, 1, 1, 2]))
+        full_name, info = _test(
+            "pkg",
+            f"not_null_{index}",
+            parents,
+            path=f"models/schema_{rnd.randint(0, 2)}.yml",
+            test_name=rnd.choice(["not_null", "unique", None]),
+        )
+        nodes[full_name] = info
+    unit_tests = dict(
+        _unit_test(info["package_name"], info["name"], f"ut_{full_name.rsplit('.', 1)[-1]}")
+        for full_name, info in nodes.items()
+        if info["resource_type"] == "model" and rnd.random() < 0.2
+    )
+    return {"nodes": nodes, "sources": sources, "unit_tests": unit_tests}
+
+
+def _edit_project(rnd: random.Random, manifest: dict) -> dict:
+    """A copy of `manifest` with a few records added, removed, disabled, renamed, moved or rewired."""
+    edited = {section: {key: dict(value) for key, value in entries.items()} for section, entries in manifest.items()}
+    nodes = edited["nodes"]
+    resources = [key for key, value in nodes.items() if value["resource_type"] != "test"] + list(edited["sources"])
+    for _ in range(rnd.randint(1, 4)):
+        full_name = rnd.choice(sorted(nodes))
+        info = nodes[full_name]
+        edit = rnd.choice(["remove", "disable", "rename", "move", "rewire", "add"])
+        if edit == "remove":
+            del nodes[full_name]
+        elif edit == "disable":
+            info["config"] = {**info.get("config", {}), "enabled": False}
+        elif edit == "rename":
+            info["fqn"] = [*info["fqn"][:-1], info["fqn"][-1] + "_renamed"]
+        elif edit == "move":
+            info["original_file_path"] = "models/moved/" + info["original_file_path"].rsplit("/", 1)[-1]
+        elif edit == "rewire":
+            info["depends_on"] = {"nodes": rnd.sample(resources, rnd.randint(1, 2))}
+        else:
+            new_name, new_info = _test("pkg", f"added_{rnd.randint(0, 10**6)}", rnd.sample(resources, 1))
+            nodes[new_name] = new_info
+    return edited
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled", "dbt_factory_build"])
+@pytest.mark.parametrize("seed", range(12))
+def test_update_tasks_equals_a_full_regeneration(request, seed, factory_fixture):
+    # The whole contract of `update_tasks`: whatever it reuses, the result is exactly what a full
+    # `create_tasks` of the new manifest returns. Edits that change no gate or selector, and edits that
+    # make a reused peer ambiguous, both occur over these layouts.
+    rnd = random.Random(seed)
+    factory = request.getfixturevalue(factory_fixture)
+    previous = _random_project(rnd, size=30)
+    previous_tasks = factory.create_tasks(previous)
+
+    for _ in range(3):
+        manifest = _edit_project(rnd, previous)
+        try:
+            expected = factory.create_tasks(manifest)
+        except ValueError:
+            continue
+        assert factory.update_tasks(manifest, previous, previous_tasks) == expected
+        previous, previous_tasks = manifest, expected
+
+
+def test_update_tasks_reuses_the_tasks_an_edit_cannot_affect(dbt_factory, monkeypatch):
+    nodes = dict(
+        [
+            _model("pkg", "customers", path="models/staging/customers.sql"),
+            _model("pkg", "orders", depends_on=["model.pkg.customers"]),
+            _model("pkg", "payments", path="models/finance/payments.sql"),
+            _test("pkg", "not_null_customers_id", ["model.pkg.customers"], test_name="not_null"),
+        ]
+    )
+    previous = {"nodes": nodes}
+    previous_tasks = dbt_factory.create_tasks(previous)
+    manifest = {"nodes": {**nodes, "model.pkg.payments": {**nodes["model.pkg.payments"], "fqn": ["pkg", "pay"]}}}
+
+    proven = []
+    original = DbtFactory._proven_plan
+    monkeypatch.setattr(
+        DbtFactory,
+        "_proven_plan",
+        classmethod(lambda cls, info, peers: proven.append(info.unique_id) or original(info, peers)),
+    )
+    tasks = dbt_factory.update_tasks(manifest, previous, previous_tasks)
+    monkeypatch.undo()
+
+    assert tasks == dbt_factory.create_tasks(manifest)
+    assert proven == ["model.pkg.payments"]
+
+
+def test_update_tasks_rebuilds_tasks_rendered_under_other_options(dbt_factory, notebook_factory):
+    nodes = dict([_model("pkg", "customers"), _model("pkg", "orders", depends_on=["model.pkg.customers"])])
+    previous_tasks = notebook_factory.create_tasks({"nodes": nodes})
+
+    assert dbt_factory.update_tasks({"nodes": nodes}, {"nodes": nodes}, previous_tasks) == dbt_factory.create_tasks(
+        {"nodes": nodes}
+    )
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled", "dbt_factory_build"])
+def test_parallel_proofs_generate_the_serial_tasks(request, monkeypatch, factory_fixture):
+    monkeypatch.setattr(DbtFactory, "_MIN_PARALLEL_PROOFS", 0)
+    factory = request.getfixturevalue(factory_fixture)
+    manifest = _random_project(random.Random(0), size=40)
+    expected = factory.create_tasks(manifest)
+
+    factory.jobs = 3
+
+    assert factory.create_tasks(manifest) == expected
+
+
+def test_parallel_proofs_raise_the_first_error_a_serial_run_raises(dbt_factory, monkeypatch):
+    # Both models are unaddressable; the builders reach `a_bad` first, so its error must win even when
+    # a worker finishes `b_bad` earlier.
+    monkeypatch.setattr(DbtFactory, "_MIN_PARALLEL_PROOFS", 0)
+    nodes = dict(
+        [
+            _model("pkg", "a_bad+1", fqn=["pkg", "a_bad+1"]),
+            _model("pkg", "b_bad+1", fqn=["pkg", "b_bad+1"]),
+            _model("pkg", "fine"),
+        ]
+    )
+    dbt_factory.jobs = 2
+
+    with pytest.raises(ValueError, match="'a_bad\\+1'"):
+        dbt_factory.create_tasks({"nodes": nodes})
+
+
+def test_factory_refuses_fewer_than_one_proof_process():
+    with pytest.raises(ValueError, match="jobs=0"):
+        DbtFactory({}, jobs=0)
+
+
+def test_phase_listener_reports_each_phase_and_leaves_the_tasks_unchanged(dbt_factory):
+    manifest = _random_project(random.Random(0), size=40)
+    expected = dbt_factory.create_tasks(manifest)
+    phases = []
+    dbt_factory.phase_listener = phases.append
+
+    tasks = dbt_factory.create_tasks(manifest)
+    dbt_factory.update_tasks(manifest, manifest, tasks)
+
+    assert tasks == expected
+    assert [phase.name for phase in phases] == [
+        *["layout", "selector_index", "gating", "build_tasks", "render_tasks"],
+        *["layout", "selector_index", "layout", "diff", "gating", "build_tasks", "render_tasks"],
+    ]
+    first_build, update_build = phases[3], phases[-2]
+    assert first_build.counts["tasks"] == len(expected) == phases[0].counts["tasks"]
+    assert first_build.counts["selectors_proven"] == len(expected)
+    assert first_build.counts["matching_calls"] > 0 and first_build.counts["candidates_scanned"] > 0
+    assert update_build.counts["reused_tasks"] == len(expected)
+    assert update_build.counts["selectors_proven"] == 0
+    assert all(phase.peak_traced_bytes is None for phase in phases)
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled"])
+def test_reduce_dependencies_keeps_every_ordering_constraint(request, factory_fixture):
+    factory = request.getfixturevalue(factory_fixture)
+    manifest = _random_project(random.Random(3), size=60)
+    full = {task["task_key"]: [dep["task_key"] for dep in task["depends_on"]] for task in factory.create_tasks(manifest)}
+
+    factory.reduce_dependencies = True
+    tasks = factory.create_tasks(manifest)
+    reduced = {task["task_key"]: [dep["task_key"] for dep in task["depends_on"]] for task in tasks}
+
+    assert reduced == transitive_reduction(full)
+    assert factory.removed_dependencies == sum(map(len, full.values())) - sum(map(len, reduced.values()))
+
+
+def test_reduce_dependencies_drops_edges_another_dependency_implies(dbt_factory):
+    nodes = dict(
+        [
+            _model("pkg", "customers"),
+            _model("pkg", "orders", depends_on=["model.pkg.customers"]),
+            _model("pkg", "revenue", depends_on=["model.pkg.orders", "model.pkg.customers"]),
+            _test("pkg", "not_null_customers_id", ["model.pkg.customers"]),
+        ]
+    )
+    dbt_factory.reduce_dependencies = True
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": nodes})}
+
+    # `orders` waits for the test, which waits for `customers`; `revenue` waits for `orders`.
+    assert tasks["orders_model"]["depends_on"] == [{"task_key": "not_null_customers_id_test"}]
+    assert tasks["revenue_model"]["depends_on"] == [{"task_key": "orders_model"}]
+    assert dbt_factory.removed_dependencies == 2
+
+
+def test_update_tasks_with_reduced_dependencies_regenerates_every_task(dbt_factory):
+    previous = _random_project(random.Random(4), size=30)
+    manifest = _edit_project(random.Random(5), previous)
+    dbt_factory.reduce_dependencies = True
+    previous_tasks = dbt_factory.create_tasks(previous)
+
+    assert dbt_factory.update_tasks(manifest, previous, previous_tasks) == dbt_factory.create_tasks(manifest)
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled"])
+def test_max_parallel_tasks_adds_ordering_dependencies_that_cap_concurrency(request, factory_fixture):
+    factory = request.getfixturevalue(factory_fixture)
+    manifest = _random_project(random.Random(7), size=60)
+    tasks = factory.create_tasks(manifest)
+    full = {task["task_key"]: [dep["task_key"] for dep in task["depends_on"]] for task in tasks}
+
+    factory.max_parallel_tasks = 3
+    tasks = factory.create_tasks(manifest)
+    limited = {task["task_key"]: [dep["task_key"] for dep in task["depends_on"]] for task in tasks}
+
+    # Every task keeps its dependencies, in order, and waits for at most one more task.
+    assert list(limited) == list(full)
+    assert all(limited[key][: len(full[key])] == full[key] and len(limited[key]) - len(full[key]) <= 1 for key in full)
+    assert factory.added_dependencies == sum(map(len, limited.values())) - sum(map(len, full.values())) > 0
+    rnd = random.Random(8)
+    for _ in range(5):
+        durations = {key: rnd.uniform(0, 100) for key in limited}
+        assert simulate_job(tasks, durations, task_startup_seconds=rnd.uniform(0, 10)).peak_concurrency <= 3
+
+
+def test_update_tasks_with_max_parallel_tasks_regenerates_every_task(dbt_factory):
+    previous = _random_project(random.Random(4), size=30)
+    manifest = _edit_project(random.Random(5), previous)
+    dbt_factory.max_parallel_tasks = 2
+    previous_tasks = dbt_factory.create_tasks(previous)
+
+    assert dbt_factory.update_tasks(manifest, previous, previous_tasks) == dbt_factory.create_tasks(manifest)
+
+
+def test_max_parallel_tasks_must_be_positive():
+    with pytest.raises(ValueError, match="max_parallel_tasks=0"):
+        DbtFactory({}, max_parallel_tasks=0)
+
+
+def test_compute_targets_balance_tasks_and_share_options(dbt_factory):
+    manifest = _random_project(random.Random(9), size=60)
+    expected = dbt_factory.create_tasks(manifest)
+    phases = []
+    dbt_factory.phase_listener = phases.append
+    dbt_factory.compute_targets = [ComputeTarget(warehouse_id="small"), ComputeTarget(warehouse_id="large", capacity=3)]
+
+    tasks = dbt_factory.create_tasks(manifest)
+
+    warehouses = [task["dbt_task"].pop("warehouse_id") for task in tasks]
+    assert tasks == expected
+    assert warehouses.count("large") > 2 * warehouses.count("small") > 0
+    # Every task shared one options object, so each target made one.
+    assign = next(phase for phase in phases if phase.name == "assign_compute")
+    assert assign.counts == {"tasks": len(tasks), "targets": 2, "options": 2}
+    assert dbt_factory.update_tasks(manifest, manifest, expected) != expected
+
+
+def _routed(node: tuple[str, dict], **hints: str) -> tuple[str, dict]:
+    full_name, info = node
+    return full_name, {**info, "config": {"meta": {"databricks": hints}}}
+
+
+def test_meta_databricks_routes_a_node_task_to_its_compute(dbt_factory):
+    nodes = dict(
+        [
+            _routed(_model("pkg", "heavy"), size_class="large"),
+            _routed(_model("pkg", "heavier", ["model.pkg.heavy"]), size_class="large", warehouse_id="wh_big"),
+            _routed(_model("pkg", "view_a"), environment_key="small_env"),
+            _routed(_model("pkg", "view_b"), environment_key="small_env"),
+            _model("pkg", "plain", ["model.pkg.heavier"]),
+        ]
+    )
+    dbt_factory.compute_classes = {"large": ComputeRoute(job_cluster_key="big_cluster", warehouse_id="wh_large")}
+    phases = []
+    dbt_factory.phase_listener = phases.append
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": nodes})}
+
+    def compute(task_key):
+        task = tasks[task_key]
+        return task.get("job_cluster_key"), task.get("environment_key"), task["dbt_task"].get("warehouse_id")
+
+    assert compute("heavy_model") == ("big_cluster", None, "wh_large")
+    assert compute("heavier_model") == ("big_cluster", None, "wh_big")
+    assert compute("view_a_model") == compute("view_b_model") == (None, "small_env", None)
+    assert compute("plain_model") == (None, "Default", None)
+    # The two views share one routed options object.
+    assert next(phase for phase in phases if phase.name == "route_compute").counts == {"routed_tasks": 4, "options": 3}
+    assert dbt_factory.task_compute["view_a_model"] is dbt_factory.task_compute["view_b_model"]
+
+
+def test_meta_databricks_routes_are_checked_before_generation(dbt_factory):
+    nodes = dict([_routed(_model("pkg", "heavy"), job_cluster_key="missing_cluster")])
+    dbt_factory.job_cluster_keys = {"big_cluster"}
+    with pytest.raises(ValueError, match="model.pkg.heavy runs on job cluster 'missing_cluster'.*big_cluster"):
+        dbt_factory.create_tasks({"nodes": nodes})
+
+    nodes = dict([_routed(_model("pkg", "heavy"), size_class="huge")])
+    with pytest.raises(ValueError, match="size_class 'huge', which is not a configured compute class"):
+        dbt_factory.create_tasks({"nodes": nodes})
+
+    with pytest.raises(ValueError, match="Compute class 'small' runs on environment 'serverless'"):
+        DbtFactory({}, compute_classes={"small": ComputeRoute(environment_key="serverless")}, environment_keys=[])
+
+
+def test_coalesce_chains_keeps_models_on_different_compute_apart(dbt_factory):
+    nodes = dict(
+        [
+            _model("pkg", "a"),
+            _model("pkg", "b", ["model.pkg.a"]),
+            _routed(_model("pkg", "c", ["model.pkg.b"]), job_cluster_key="big_cluster"),
+            _routed(_model("pkg", "d", ["model.pkg.c"]), job_cluster_key="big_cluster"),
+        ]
+    )
+    dbt_factory.coalesce_chains = True
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": nodes})}
+
+    assert set(tasks) == {"a_model", "c_model"}
+    assert tasks["c_model"]["depends_on"] == [{"task_key": "a_model"}]
+    assert tasks["c_model"]["job_cluster_key"] == "big_cluster" and "job_cluster_key" not in tasks["a_model"]
+
+
+def test_compute_targets_leave_a_task_routed_to_a_warehouse_where_it_is(dbt_factory):
+    nodes = dict(
+        [_routed(_model("pkg", "pinned"), warehouse_id="wh_pinned"), *(_model("pkg", f"m{i}") for i in range(6))]
+    )
+    dbt_factory.compute_targets = [ComputeTarget(warehouse_id="wh_a"), ComputeTarget(warehouse_id="wh_b")]
+
+    tasks = dbt_factory.create_tasks({"nodes": nodes})
+    warehouses = {task["task_key"]: task["dbt_task"]["warehouse_id"] for task in tasks}
+
+    assert warehouses.pop("pinned_model") == "wh_pinned"
+    assert sorted(warehouses.values()) == ["wh_a"] * 3 + ["wh_b"] * 3
+
+
+def test_partition_jobs_splits_tasks_into_a_chain_of_jobs_within_the_limit(dbt_factory, monkeypatch):
+    manifest = _random_project(random.Random(6), size=60)
+    tasks = dbt_factory.create_tasks(manifest)
+    monkeypatch.setattr(DbtFactory, "_MAX_JOB_TASKS", 20)
+    with pytest.raises(ValueError, match="chained jobs"):
+        dbt_factory.create_tasks(manifest)
+    assert dbt_factory.partition(tasks) == [tasks]
+
+    dbt_factory.partition_jobs = True
+    assert dbt_factory.create_tasks(manifest) == tasks
+    jobs = dbt_factory.partition(tasks)
+
+    # Every job but the last keeps a slot for the task starting the next one.
+    assert len(jobs) == -(-len(tasks) // 19) and all(len(job) <= 19 for job in jobs)
+    job_of = {task["task_key"]: number for number, job in enumerate(jobs) for task in job}
+    assert sorted(job_of) == sorted(task["task_key"] for task in tasks)
+    for task in tasks:
+        number = job_of[task["task_key"]]
+        dependencies = [dependency["task_key"] for dependency in task["depends_on"]]
+        assert all(job_of[dependency] <= number for dependency in dependencies)
+        kept = next(item for item in jobs[number] if item["task_key"] == task["task_key"])
+        assert kept == {**task, "depends_on": [{"task_key": key} for key in dependencies if job_of[key] == number]}
+
+
+def test_update_tasks_with_partitioned_jobs_regenerates_every_task(dbt_factory):
+    previous = _random_project(random.Random(4), size=30)
+    manifest = _edit_project(random.Random(5), previous)
+    dbt_factory.partition_jobs = True
+    previous_tasks = dbt_factory.create_tasks(previous)
+
+    assert dbt_factory.update_tasks(manifest, previous, previous_tasks) == dbt_factory.create_tasks(manifest)
+
+
+def test_coalesce_chains_runs_each_chain_of_models_as_one_task(dbt_factory):
+    nodes = dict(
+        [
+            _model("pkg", "stg_orders"),
+            _model("pkg", "int_orders", depends_on=["model.pkg.stg_orders"]),
+            _model("pkg", "orders", depends_on=["model.pkg.int_orders"]),
+            _model("pkg", "revenue", depends_on=["model.pkg.orders"]),
+            _model("pkg", "returns", depends_on=["model.pkg.orders"]),
+            _model("pkg", "finance", depends_on=["model.pkg.revenue"]),
+            _test("pkg", "not_null_revenue_id", ["model.pkg.revenue"]),
+        ]
+    )
+    dbt_factory.coalesce_chains = True
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": nodes})}
+
+    # `revenue` is tested, so its test is a second dependent and `finance` waits for both.
+    assert sorted(tasks) == [
+        "finance_model",
+        "not_null_revenue_id_test",
+        "returns_model",
+        "revenue_model",
+        "stg_orders_model",
+    ]
+    assert tasks["stg_orders_model"]["dbt_task"]["commands"] == [
+        "dbt run --select fqn:pkg.stg_orders,package:pkg,file:stg_orders.sql,resource_type:model "
+        "--select fqn:pkg.int_orders,package:pkg,file:int_orders.sql,resource_type:model "
+        "--select fqn:pkg.orders,package:pkg,file:orders.sql,resource_type:model --target dev"
+    ]
+    assert tasks["stg_orders_model"]["depends_on"] == []
+    assert dbt_factory.task_nodes["stg_orders_model"] == [
+        "model.pkg.stg_orders",
+        "model.pkg.int_orders",
+        "model.pkg.orders",
+    ]
+    assert tasks["revenue_model"]["depends_on"] == tasks["returns_model"]["depends_on"] == [
+        {"task_key": "stg_orders_model"}
+    ]
+    assert tasks["finance_model"]["depends_on"] == [
+        {"task_key": "revenue_model"},
+        {"task_key": "not_null_revenue_id_test"},
+    ]
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled", "dbt_factory_build"])
+def test_coalesce_chains_keeps_every_ordering_constraint_between_the_remaining_tasks(request, factory_fixture):
+    factory = request.getfixturevalue(factory_fixture)
+    manifest = _random_project(random.Random(7), size=80)
+    full = {task["task_key"]: task for task in factory.create_tasks(manifest)}
+
+    factory.coalesce_chains = True
+    coalesced = {task["task_key"]: task for task in factory.create_tasks(manifest)}
+
+    assert len(coalesced) < len(full) and set(coalesced) <= set(full)
+
+    def selects(task):
+        tokens = shlex.split(task["dbt_task"]["commands"][-1])
+        return [tokens[index + 1] for index, token in enumerate(tokens) if token == "--select"]
+
+    # Every task of the full job runs in exactly one coalesced task, which waits for what it waited for.
+    merged_into = {task_key: task_key for task_key in coalesced}
+    for task_key, task in coalesced.items():
+        for select in selects(task)[1:]:
+            merged_into.update((key, task_key) for key, other in full.items() if selects(other) == [select])
+    assert len(merged_into) == len(full)
+
+    def reachable(tasks, task_key):
+        found, pending = set(), [dependency["task_key"] for dependency in tasks[task_key]["depends_on"]]
+        while pending:
+            dependency = pending.pop()
+            if dependency not in found:
+                found.add(dependency)
+                pending.extend(item["task_key"] for item in tasks[dependency]["depends_on"])
+        return found
+
+    for task_key in coalesced:
+        expected = {merged_into[key] for key in reachable(full, task_key)} - {task_key}
+        assert reachable(coalesced, task_key) == expected
+
+
+def test_update_tasks_with_coalesced_chains_regenerates_every_task(dbt_factory):
+    previous = _random_project(random.Random(4), size=30)
+    manifest = _edit_project(random.Random(5), previous)
+    dbt_factory.coalesce_chains = True
+    previous_tasks = dbt_factory.create_tasks(previous)
+
+    assert dbt_factory.update_tasks(manifest, previous, previous_tasks) == dbt_factory.create_tasks(manifest)
+
+
+def test_duration_grouping_packs_fast_models_and_isolates_slow_ones(dbt_factory):
+    nodes = dict(
+        [
+            _model("pkg", "stg_a"),
+            _model("pkg", "int_a", depends_on=["model.pkg.stg_a"]),
+            _model("pkg", "heavy", depends_on=["model.pkg.int_a"]),
+            _model("pkg", "mart", depends_on=["model.pkg.heavy"]),
+        ]
+    )
+    dbt_factory.node_durations = {"model.pkg.stg_a": 5, "model.pkg.int_a": 5, "model.pkg.heavy": 900}
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": nodes})}
+
+    # `heavy` alone exceeds the 600-second target, so neither it nor its dependent share a task; `mart`
+    # has no duration and takes the median, 5 seconds.
+    assert sorted(tasks) == ["heavy_model", "mart_model", "stg_a_model"]
+    assert tasks["stg_a_model"]["dbt_task"]["commands"][-1].count("--select") == 2
+    assert tasks["heavy_model"]["depends_on"] == [{"task_key": "stg_a_model"}]
+
+
+def test_duration_grouping_keeps_the_critical_path_from_waiting_on_a_fast_branch(dbt_factory):
+    nodes = dict(
+        [
+            _model("pkg", "base"),
+            _model("pkg", "report", depends_on=["model.pkg.base"]),
+            _model("pkg", "slow_a", depends_on=["model.pkg.base"]),
+            _model("pkg", "slow_b", depends_on=["model.pkg.slow_a"]),
+        ]
+    )
+    dbt_factory.node_durations = {"model.pkg.base": 10, "model.pkg.report": 10, "model.pkg.slow_a": 300}
+    dbt_factory.node_durations["model.pkg.slow_b"] = 300
+
+    tasks = {task["task_key"]: task for task in dbt_factory.create_tasks({"nodes": nodes})}
+
+    # `report` joining `base` would delay `slow_a`, which the critical path runs through. `slow_a` joining
+    # delays only `report`, which has slack to spare; `slow_b` would push the group past the target.
+    assert sorted(tasks) == ["base_model", "report_model", "slow_b_model"]
+    assert "fqn:pkg.slow_a," in tasks["base_model"]["dbt_task"]["commands"][-1]
+    assert tasks["report_model"]["depends_on"] == tasks["slow_b_model"]["depends_on"] == [{"task_key": "base_model"}]
+
+
+def test_duration_grouping_settings_cannot_be_negative():
+    with pytest.raises(ValueError, match="cannot be negative"):
+        DbtFactory({}, target_task_seconds=-1)
+
+
+def test_build_mode_builds_each_tested_resource_with_its_tests_in_one_task(dbt_factory_build):
+    source_id, source = _source("pkg", "raw", "customers")
+    nodes = dict(
+        [
+            _model("pkg", "customers", depends_on=[source_id]),
+            _model("pkg", "orders", depends_on=["model.pkg.customers"]),
+            _test("pkg", "not_null_customers_id", ["model.pkg.customers"]),
+            _test("pkg", "unique_raw_customers_id", [source_id]),
+            _test("pkg", "relationships_orders", ["model.pkg.orders", "model.pkg.customers"]),
+        ]
+    )
+    unit_tests = dict([_unit_test("pkg", "customers", "test_customers_logic")])
+
+    tasks = dbt_factory_build.create_tasks({"nodes": nodes, "sources": {source_id: source}, "unit_tests": unit_tests})
+    by_key = {task["task_key"]: task for task in tasks}
+
+    # The source's tests and the cross-resource test keep their tasks; the model's run in its own.
+    assert sorted(by_key) == ["customers_model", "orders_model", "raw_customers_test", "relationships_orders_test"]
+    assert by_key["customers_model"]["dbt_task"]["commands"] == [
+        "dbt build --select fqn:pkg.customers,package:pkg,file:customers.sql,resource_type:model "
+        "--select fqn:pkg.customers.test_customers_logic,package:pkg,file:customers_unit_tests.yml,"
+        "resource_type:unit_test "
+        "--select fqn:pkg.not_null_customers_id,package:pkg,file:not_null_customers_id.yml,resource_type:test "
+        "--target dev --indirect-selection empty"
+    ]
+    assert by_key["customers_model"]["depends_on"] == [{"task_key": "raw_customers_test"}]
+    assert by_key["orders_model"]["depends_on"] == [{"task_key": "customers_model"}]
+    assert by_key["orders_model"]["dbt_task"]["commands"] == [
+        "dbt run --select fqn:pkg.orders,package:pkg,file:orders.sql,resource_type:model --target dev"
+    ]
+    assert dbt_factory_build.task_nodes["customers_model"] == [
+        "model.pkg.customers",
+        "test.pkg.not_null_customers_id",
+        "unit_test.pkg.customers.test_customers_logic",
+    ]
+
+
+def test_coalesce_chains_in_build_mode_never_merges_a_tested_model(dbt_factory_build):
+    nodes = dict(
+        [
+            _model("pkg", "stg_orders"),
+            _model("pkg", "orders", depends_on=["model.pkg.stg_orders"]),
+            _model("pkg", "revenue", depends_on=["model.pkg.orders"]),
+            _model("pkg", "finance", depends_on=["model.pkg.revenue"]),
+            _test("pkg", "not_null_orders_id", ["model.pkg.orders"]),
+        ]
+    )
+    dbt_factory_build.coalesce_chains = True
+
+    tasks = {task["task_key"]: task for task in dbt_factory_build.create_tasks({"nodes": nodes})}
+
+    # Merging `orders` into a `dbt run` would drop its test, so it ends one chain and starts none.
+    assert sorted(tasks) == ["orders_model", "revenue_model", "stg_orders_model"]
+    assert tasks["orders_model"]["dbt_task"]["commands"][0].startswith("dbt build ")
+    assert dbt_factory_build.task_nodes["revenue_model"] == ["model.pkg.revenue", "model.pkg.finance"]
+
+
+def test_build_mode_cannot_be_combined_with_bundled_tests(dbt_factory):
+    with pytest.raises(ValueError, match="cannot be combined with bundle_tests"):
+        DbtFactory(dbt_factory.task_factories, bundle_tests=True, build_mode=True)
+
+
+def test_file_strategy_bundles_the_tests_of_one_schema_file_across_parents(dbt_factory_bundled):
+    nodes = dict(
+        [
+            _model("pkg", "customers"),
+            _model("pkg", "orders"),
+            _model("pkg", "revenue", depends_on=["model.pkg.orders"]),
+            _test("pkg", "not_null_customers_id", ["model.pkg.customers"], path="models/schema.yml"),
+            _test("pkg", "not_null_orders_id", ["model.pkg.orders"], path="models/schema.yml"),
+            _test("pkg", "unique_orders_id", ["model.pkg.orders"], path="models/orders.yml"),
+        ]
+    )
+    dbt_factory_bundled.bundle_strategy = "file"
+
+    tasks = {task["task_key"]: task for task in dbt_factory_bundled.create_tasks({"nodes": nodes})}
+
+    assert sorted(tasks) == [
+        "customers_model",
+        "models_orders_yml_test",
+        "models_schema_yml_test",
+        "orders_model",
+        "revenue_model",
+    ]
+    assert tasks["models_schema_yml_test"]["depends_on"] == [
+        {"task_key": "customers_model"},
+        {"task_key": "orders_model"},
+    ]
+    assert tasks["models_schema_yml_test"]["dbt_task"]["commands"] == [
+        "dbt test --select fqn:pkg.not_null_customers_id,package:pkg,file:schema.yml,resource_type:test "
+        "--select fqn:pkg.not_null_orders_id,package:pkg,file:schema.yml,resource_type:test "
+        "--target dev --indirect-selection empty"
+    ]
+    # `revenue` waits for every bundle holding a test of `orders`.
+    assert tasks["revenue_model"]["depends_on"] == [
+        {"task_key": "models_orders_yml_test"},
+        {"task_key": "models_schema_yml_test"},
+    ]
+    assert dbt_factory_bundled.task_nodes["models_schema_yml_test"] == [
+        "test.pkg.not_null_customers_id",
+        "test.pkg.not_null_orders_id",
+    ]
+
+
+def test_max_bundle_tests_splits_a_parents_bundle_and_gates_on_every_part(dbt_factory_bundled):
+    nodes = dict(
+        [
+            _model("pkg", "orders"),
+            _model("pkg", "revenue", depends_on=["model.pkg.orders"]),
+            *(_test("pkg", f"check_{index}_orders", ["model.pkg.orders"]) for index in range(5)),
+        ]
+    )
+    dbt_factory_bundled.max_bundle_tests = 2
+
+    tasks = {task["task_key"]: task for task in dbt_factory_bundled.create_tasks({"nodes": nodes})}
+
+    assert sorted(tasks) == ["orders_model", "orders_test_1", "orders_test_2", "orders_test_3", "revenue_model"]
+    assert [len(dbt_factory_bundled.task_nodes[f"orders_test_{number}"]) for number in (1, 2, 3)] == [2, 2, 1]
+    assert tasks["orders_test_3"]["depends_on"] == [{"task_key": "orders_model"}]
+    assert tasks["revenue_model"]["depends_on"] == [
+        {"task_key": "orders_test_1"},
+        {"task_key": "orders_test_2"},
+        {"task_key": "orders_test_3"},
+    ]
+
+
+def test_max_bundle_seconds_splits_bundles_by_predicted_duration(dbt_factory_bundled):
+    nodes = dict(
+        [
+            _model("pkg", "orders"),
+            _test("pkg", "slow_orders", ["model.pkg.orders"]),
+            _test("pkg", "fast_a_orders", ["model.pkg.orders"]),
+            _test("pkg", "fast_b_orders", ["model.pkg.orders"]),
+        ]
+    )
+    dbt_factory_bundled.node_durations = {
+        "test.pkg.slow_orders": 50.0,
+        "test.pkg.fast_a_orders": 5.0,
+        "test.pkg.fast_b_orders": 8.0,
+    }
+    dbt_factory_bundled.target_task_seconds = 0.0
+    dbt_factory_bundled.max_bundle_seconds = 20.0
+
+    dbt_factory_bundled.create_tasks({"nodes": nodes})
+
+    # The fast tests share a bundle; the slow one is over the cap alone and still runs.
+    bundles = {key: nodes for key, nodes in dbt_factory_bundled.task_nodes.items() if key != "orders_model"}
+    assert bundles == {
+        "orders_test_1": ["test.pkg.fast_a_orders", "test.pkg.fast_b_orders"],
+        "orders_test_2": ["test.pkg.slow_orders"],
+    }
+
+
+@pytest.mark.parametrize(
+    ("strategy", "max_tests"), [("parent", 1), ("file", None), ("package", 3), ("directory", None)]
+)
+@pytest.mark.parametrize("seed", range(4))
+def test_regrouped_bundles_run_every_test_once_and_keep_every_gate(dbt_factory_bundled, strategy, max_tests, seed):
+    manifest = _random_project(random.Random(seed), size=40)
+    per_parent = {task["task_key"]: task for task in dbt_factory_bundled.create_tasks(manifest)}
+    per_parent_nodes = dict(dbt_factory_bundled.task_nodes)
+
+    dbt_factory_bundled.bundle_strategy, dbt_factory_bundled.max_bundle_tests = strategy, max_tests
+    tasks = dbt_factory_bundled.create_tasks(manifest)
+    by_key = {task["task_key"]: task for task in tasks}
+    task_nodes = dbt_factory_bundled.task_nodes
+
+    simulate_job(tasks, {})  # raises on a cycle
+    run = [node for nodes in task_nodes.values() for node in nodes]
+    assert sorted(run) == sorted(node for nodes in per_parent_nodes.values() for node in nodes)
+    assert len(run) == len(set(run))
+    holders = {node: task_key for task_key, nodes in task_nodes.items() for node in nodes}
+    for task_key, task in per_parent.items():
+        if task_key not in by_key:
+            continue
+        for dependency in task["depends_on"]:
+            expected = {holders[node] for node in per_parent_nodes[dependency["task_key"]]}
+            assert expected <= {item["task_key"] for item in by_key[task_key]["depends_on"]}
+    if max_tests is not None:
+        assert all(len(task_nodes[task_key]) <= max_tests for task_key in by_key if task_key not in per_parent_nodes)
+
+
+def test_bundle_strategies_and_caps_are_checked(dbt_factory):
+    factories = dbt_factory.task_factories
+    with pytest.raises(ValueError, match="Unknown bundle strategy 'folder'"):
+        DbtFactory(factories, bundle_tests=True, bundle_strategy="folder")
+    with pytest.raises(ValueError, match="max_bundle_tests=0"):
+        DbtFactory(factories, bundle_tests=True, max_bundle_tests=0)
+    with pytest.raises(ValueError, match="pass them too"):
+        DbtFactory(factories, bundle_tests=True, max_bundle_seconds=60.0)
+    with pytest.raises(ValueError, match="needs bundle_tests"):
+        DbtFactory(factories, bundle_strategy="file")
@@ -0,0 +1,99 @@
+import sys
+
+from databricks_dbt_factory.dbt_node import DbtNode, to_dbt_node, to_dbt_nodes
+
+
+def test_record_derives_the_fields_the_factory_reads():
+    node = DbtNode.from_manifest(
+        "test.pkg.not_null_orders_id.9a1",
+        {
+            "resource_type": "test",
+            "name": "not_null_orders_id",
+            "package_name": "pkg",
+            "fqn": ["pkg", "marts", "check.nested"],
+            "original_file_path": "models/marts/schema.yml",
+            "depends_on": {"macros": ["macro.dbt.test_not_null"], "nodes": ["model.pkg.orders"]},
+            "config": {"enabled": True, "severity": "warn"},
+            "test_metadata": {"name": "not_null", "kwargs": {"column_name": "id"}},
+            "raw_code": "{{ test_not_null(**_dbt_generic_test_kwargs) }}",
+        },
+    )
+
+    assert node.unique_id == "test.pkg.not_null_orders_id.9a1"
+    assert node.fqn == ("pkg", "marts", "check.nested")
+    assert node.flat_fqn == ("pkg", "marts", "check", "nested")
+    assert node.file_name == "schema.yml"
+    assert node.file_terms == frozenset({"schema.yml", "schema"})
+    assert node.depends_on == ("model.pkg.orders",)
+    assert node.enabled
+    assert node.test_name == "not_null"
+    assert not node.is_versioned
+
+
+def test_record_of_a_sparse_entry_uses_empty_values():
+    node = DbtNode.from_manifest("model.pkg.orders", {"config": None, "depends_on": {}})
+
+    assert (node.resource_type, node.name, node.package_name, node.test_name) == ("", "", "", "")
+    assert node.fqn == node.flat_fqn == node.depends_on == ()
+    assert node.enabled
+
+
+def test_record_is_disabled_only_by_an_explicit_false():
+    assert not DbtNode.from_manifest("model.pkg.a", {"config": {"enabled": False}}).enabled
+    assert DbtNode.from_manifest("model.pkg.a", {"config": {"enabled": None}}).enabled
+
+
+def test_file_name_is_omitted_when_path_flavours_disagree():
+    # A backslash is a separator under Windows semantics and a literal character under POSIX ones, so
+    # the `file:` term is unusable but both interpretations stay matchable.
+    node = DbtNode.from_manifest("model.pkg.a", {"original_file_path": "models\\marts\\a.sql"})
+
+    assert node.file_name == ""
+    assert node.file_terms == frozenset({"a.sql", "a", "models\\marts\\a.sql", "models\\marts\\a"})
+
+
+def test_only_a_versioned_model_is_versioned():
+    model = DbtNode.from_manifest("model.pkg.orders.v2", {"resource_type": "model", "version": 2})
+    unit_test = DbtNode.from_manifest("unit_test.pkg.orders.ut", {"resource_type": "unit_test", "version": 2})
+
+    assert model.is_versioned
+    assert not unit_test.is_versioned
+
+
+def test_records_share_interned_ids():
+    # Dependency ids repeat across the manifest; interning holds each one once.
+    parent_id = "".join(["model.pkg.", "orders"])
+    records = to_dbt_nodes(
+        {
+            "model.pkg.a": {"depends_on": {"nodes": ["model.pkg.orders"]}},
+            "model.pkg.b": {"depends_on": {"nodes": [parent_id]}},
+        }
+    )
+
+    assert records["model.pkg.a"].depends_on[0] is records["model.pkg.b"].depends_on[0]
+    assert records["model.pkg.a"].depends_on[0] is sys.intern("model.pkg.orders")
+
+
+def test_to_dbt_node_passes_a_record_through_and_keys_an_entry():
+    record = DbtNode.from_manifest("model.pkg.a", {"name": "a"})
+
+    assert to_dbt_node(record) is record
+    assert to_dbt_node({"name": "a"}, "model.pkg.a") == record
+    assert to_dbt_node({"name": "a", "unique_id": "model.pkg.a"}) == record
+    assert to_dbt_node({"name": "a"}).unique_id == ""
+
+
+def test_record_keeps_the_compute_hints_of_meta_databricks():
+    info = {
+        "config": {"meta": {"databricks": {"warehouse_id": "wh1", "size_class": "large", "other": "x"}}},
+        "meta": {"databricks": {"job_cluster_key": "ignored"}},
+    }
+
+    assert DbtNode.from_manifest("model.pkg.a", info).compute_hints == (
+        ("warehouse_id", "wh1"),
+        ("size_class", "large"),
+    )
+    # Without config.meta.databricks, the top-level meta is read.
+    legacy = DbtNode.from_manifest("model.pkg.a", {"meta": {"databricks": {"job_cluster_key": "c"}}})
+    assert legacy.compute_hints == (("job_cluster_key", "c"),)
+    assert DbtNode.from_manifest("model.pkg.a", {"config": {"meta": {"databricks": "large"}}}).compute_hints == ()
@@ -2,7 +2,7 @@ import json
 
 import pytest
 
-from databricks_dbt_factory.dbt_task import DbtTask, DbtTaskOptions, TaskType
+from databricks_dbt_factory.dbt_task import ComputeTarget, DbtTask, DbtTaskOptions, TaskType
 
 
 def _notebook_task_with_serialized_base_parameters_size(size: int) -> DbtTask:
@@ -74,6 +74,22 @@ def test_dbt_task_without_job_cluster_key_uses_environment():
     assert "job_cluster_key" not in result
 
 
+@pytest.mark.parametrize("task_type", [TaskType.DBT, TaskType.NOTEBOOK])
+def test_from_dict_rebuilds_a_rendered_task(task_type):
+    options = DbtTaskOptions(task_type=task_type, notebook_path="./runner.py", environment_key="Default")
+    task = DbtTask("orders_model", ["dbt run --select fqn:pkg.orders"], options, depends_on=["customers_model"])
+
+    rebuilt = DbtTask.from_dict(task.to_dict(), options)
+
+    assert rebuilt.to_dict() == task.to_dict()
+
+
+def test_from_dict_rejects_a_task_that_is_not_a_dbt_task():
+    options = DbtTaskOptions(task_type=TaskType.DBT, environment_key="Default")
+    with pytest.raises(ValueError, match="Not a rendered dbt task"):
+        DbtTask.from_dict({"task_key": "notify", "depends_on": [], "run_job_task": {"job_id": 1}}, options)
+
+
 def test_task_type_string_is_coerced_to_enum():
     options = DbtTaskOptions(task_type="notebook", notebook_path="./runner.py")
     assert options.task_type is TaskType.NOTEBOOK
@@ -171,3 +187,19 @@ def test_notebook_task_rejects_a_dynamic_reference_formed_across_serialized_comm
 
     with pytest.raises(ValueError, match="serialized dbt_commands.*dynamic value reference"):
         task.to_dict()
+
+
+def test_compute_target_overrides_only_what_it_sets():
+    options = DbtTaskOptions(task_type=TaskType.DBT, warehouse_id="wh123", job_cluster_key="dbt_cluster", schema="s")
+
+    assert ComputeTarget(warehouse_id="wh456").applied_to(options) == DbtTaskOptions(
+        task_type=TaskType.DBT, warehouse_id="wh456", job_cluster_key="dbt_cluster", schema="s"
+    )
+    assert ComputeTarget(job_cluster_key="big").applied_to(options).warehouse_id == "wh123"
+
+
+def test_compute_target_requires_compute_and_a_positive_capacity():
+    with pytest.raises(ValueError, match="warehouse_id or a job_cluster_key"):
+        ComputeTarget()
+    with pytest.raises(ValueError, match="capacity must be positive"):
+        ComputeTarget(warehouse_id="wh123", capacity=0)
@@ -0,0 +1,47 @@
+import pytest
+
+from databricks_dbt_factory.dbt_factory import DbtFactory, _SelectorIndex
+from databricks_dbt_factory.dbt_node import to_dbt_nodes
+from tests.test_dbt_factory import _fqn_terms_from, _model, _random_model_layout
+
+np = pytest.importorskip("numpy")
+
+from databricks_dbt_factory.fqn_matrix import FqnMatrix  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def _matched(matrix: FqnMatrix, term: str, ids: list[str]) -> set[str]:
+    return {ids[row] for row in matrix.matching_rows([term], range(len(ids)))}
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matrix_matches_what_the_predicate_matches_over_random_layouts(seed):
+    peers = to_dbt_nodes(_random_model_layout(seed, size=40))
+    ids = list(peers)
+    matrix = FqnMatrix(list(peers.values()))
+    term_pool = set().union(*(_fqn_terms_from(info) for info in _random_model_layout(seed, size=40).values()))
+
+    for term in sorted(term_pool | {"missing", "pkg.missing.orders", "a..b"}):
+        truth = {full_name for full_name, info in peers.items() if DbtFactory._fqn_term_matches(term, info)}
+        assert _matched(matrix, term, ids) == truth, term
+
+
+def test_matrix_falls_back_to_the_name_without_an_fqn():
+    full_name, info = _model("pkg", "orders")
+    del info["fqn"]
+    peers = to_dbt_nodes({full_name: info, **dict([_model("pkg", "items")])})
+    matrix = FqnMatrix(list(peers.values()))
+
+    assert _matched(matrix, "orders", list(peers)) == {full_name}
+    assert _matched(matrix, "pkg.orders", list(peers)) == set()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_vectorized_narrowing_matches_a_full_scan(monkeypatch, seed):
+    monkeypatch.setattr(_SelectorIndex, "_MIN_VECTORIZED", 0)
+    peers = _random_model_layout(seed, size=40)
+    index = DbtFactory._selector_index(peers)
+
+    for info in peers.values():
+        select = DbtFactory._node_select(info)
+        assert sorted(DbtFactory._matching_ids(select, index)) == sorted(DbtFactory._matching_ids(select, peers))
+    assert index.stats["candidates_vectorized"] > 0
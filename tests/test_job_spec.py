@@ -1,11 +1,12 @@
 import os
+import random
 import stat
 
 import pytest
 import yaml
 
 from databricks_dbt_factory import job_spec
-from databricks_dbt_factory.job_spec import replace_tasks_in_job_spec
+from databricks_dbt_factory.job_spec import read_job_spec_compute, read_job_spec_tasks, replace_tasks_in_job_spec
 
 
 def _write(path, content: dict) -> str:
@@ -107,6 +108,33 @@ def test_replace_tasks_in_place_update(tmp_path):
     assert written["resources"]["jobs"]["my_job"]["name"] == "keep"
 
 
+def test_read_job_spec_tasks_reads_what_replace_tasks_wrote(tmp_path):
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": {}, "other": {"tasks": []}}}})
+    target = tmp_path / "out.yaml"
+
+    replace_tasks_in_job_spec(spec, [{"task_key": "orders_model", "depends_on": []}], str(target))
+
+    assert read_job_spec_tasks(target) == [{"task_key": "orders_model", "depends_on": []}]
+    assert read_job_spec_tasks(spec) == []
+
+
+def test_read_job_spec_tasks_raises_valueerror_when_tasks_is_not_a_list(tmp_path):
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": {"tasks": "orders_model"}}}})
+    with pytest.raises(ValueError, match="no task list"):
+        read_job_spec_tasks(spec)
+
+
+def test_read_job_spec_compute_reads_the_first_jobs_clusters_and_environments(tmp_path):
+    job = {
+        "job_clusters": [{"job_cluster_key": "big_cluster", "new_cluster": {}}, {"new_cluster": {}}],
+        "environments": [{"environment_key": "Default"}, {"environment_key": "small_env"}],
+    }
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": job, "other": {"job_clusters": "x"}}}})
+
+    assert read_job_spec_compute(spec) == ({"big_cluster"}, {"Default", "small_env"})
+    assert read_job_spec_compute(_write(tmp_path / "bare.yaml", {"resources": {"jobs": {"j": {}}}})) == (set(), set())
+
+
 @pytest.mark.skipif(os.name == "nt", reason="requires POSIX permission-bit semantics")
 def test_new_target_inherits_input_template_mode(tmp_path):
     source = tmp_path / "in.yaml"
@@ -196,3 +224,100 @@ def test_replace_tasks_write_is_atomic_on_failure(tmp_path, monkeypatch):
     # original untouched, and no stray .job_spec_*.tmp left behind
     assert yaml.safe_load(path.read_text(encoding="utf-8")) == original
     assert [p.name for p in tmp_path.iterdir()] == ["job.yaml"]
+
+
+# Characters that exercise every quoting style the emitters choose between: plain, single- and
+# double-quoted scalars, indicators, and strings that would otherwise load as another type.
+_SCALAR_PIECES = [*"abc XYZ:-#{}[]'\",.|>*&!%@`\\/?=", "{{", "}}", "yes", "null", "0x1", "1e3", "~", ": ", " #"]
+
+
+def _random_document(rng: random.Random, pieces: list[str], depth: int = 0):
+    def text(repeat: int = 1) -> str:
+        return "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) * repeat
+
+    roll = rng.random()
+    if depth < 4 and roll < 0.2:
+        return {text(rng.choice([1, 1, 30])) or "key": _random_document(rng, pieces, depth + 1) for _ in range(3)}
+    if depth < 4 and roll < 0.35:
+        return [_random_document(rng, pieces, depth + 1) for _ in range(rng.randint(0, 3))]
+    if roll < 0.45:
+        return rng.choice([True, None, rng.randint(-5, 10**12), 1.5, float("inf")])
+    return text(rng.choice([1, 1, 100]))
+
+
+@pytest.mark.skipif(job_spec._CSafeDumper is None, reason="PyYAML was built without LibYAML")
+def test_c_dumper_renders_what_the_python_dumper_renders():
+    # Long scalars cross the 1,000-column width the emitters fold at.
+    rng = random.Random(0)
+    for _ in range(1_000):
+        document = {"resources": {"jobs": {"job": {"tasks": [_random_document(rng, _SCALAR_PIECES)]}}}}
+        assert job_spec._emits_identically(document)
+        assert yaml.dump(document, Dumper=job_spec._CSafeDumper, sort_keys=False, width=1000) == yaml.dump(
+            document, Dumper=yaml.SafeDumper, sort_keys=False, width=1000
+        )
+
+
+@pytest.mark.parametrize(
+    "task",
+    [
+        {"": "empty key"},
+        {"task_key": "caf\u00e9 " * 200},
+        {"task_key": "tab\tseparated " * 100},
+        {"task_key": ["line\nbreak " * 100]},
+    ],
+    ids=["empty-key", "non-ascii", "tab", "newline"],
+)
+def test_documents_the_emitters_render_differently_take_the_python_dumper(tmp_path, task):
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": {"tasks": []}}}})
+    document = {"resources": {"jobs": {"my_job": {"tasks": [task]}}}}
+
+    assert not job_spec._emits_identically(document)
+    assert job_spec.render_job_spec(spec, [task]) == yaml.dump(document, sort_keys=False, width=1000)
+
+
+def test_replace_tasks_streams_the_rendered_spec(tmp_path):
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": {"name": "my_job", "tasks": []}}}})
+    tasks = [{"task_key": f"task_{index}", "depends_on": [{"task_key": "upstream"}]} for index in range(50)]
+
+    replace_tasks_in_job_spec(spec, tasks, str(tmp_path / "out.yaml"), "renamed")
+
+    rendered = job_spec.render_job_spec(spec, tasks, "renamed")
+    assert (tmp_path / "out.yaml").read_bytes() == rendered.encode("utf-8")
+
+
+def test_render_chained_job_spec_links_copies_of_the_first_job(tmp_path):
+    first_job = {"name": "nightly", "schedule": {"quartz_cron_expression": "0 0 1 * * ?"}, "environments": []}
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": {**first_job, "tasks": []}}}})
+    job_tasks = [
+        [{"task_key": "a_model", "depends_on": []}, {"task_key": "b_model", "depends_on": [{"task_key": "a_model"}]}],
+        [{"task_key": "c_model", "depends_on": []}],
+        [{"task_key": "d_model", "depends_on": []}],
+    ]
+
+    jobs = yaml.safe_load(job_spec.render_chained_job_spec(spec, job_tasks))["resources"]["jobs"]
+
+    assert list(jobs) == ["my_job", "my_job_part_2", "my_job_part_3"]
+    assert jobs["my_job"] == {
+        **first_job,
+        "tasks": [
+            *job_tasks[0],
+            {
+                "task_key": "run_next_job",
+                "depends_on": [{"task_key": "b_model"}],
+                "run_job_task": {"job_id": "${resources.jobs.my_job_part_2.id}"},
+            },
+        ],
+    }
+    assert jobs["my_job_part_2"]["name"] == "nightly (part 2 of 3)" and "schedule" not in jobs["my_job_part_2"]
+    assert jobs["my_job_part_2"]["tasks"][-1]["run_job_task"] == {"job_id": "${resources.jobs.my_job_part_3.id}"}
+    assert jobs["my_job_part_3"] == {"name": "nightly (part 3 of 3)", "environments": [], "tasks": job_tasks[2]}
+    assert job_spec.render_chained_job_spec(spec, job_tasks[:1], "renamed") == job_spec.render_job_spec(
+        spec, job_tasks[0], "renamed"
+    )
+
+
+def test_render_chained_job_spec_refuses_a_taken_part_key(tmp_path):
+    spec = _write(tmp_path / "in.yaml", {"resources": {"jobs": {"my_job": {"tasks": []}, "my_job_part_2": {}}}})
+
+    with pytest.raises(ValueError, match="already uses the key 'my_job_part_2'"):
+        job_spec.render_chained_job_spec(spec, [[{"task_key": "a_model"}], [{"task_key": "b_model"}]])
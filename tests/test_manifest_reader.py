@@ -0,0 +1,151 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from databricks_dbt_factory import manifest_reader
+from databricks_dbt_factory.dbt_node import DbtNode
+from databricks_dbt_factory.manifest_reader import read_dbt_manifest_nodes, read_slim_dbt_manifest
+from databricks_dbt_factory.utils import read_dbt_manifest
+
+MANIFEST_PATH = str(Path(__file__).resolve().parent / "test_data" / "manifest.json")
+
+
+def _write(tmp_path: Path, content: str) -> str:
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(content, encoding="utf-8")
+    return str(manifest_path)
+
+
+def test_slim_manifest_keeps_only_the_factory_sections_and_fields():
+    manifest = read_slim_dbt_manifest(MANIFEST_PATH)
+
+    assert set(manifest) == {"nodes", "sources", "unit_tests"}
+    node = manifest["nodes"]["model.dbt_demo.diamonds_list_colors"]
+    assert node["fqn"] == ["dbt_demo", "sql_model1", "diamonds_list_colors"]
+    assert node["config"] == {"enabled": True, "meta": {}}
+    assert node["depends_on"] == {"nodes": ["model.dbt_demo.diamonds_four_cs"]}
+    assert "raw_code" not in node
+    assert "columns" not in node
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled"])
+def test_slim_manifest_generates_the_same_tasks_as_the_full_manifest(request, factory_fixture):
+    factory = request.getfixturevalue(factory_fixture)
+
+    full_tasks = factory.create_tasks(read_dbt_manifest(MANIFEST_PATH))
+    slim_tasks = factory.create_tasks(read_slim_dbt_manifest(MANIFEST_PATH))
+
+    assert slim_tasks == full_tasks
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_slim_manifest_is_independent_of_chunk_boundaries(monkeypatch, chunk_size):
+    # Every token kind — keys, strings, numbers, whitespace runs, skipped containers, decoded entries —
+    # lands on a chunk boundary somewhere in the fixture at these sizes, and a token cut short must be
+    # refilled rather than taken as complete.
+    expected = read_slim_dbt_manifest(MANIFEST_PATH)
+    monkeypatch.setattr(manifest_reader, "_CHUNK_SIZE", chunk_size)
+
+    assert read_slim_dbt_manifest(MANIFEST_PATH) == expected
+
+
+def test_slim_manifest_decodes_escapes_and_steps_over_structure_inside_strings(tmp_path):
+    # Skipped values are scanned rather than decoded, so braces, brackets and escaped quotes inside a
+    # skipped string must not unbalance the scan, and a kept value must still be decoded exactly.
+    manifest = {
+        "macros": {"macro.pkg.m": {"macro_sql": '{% set x = "}]\\"" %}{{ x }}'}},
+        "nodes": {
+            "model.pkg.a": {
+                "name": 'aé"b',
+                "raw_code": "select '{' as brace, '[' as bracket, '\\\"' as quote",
+                "config": {"enabled": False, "meta": {"nested": [{"deep": "}"}]}},
+                "depends_on": {"macros": ["macro.pkg.m"], "nodes": []},
+                "version": 2,
+            }
+        },
+        "sources": {},
+    }
+    path = _write(tmp_path, json.dumps(manifest, indent=2))
+
+    assert read_slim_dbt_manifest(path) == {
+        "nodes": {
+            "model.pkg.a": {
+                "name": 'aé"b',
+                "config": {"enabled": False, "meta": {}},
+                "depends_on": {"nodes": []},
+                "version": 2,
+            }
+        },
+        "sources": {},
+    }
+
+
+def test_slim_manifest_keeps_a_non_object_field_whole(tmp_path):
+    # `config` is filtered by sub-field, but a hand-written manifest can set it to null; the value must
+    # survive as-is for `_enabled_only`'s `or {}` to see it.
+    path = _write(tmp_path, '{"nodes": {"model.pkg.a": {"name": "a", "config": null}}}')
+
+    assert read_slim_dbt_manifest(path) == {"nodes": {"model.pkg.a": {"name": "a", "config": None}}}
+
+
+def test_slim_manifest_missing_file_raises():
+    with pytest.raises(FileNotFoundError, match="Manifest file not found"):
+        read_slim_dbt_manifest("/no/such/manifest.json")
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        "{not json",
+        '{"nodes": {"model.pkg.a": {"name": "a",}}}',
+        '{"macros": {"m": [1, 2}}',
+        '{"docs": "unterminated}',
+        '{"nodes": {}} trailing',
+        "",
+    ],
+    ids=["unquoted-key", "trailing-comma", "unbalanced-skip", "unterminated-string", "extra-data", "empty"],
+)
+def test_slim_manifest_invalid_json_raises(tmp_path, payload):
+    with pytest.raises(ValueError, match="Error parsing JSON"):
+        read_slim_dbt_manifest(_write(tmp_path, payload))
+
+
+@pytest.mark.parametrize("payload", ["[]", '"just a string"', "7", "null"], ids=["list", "string", "int", "null"])
+def test_slim_manifest_rejects_non_object_json(tmp_path, payload):
+    with pytest.raises(ValueError, match="must contain a JSON object"):
+        read_slim_dbt_manifest(_write(tmp_path, payload))
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled"])
+def test_manifest_records_generate_the_same_tasks_as_the_full_manifest(request, factory_fixture):
+    factory = request.getfixturevalue(factory_fixture)
+
+    full_tasks = factory.create_tasks(read_dbt_manifest(MANIFEST_PATH))
+    record_tasks = factory.create_tasks(read_dbt_manifest_nodes(MANIFEST_PATH))
+
+    assert record_tasks == full_tasks
+
+
+def test_manifest_records_are_keyed_by_section_and_id():
+    manifest = read_dbt_manifest_nodes(MANIFEST_PATH)
+
+    assert set(manifest) == {"nodes", "sources", "unit_tests"}
+    node = manifest["nodes"]["model.dbt_demo.diamonds_list_colors"]
+    assert isinstance(node, DbtNode)
+    assert node.unique_id == "model.dbt_demo.diamonds_list_colors"
+    assert node.depends_on == ("model.dbt_demo.diamonds_four_cs",)
+
+
+def test_manifest_records_keep_the_compute_hints_of_meta_databricks(tmp_path):
+    entry = {"name": "a", "config": {"enabled": True, "meta": {"owner": "x", "databricks": {"size_class": "large"}}}}
+    path = _write(tmp_path, json.dumps({"nodes": {"model.pkg.a": entry}}))
+
+    assert read_dbt_manifest_nodes(path)["nodes"]["model.pkg.a"].compute_hints == (("size_class", "large"),)
+
+
+def test_manifest_records_refuse_a_non_object_entry(tmp_path):
+    path = _write(tmp_path, '{"nodes": {"model.pkg.a": ["not", "an", "object"]}}')
+
+    with pytest.raises(ValueError, match="'model.pkg.a' must be a JSON object, got list"):
+        read_dbt_manifest_nodes(path)
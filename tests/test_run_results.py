@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from databricks_dbt_factory.run_results import read_node_durations
+
+
+def _write(path, content) -> str:
+    path.write_text(json.dumps(content), encoding="utf-8")
+    return str(path)
+
+
+def test_read_node_durations_averages_run_results_and_timing_files(tmp_path):
+    run_results = _write(
+        tmp_path / "run_results.json",
+        {
+            "metadata": {"dbt_version": "1.8.0"},
+            "results": [
+                {"unique_id": "model.pkg.orders", "status": "success", "execution_time": 10.0},
+                {"unique_id": "model.pkg.items", "status": "skipped", "execution_time": 0.0},
+                {"unique_id": "test.pkg.not_null_orders_id", "status": "pass", "execution_time": 1.5},
+            ],
+        },
+    )
+    aggregated = _write(tmp_path / "timings.json", {"model.pkg.orders": 20, "model.pkg.items": 4})
+
+    assert read_node_durations([run_results, aggregated]) == {
+        "model.pkg.orders": 15.0,
+        "test.pkg.not_null_orders_id": 1.5,
+        "model.pkg.items": 4.0,
+    }
+    assert not read_node_durations([])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        [1, 2],
+        {"model.pkg.orders": "fast"},
+        {"model.pkg.orders": -1},
+        {"model.pkg.orders": True},
+        {"results": [{"unique_id": "model.pkg.orders", "status": "success"}]},
+    ],
+    ids=["list", "string", "negative", "boolean", "no-execution-time"],
+)
+def test_read_node_durations_rejects_files_without_usable_durations(tmp_path, content):
+    with pytest.raises(ValueError, match="Timing file"):
+        read_node_durations([_write(tmp_path / "timings.json", content)])
+
+
+def test_read_node_durations_reports_missing_and_malformed_files(tmp_path):
+    with pytest.raises(FileNotFoundError, match="Timing file not found"):
+        read_node_durations([str(tmp_path / "missing.json")])
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    with pytest.raises(ValueError, match="Error parsing JSON"):
+        read_node_durations([str(tmp_path / "broken.json")])
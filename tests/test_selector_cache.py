@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from databricks_dbt_factory import dbt_factory as dbt_factory_module
+from databricks_dbt_factory.dbt_factory import DbtFactory
+from databricks_dbt_factory.selector_cache import SelectorCache
+from databricks_dbt_factory.utils import read_dbt_manifest
+
+MANIFEST_PATH = str(Path(__file__).resolve().parent / "test_data" / "manifest.json")
+
+
+def _model(name: str, depends_on: list[str] | None = None, path: str | None = None) -> tuple[str, dict]:
+    return f"model.pkg.{name}", {
+        "resource_type": "model",
+        "name": name,
+        "package_name": "pkg",
+        "fqn": ["pkg", name],
+        "original_file_path": path or f"models/{name}.sql",
+        "depends_on": {"nodes": depends_on or []},
+    }
+
+
+def _not_null(name: str, parent: str, fqn_leaf: str | None = None) -> tuple[str, dict]:
+    return f"test.pkg.{name}", {
+        "resource_type": "test",
+        "name": name,
+        "package_name": "pkg",
+        "fqn": ["pkg", fqn_leaf or name],
+        "original_file_path": "models/schema.yml",
+        "depends_on": {"nodes": [parent]},
+        "test_metadata": {"name": "not_null"},
+    }
+
+
+def _generate(factory: DbtFactory, manifest: dict, cache_dir: Path) -> tuple[list[dict], SelectorCache]:
+    """Generates with a cache loaded from `cache_dir`, then persists it as the CLI does."""
+    cache = SelectorCache(cache_dir)
+    factory.selector_cache = cache
+    try:
+        tasks = factory.create_tasks(manifest)
+    finally:
+        factory.selector_cache = None
+    cache.save()
+    return tasks, cache
+
+
+@pytest.mark.parametrize("factory_fixture", ["dbt_factory", "dbt_factory_bundled"])
+def test_warm_cache_reuses_every_proof_and_generates_identical_tasks(request, tmp_path, factory_fixture):
+    factory = request.getfixturevalue(factory_fixture)
+    manifest = read_dbt_manifest(MANIFEST_PATH)
+    expected = factory.create_tasks(manifest)
+
+    cold_tasks, cold = _generate(factory, manifest, tmp_path)
+    warm_tasks, warm = _generate(factory, manifest, tmp_path)
+
+    assert cold_tasks == warm_tasks == expected
+    assert cold.hits == 0 and cold.misses > 0
+    assert warm.hits == cold.misses and warm.misses == 0
+
+
+def test_a_changed_node_is_reproved_while_unrelated_proofs_are_reused(dbt_factory, tmp_path):
+    nodes = dict([_model("a"), _model("b"), _model("c"), _not_null("not_null_a", "model.pkg.a")])
+    _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+
+    nodes["model.pkg.b"] = _model("b", path="models/renamed/b.sql")[1]
+    tasks, cache = _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+
+    assert tasks == dbt_factory.create_tasks({"nodes": nodes})
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_a_new_peer_sharing_a_bucket_invalidates_a_cached_plan(dbt_factory, tmp_path):
+    # The first run proves `first`'s direct selector exact. A second not_null test with the same fqn
+    # and file makes that selector match both, so reusing the stored plan would run the wrong test.
+    nodes = dict([_model("a"), _model("b"), _not_null("first", "model.pkg.a", fqn_leaf="shared")])
+    first_tasks, _ = _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+
+    nodes.update([_not_null("second", "model.pkg.b", fqn_leaf="shared")])
+    tasks, _ = _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+
+    assert tasks == dbt_factory.create_tasks({"nodes": nodes})
+    first_commands = [task for task in first_tasks if task["task_key"] == "first_test"]
+    commands = [task for task in tasks if task["task_key"] == "first_test"]
+    assert commands != first_commands
+
+
+def test_a_proof_reading_many_buckets_depends_on_the_whole_index(dbt_factory, tmp_path, monkeypatch):
+    # pylint: disable=protected-access
+    monkeypatch.setattr(dbt_factory_module._SelectorIndex, "_MAX_RECORDED_READS", 0)
+    nodes = dict([_model("a"), _model("b"), _not_null("not_null_a", "model.pkg.a")])
+    _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+    _, unchanged = _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+
+    nodes["model.pkg.b"] = _model("b", path="models/renamed/b.sql")[1]
+    tasks, changed = _generate(dbt_factory, {"nodes": nodes}, tmp_path)
+
+    assert unchanged.misses == 0
+    assert tasks == dbt_factory.create_tasks({"nodes": nodes})
+    assert changed.hits == 0
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"{not json",
+        b"[]",
+        json.dumps({"format": 1, "version": "0.0.0", "run": 1, "entries": {}}).encode(),
+    ],
+    ids=["corrupt", "not-an-object", "other-version"],
+)
+def test_an_unusable_cache_file_is_treated_as_empty(dbt_factory, tmp_path, content):
+    (tmp_path / "selector-cache.json").write_bytes(content)
+    manifest = read_dbt_manifest(MANIFEST_PATH)
+
+    tasks, cache = _generate(dbt_factory, manifest, tmp_path)
+
+    assert tasks == dbt_factory.create_tasks(manifest)
+    assert cache.hits == 0
+    _, rewritten = _generate(dbt_factory, manifest, tmp_path)
+    assert rewritten.misses == 0
+
+
+def test_save_evicts_the_least_recently_used_proofs(tmp_path):
+    cache = SelectorCache(tmp_path, max_entries=2)
+    cache.store("select:old", "f", [], "fqn:pkg.old", "")
+    cache.save()
+    cache = SelectorCache(tmp_path, max_entries=2)
+    cache.store("select:new", "f", [], "fqn:pkg.new", "")
+    cache.store("select:newer", "f", [], "fqn:pkg.newer", "")
+    cache.save()
+
+    reloaded = SelectorCache(tmp_path, max_entries=2)
+
+    assert reloaded.lookup("select:old", "f", lambda *_: "") is None
+    assert reloaded.lookup("select:new", "f", lambda *_: "") == ("fqn:pkg.new", "")
+    assert reloaded.lookup("select:newer", "f", lambda *_: "") == ("fqn:pkg.newer", "")
+
+
+def test_max_entries_must_be_positive(tmp_path):
+    with pytest.raises(ValueError, match="at least one entry"):
+        SelectorCache(tmp_path, max_entries=0)
+
+
+def test_parallel_proofs_fill_the_cache_a_serial_run_reuses(dbt_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(DbtFactory, "_MIN_PARALLEL_PROOFS", 0)
+    manifest = read_dbt_manifest(MANIFEST_PATH)
+    dbt_factory.jobs = 2
+    parallel_tasks, cold = _generate(dbt_factory, manifest, tmp_path)
+
+    dbt_factory.jobs = 1
+    serial_tasks, warm = _generate(dbt_factory, manifest, tmp_path)
+
+    assert parallel_tasks == serial_tasks
+    assert warm.hits == cold.misses and warm.misses == 0
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from databricks_dbt_factory.simulation import estimate_task_seconds, simulate_job
+
+
+def _task(task_key: str, *depends_on: str) -> dict:
+    return {"task_key": task_key, "depends_on": [{"task_key": dependency} for dependency in depends_on]}
+
+
+DIAMOND = [_task("a"), _task("b", "a"), _task("c", "a"), _task("d", "b", "c")]
+SECONDS = {"a": 10, "b": 30, "c": 20, "d": 5}
+
+
+def test_simulate_job_without_a_cap_follows_the_longest_path():
+    report = simulate_job(DIAMOND, SECONDS, task_startup_seconds=5)
+
+    assert report.makespan_seconds == 15 + 35 + 10
+    assert report.critical_path == ["a", "b", "d"]
+    assert report.peak_concurrency == 2
+    assert report.busy_seconds == 85
+    # Two slots over 60 seconds: `a` and `d` run alone, and `c` finishes 10 seconds before `b`.
+    assert report.idle_slot_seconds == 2 * 60 - 85
+    assert json.loads(report.to_json())["critical_path"] == ["a", "b", "d"]
+
+
+def test_simulate_job_with_a_cap_queues_ready_tasks_in_order():
+    report = simulate_job(DIAMOND, SECONDS, max_concurrent_tasks=1, task_startup_seconds=5)
+
+    # `c` waits for the slot `b` holds, so the path runs through the queue.
+    assert report.makespan_seconds == 85
+    assert report.critical_path == ["a", "b", "c", "d"]
+    assert report.peak_concurrency == 1 and report.idle_slot_seconds == 0
+
+
+def test_simulate_job_rejects_jobs_that_cannot_run():
+    with pytest.raises(ValueError, match="not in the job"):
+        simulate_job([_task("a", "missing")], {})
+    with pytest.raises(ValueError, match="cycle"):
+        simulate_job([_task("a", "b"), _task("b", "a")], {})
+    with pytest.raises(ValueError, match="max_concurrent_tasks=0"):
+        simulate_job(DIAMOND, SECONDS, max_concurrent_tasks=0)
+
+
+def test_estimate_task_seconds_sums_node_durations_with_the_median_as_default():
+    task_nodes = {"orders_model": ["model.pkg.orders"], "orders_test": ["test.pkg.a", "test.pkg.b"]}
+    durations = {"model.pkg.orders": 10.0, "test.pkg.a": 1.0, "model.pkg.other": 3.0}
+
+    assert estimate_task_seconds(task_nodes, durations) == {"orders_model": 10.0, "orders_test": 4.0}
+    assert estimate_task_seconds(task_nodes, {}, default_node_seconds=2) == {"orders_model": 2, "orders_test": 4}
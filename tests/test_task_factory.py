@@ -240,3 +240,53 @@ def test_bundled_task_passes_each_selector_as_its_own_select_argument():
     )
     # No selector may be joined into a single argument with another.
     assert " ".join(sorted(["fqn:pkg.a,package:pkg", "fqn:pkg.b,package:pkg"])) not in command
+
+
+def test_chained_model_task_runs_every_selector_in_one_command_after_any_needed_deps():
+    options = DbtTaskOptions(task_type="dbt", dbt_deps_enabled=True, dbt_tasks_deps=["orders"])
+    factory = ModelTaskFactory(DbtDependencyResolver(), options, "--target dev")
+
+    task = factory.create_chained_task(
+        "stg_orders_model",
+        ["fqn:pkg.stg_orders,package:pkg", "fqn:pkg.orders,package:pkg"],
+        ["stg_orders", "orders"],
+        ["raw_orders_seed"],
+    )
+
+    assert task.task_key == "stg_orders_model" and task.depends_on == ["raw_orders_seed"]
+    assert task.commands == [
+        "dbt deps --target dev",
+        "dbt run --select fqn:pkg.stg_orders,package:pkg --select fqn:pkg.orders,package:pkg --target dev",
+    ]
+
+
+def test_build_mode_runs_parent_scoped_tests_after_the_build():
+    options = DbtTaskOptions(task_type="dbt", dbt_deps_enabled=True)
+    factory = ModelTaskFactory(DbtDependencyResolver(), options, "--target dev")
+
+    task = factory.create_build_task(
+        "fqn:pkg.orders,package:pkg",
+        "orders",
+        {"depends_on": {"nodes": ["model.pkg.customers"]}},
+        "orders_model",
+        {"model.pkg.customers": "customers_model"},
+        {"cautious": ["fqn:pkg.orders,fqn:pkg.b"], "empty": ["fqn:pkg.a"]},
+    )
+
+    assert task.depends_on == ["customers_model"]
+    assert task.commands == [
+        "dbt deps --target dev",
+        "dbt build --select fqn:pkg.orders,package:pkg --select fqn:pkg.a --target dev --indirect-selection empty",
+        "dbt test --select fqn:pkg.orders,fqn:pkg.b --target dev --indirect-selection cautious",
+    ]
+
+
+def test_bundled_task_prepends_deps_when_any_tested_resource_needs_it():
+    options = DbtTaskOptions(task_type="dbt", dbt_deps_enabled=True, dbt_tasks_deps=["orders"])
+    factory = DbtTestTaskFactory(DbtDependencyResolver(), options, "--target dev")
+
+    grouped = factory.create_bundled_task("schema_yml_test", {"empty": ["fqn:pkg.a"]}, ["customers", "orders"], [])
+    single = factory.create_bundled_task("customers_test", {"empty": ["fqn:pkg.a"]}, "customers", [])
+
+    assert grouped.commands[0] == "dbt deps --target dev"
+    assert single.commands == ["dbt test --select fqn:pkg.a --target dev --indirect-selection empty"]
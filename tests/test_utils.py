@@ -1,11 +1,20 @@
+import random
+
 import pytest
 
+from databricks_dbt_factory.simulation import simulate_job
 from databricks_dbt_factory.utils import (
     MAX_TASK_KEY_LENGTH,
+    balance_tasks,
     generate_task_key,
     bundled_test_key,
     build_task_key_maps,
+    grouped_test_key,
     read_dbt_manifest,
+    limit_concurrency,
+    partition_tasks,
+    reserve_task_keys,
+    transitive_reduction,
 )
 
 
@@ -38,6 +47,21 @@ def test_bundled_test_key():
     assert bundled_test_key("source.shop.raw.customers") == "raw_customers_test"
 
 
+def test_grouped_test_key_sanitizes_its_label():
+    assert grouped_test_key("models/staging/schema.yml") == "models_staging_schema_yml_test"
+    assert grouped_test_key("jaffle_shop") == "jaffle_shop_test"
+    assert grouped_test_key("") == "root_test"
+
+
+def test_reserve_task_keys_avoids_taken_keys_and_each_other():
+    taken = ["orders_model", "orders_test"]
+
+    keys = reserve_task_keys(["orders_test", "orders_test", "x" * 150], taken)
+
+    assert keys[:2] == ["orders_test_2", "orders_test_3"]
+    assert len(keys[2]) == MAX_TASK_KEY_LENGTH
+
+
 def test_generate_task_key_truncates_over_long_test_name():
     long_name = "x" * 200
     key = generate_task_key(f"test.shop.{long_name}.9a1b2c")
@@ -169,3 +193,151 @@ def test_read_dbt_manifest_rejects_non_object_json(tmp_path, payload):
     manifest_path.write_text(payload, encoding="utf-8")
     with pytest.raises(ValueError):
         read_dbt_manifest(str(manifest_path))
+
+
+def _reachable(dependencies: dict[str, list[str]]) -> dict[str, set[str]]:
+    def ancestors(key: str) -> set[str]:
+        found: set[str] = set()
+        pending = list(dependencies.get(key, []))
+        while pending:
+            dependency = pending.pop()
+            if dependency not in found:
+                found.add(dependency)
+                pending.extend(dependencies.get(dependency, []))
+        return found
+
+    return {key: ancestors(key) for key in dependencies}
+
+
+def test_transitive_reduction_drops_implied_edges_and_keeps_order():
+    dependencies = {"a": [], "b": ["a"], "c": ["a", "b", "external", "b"], "d": ["c", "external"]}
+
+    assert transitive_reduction(dependencies) == {"a": [], "b": ["a"], "c": ["b", "external"], "d": ["c"]}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_transitive_reduction_keeps_reachability_with_no_implied_edge(seed):
+    rnd = random.Random(seed)
+    keys = [f"task_{index}" for index in range(40)]
+    dependencies = {
+        key: rnd.sample(keys[:index], rnd.randint(0, min(index, 6))) for index, key in enumerate(keys)
+    }
+
+    reduced = transitive_reduction(dependencies)
+
+    assert _reachable(reduced) == _reachable(dependencies)
+    for key, kept in reduced.items():
+        assert set(kept) <= set(dependencies[key])
+        without = {**reduced}
+        for dependency in kept:
+            without[key] = [other for other in kept if other != dependency]
+            assert dependency not in _reachable(without)[key]
+
+
+def test_transitive_reduction_rejects_a_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        transitive_reduction({"a": ["b"], "b": ["a"], "c": []})
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_partition_tasks_places_every_task_after_its_dependencies(seed):
+    rnd = random.Random(seed)
+    keys = [f"task_{index}" for index in range(120)]
+    dependencies = {
+        key: rnd.sample(keys[:index], rnd.randint(0, min(index, 4))) for index, key in enumerate(keys)
+    }
+
+    groups = partition_tasks(dependencies, 25)
+
+    group_of = {key: number for number, group in enumerate(groups) for key in group}
+    assert len(groups) == 5 and all(len(group) <= 25 for group in groups)
+    assert sorted(group_of) == sorted(keys)
+    assert all(group_of[dependency] <= group_of[key] for key in keys for dependency in dependencies[key])
+
+
+def test_partition_tasks_runs_a_task_next_to_its_dependents_and_slices_the_depth():
+    # A long chain plus a seed-like task only the chain's tail needs: placed as late as possible, the
+    # seed shares the tail's group instead of adding an edge from the first group.
+    dependencies = {"seed": [], **{f"step_{index}": [f"step_{index - 1}"] if index else [] for index in range(6)}}
+    dependencies["step_5"].append("seed")
+
+    assert partition_tasks(dependencies, 4) == [["step_0", "step_1", "step_2", "step_3"], ["seed", "step_4", "step_5"]]
+    assert partition_tasks(dependencies, 7) == [list(dependencies)]
+
+
+def test_partition_tasks_rejects_a_cycle_and_an_empty_capacity():
+    with pytest.raises(ValueError, match="cycle"):
+        partition_tasks({"a": ["b"], "b": ["a"], "c": []}, 2)
+    with pytest.raises(ValueError, match="capacity=0"):
+        partition_tasks({"a": []}, 0)
+
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_limit_concurrency_caps_running_tasks_whatever_they_take(seed):
+    rnd = random.Random(seed)
+    keys = [f"task_{index}" for index in range(60)]
+    dependencies = {
+        key: rnd.sample(keys[:index], rnd.randint(0, min(index, 3))) for index, key in enumerate(keys)
+    }
+    seconds = {key: rnd.uniform(1, 100) for key in keys} if seed % 2 else None
+
+    ordering = limit_concurrency(dependencies, 4, seconds)
+
+    assert ordering and all(ordering[key] not in dependencies[key] for key in ordering)
+    limited = {key: [*dependencies[key], *([ordering[key]] if key in ordering else [])] for key in keys}
+    tasks = [{"task_key": key, "depends_on": [{"task_key": dep} for dep in limited[key]]} for key in keys]
+    for _ in range(5):
+        durations = {key: rnd.uniform(0, 100) for key in keys}
+        assert simulate_job(tasks, durations, task_startup_seconds=rnd.uniform(0, 10)).peak_concurrency <= 4
+
+
+def test_limit_concurrency_prefers_a_slot_an_ancestor_freed():
+    # Two chains fit two slots as they are; a third source must queue behind the shorter chain's tail.
+    dependencies = {"a1": [], "a2": ["a1"], "a3": ["a2"], "b1": [], "b2": ["b1"], "c": []}
+
+    assert limit_concurrency(dependencies, 2) == {"c": "b2"}
+    assert limit_concurrency(dependencies, 3) == {}
+    # A slow `c` is the critical path, so it keeps a slot from the start and the chains share the other.
+    weighted = limit_concurrency(dependencies, 2, {"a1": 1, "a2": 1, "a3": 1, "b1": 1, "b2": 1, "c": 10})
+    assert weighted == {"b1": "a2", "a3": "b1", "b2": "a3"}
+
+
+def test_limit_concurrency_rejects_a_cycle_and_no_slots():
+    with pytest.raises(ValueError, match="cycle"):
+        limit_concurrency({"a": ["b"], "b": ["a"], "c": []}, 1)
+    with pytest.raises(ValueError, match="max_parallel=0"):
+        limit_concurrency({"a": []}, 0)
+
+
+def test_balance_tasks_shares_concurrent_tasks_by_capacity():
+    # Six tasks start together and a seventh after them: the concurrent ones split 2:1.
+    dependencies = {f"task_{index}": [] for index in range(6)}
+    dependencies["tail"] = list(dependencies)
+
+    targets = balance_tasks(dependencies, [2.0, 1.0])
+
+    assert [targets[f"task_{index}"] for index in range(6)].count(0) == 4
+    assert targets["tail"] == 0
+
+
+def test_balance_tasks_ignores_the_order_of_the_tasks():
+    rnd = random.Random(0)
+    keys = [f"task_{index}" for index in range(80)]
+    dependencies = {key: rnd.sample(keys[:index], rnd.randint(0, min(index, 3))) for index, key in enumerate(keys)}
+    weights = {key: rnd.choice([1.0, 2.0, 5.0]) for key in keys}
+    shuffled = dict(rnd.sample(list(dependencies.items()), len(keys)))
+
+    targets = balance_tasks(dependencies, [1.0, 1.0, 2.0], weights)
+
+    assert balance_tasks(shuffled, [1.0, 1.0, 2.0], weights) == targets
+    assert set(targets.values()) == {0, 1, 2}
+
+
+def test_balance_tasks_rejects_a_cycle_and_no_capacity():
+    with pytest.raises(ValueError, match="cycle"):
+        balance_tasks({"a": ["b"], "b": ["a"]}, [1.0])
+    with pytest.raises(ValueError, match="capacities"):
+        balance_tasks({"a": []}, [])
+    with pytest.raises(ValueError, match="capacities"):
+        balance_tasks({"a": []}, [1.0, 0.0])